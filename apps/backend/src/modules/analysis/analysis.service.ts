@@ -435,6 +435,7 @@ export class AnalysisService {
     errorMessage: string | null;
     errorCode: string | null;
     progress: number;
+    partialResult: unknown;
     startedAt: Date | null;
     completedAt: Date | null;
     createdAt: Date;
@@ -452,6 +453,7 @@ export class AnalysisService {
       errorMessage: job.errorMessage,
       errorCode: job.errorCode,
       progress: job.progress,
+      partialResult: job.partialResult as Partial<AnalysisResultJson> | null,
       startedAt: job.startedAt?.toISOString() || null,
       completedAt: job.completedAt?.toISOString() || null,
       createdAt: job.createdAt.toISOString(),
@@ -169,6 +169,7 @@ export interface Database {
           error_message: string | null;
           error_code: string | null;
           progress: number;
+          partial_result: Json | null;
           started_at: string | null;
           completed_at: string | null;
           created_at: string;
@@ -186,6 +187,7 @@ export interface Database {
           error_message?: string | null;
           error_code?: string | null;
           progress?: number;
+          partial_result?: Json | null;
           started_at?: string | null;
           completed_at?: string | null;
           created_at?: string;
@@ -203,6 +205,7 @@ export interface Database {
           error_message?: string | null;
           error_code?: string | null;
           progress?: number;
+          partial_result?: Json | null;
           started_at?: string | null;
           completed_at?: string | null;
           created_at?: string;
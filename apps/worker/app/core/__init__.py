@@ -1,15 +1,45 @@
-"""Core module"""
+"""
+Core module
+The async PostgREST client resolves lazily (PEP 562); only settings load eagerly.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
 from .config import get_settings, Settings
-from .database import (
-    get_supabase_client,
-    AnalysisJobRepository,
-    AnalysisResultRepository
-)
+
+if TYPE_CHECKING:
+    from .async_database import (
+        get_async_http_client,
+        close_async_http_client,
+        AsyncPostgrestClient,
+        AsyncAnalysisJobRepository,
+        AsyncAnalysisResultRepository,
+    )
+
+# Public name -> submodule, imported on first access
+_EXPORTS = {
+    "get_async_http_client": ".async_database",
+    "close_async_http_client": ".async_database",
+    "AsyncPostgrestClient": ".async_database",
+    "AsyncAnalysisJobRepository": ".async_database",
+    "AsyncAnalysisResultRepository": ".async_database",
+}
 
 __all__ = [
     "get_settings",
     "Settings",
-    "get_supabase_client",
-    "AnalysisJobRepository",
-    "AnalysisResultRepository",
+    "get_async_http_client",
+    "close_async_http_client",
+    "AsyncPostgrestClient",
+    "AsyncAnalysisJobRepository",
+    "AsyncAnalysisResultRepository",
 ]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # Cache so __getattr__ runs once per name
+    return value
@@ -0,0 +1,383 @@
+"""
+Async Supabase Database Client
+Talks to PostgREST directly over a shared, pooled httpx.AsyncClient (HTTP/2 + keep-alive)
+so database I/O from many concurrent jobs multiplexes over a few connections.
+"""
+import asyncio
+from typing import Any, Optional
+
+import httpx
+
+from .config import get_settings
+
+# Shared pooled HTTP client (created lazily inside the running event loop)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the shared pooled HTTP client for PostgREST traffic"""
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        settings = get_settings()
+        key = settings.supabase_service_role_key  # Service role key bypasses RLS
+        _http_client = httpx.AsyncClient(
+            base_url=f"{settings.supabase_url.rstrip('/')}/rest/v1",
+            headers={
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Content-Type": "application/json",
+            },
+            http2=settings.db_http2,
+            limits=httpx.Limits(
+                max_connections=settings.db_pool_size,
+                max_keepalive_connections=settings.db_pool_size,
+                keepalive_expiry=settings.db_keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.db_connect_timeout_seconds,
+                read=settings.db_read_timeout_seconds,
+                write=settings.db_read_timeout_seconds,
+                pool=settings.db_connect_timeout_seconds,
+            ),
+        )
+    return _http_client
+
+
+async def close_async_http_client() -> None:
+    """Close the shared HTTP client (call on application shutdown)"""
+    global _http_client
+
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+class AsyncPostgrestClient:
+    """
+    Minimal async PostgREST wrapper.
+
+    Every call is bounded by a per-call deadline on top of the pool's
+    connect/read timeouts, so a stuck request cannot hold a job forever.
+    """
+
+    def __init__(
+        self,
+        http: Optional[httpx.AsyncClient] = None,
+        deadline: Optional[float] = None
+    ):
+        self._http = http
+        self.deadline = deadline if deadline is not None else get_settings().db_call_deadline_seconds
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return self._http or get_async_http_client()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        json: Any = None,
+        prefer: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Send a request and return the decoded JSON body (None if empty)"""
+        headers = {"Prefer": prefer} if prefer else None
+        response = await asyncio.wait_for(
+            self.http.request(method, path, params=params, json=json, headers=headers),
+            timeout=deadline or self.deadline,
+        )
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    async def select(self, table: str, params: dict, deadline: Optional[float] = None) -> list[dict]:
+        return await self.request("GET", f"/{table}", params=params, deadline=deadline) or []
+
+    async def insert(
+        self,
+        table: str,
+        data: dict,
+        on_conflict: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> list[dict]:
+        """Insert a row; with on_conflict, upsert on the given unique columns"""
+        prefer = "return=representation"
+        params = None
+        if on_conflict:
+            prefer += ",resolution=merge-duplicates"
+            params = {"on_conflict": on_conflict}
+        return await self.request(
+            "POST", f"/{table}", params=params, json=data, prefer=prefer, deadline=deadline
+        ) or []
+
+    async def update(
+        self,
+        table: str,
+        data: dict,
+        filters: dict,
+        deadline: Optional[float] = None
+    ) -> list[dict]:
+        return await self.request(
+            "PATCH", f"/{table}", params=filters, json=data,
+            prefer="return=representation", deadline=deadline
+        ) or []
+
+    async def rpc(self, function: str, params: dict, deadline: Optional[float] = None) -> Any:
+        return await self.request("POST", f"/rpc/{function}", json=params, deadline=deadline)
+
+
+class AsyncAnalysisJobRepository:
+    """Async repository for analysis_jobs table operations"""
+
+    def __init__(self, client: Optional[AsyncPostgrestClient] = None):
+        self.client = client or AsyncPostgrestClient()
+
+    async def get_pending_jobs(self, limit: int = 10, include_deferred: bool = True) -> list[dict]:
+        """
+        Get pending jobs ordered by creation time, skipping requeued jobs still delayed
+        (by the database clock, see get_ready_pending_jobs in migration 00015).
+        With include_deferred=False, deferred STANDARD jobs are left for the bulk runner.
+        """
+        return await self.client.rpc("get_ready_pending_jobs", {
+            "p_limit": limit,
+            "p_include_deferred": include_deferred,
+        }) or []
+
+    async def get_fair_pending_jobs(
+        self,
+        limit: int = 10,
+        include_deferred: bool = True,
+        plan_weights: Optional[dict[str, float]] = None
+    ) -> list[dict]:
+        """
+        Get pending jobs in weighted round-robin order across users
+        (see get_fair_pending_jobs in migration 00011).
+        plan_weights gives users on a plan proportionally more slots, e.g. {"PRO": 4}.
+        """
+        return await self.client.rpc("get_fair_pending_jobs", {
+            "p_limit": limit,
+            "p_include_deferred": include_deferred,
+            "p_plan_weights": plan_weights or {},
+        }) or []
+
+    async def get_deferred_jobs(self, limit: int = 50) -> list[dict]:
+        """Get pending deferred STANDARD jobs for batch processing, skipping delayed ones"""
+        return await self.client.rpc("get_ready_deferred_jobs", {
+            "p_limit": limit,
+        }) or []
+
+    async def claim_job(self, job_id: str, worker_id: str, lease_seconds: int = 60) -> Optional[dict]:
+        """
+        Atomically claim a job by setting status to PROCESSING and taking its lease.
+        Returns the job if successfully claimed, None if already taken.
+        """
+        rows = await self.client.rpc("claim_analysis_job", {
+            "p_job_id": job_id,
+            "p_worker_id": worker_id,
+            "p_lease_seconds": lease_seconds,
+        })
+        return rows[0] if rows else None
+
+    async def renew_leases(self, worker_id: str, job_ids: list[str], lease_seconds: int = 60) -> set[str]:
+        """Extend leases held by this worker. Returns the job ids still owned."""
+        owned = await self.client.rpc("renew_job_leases", {
+            "p_worker_id": worker_id,
+            "p_job_ids": job_ids,
+            "p_lease_seconds": lease_seconds,
+        })
+        return set(owned or [])
+
+    async def release_leases(self, worker_id: str, job_ids: list[str]) -> int:
+        """Return this worker's in-flight jobs to PENDING (graceful shutdown)"""
+        return await self.client.rpc("release_job_leases", {
+            "p_worker_id": worker_id,
+            "p_job_ids": job_ids,
+        }) or 0
+
+    async def reclaim_expired_jobs(self, max_attempts: int = 3) -> int:
+        """Return jobs with expired leases to PENDING. Returns number reclaimed."""
+        return await self.client.rpc("reclaim_expired_jobs", {
+            "p_max_attempts": max_attempts,
+        }) or 0
+
+    async def update_progress(self, job_id: str, progress: int) -> None:
+        """Update job progress (0-100)"""
+        await self.client.update("analysis_jobs", {"progress": progress}, {"id": f"eq.{job_id}"})
+
+    async def update_partial_result(self, job_id: str, partial_result: dict) -> None:
+        """Publish fields of the result that are already complete while analysis streams"""
+        await self.client.update("analysis_jobs", {"partial_result": partial_result}, {"id": f"eq.{job_id}"})
+
+    async def complete_job(self, job_id: str, result_id: str) -> dict:
+        """Mark job as completed with result"""
+        rows = await self.client.update(
+            "analysis_jobs",
+            {
+                "status": "COMPLETED",
+                "result_id": result_id,
+                "progress": 100,
+                "completed_at": "now()"
+            },
+            {"id": f"eq.{job_id}"},
+        )
+        return rows[0] if rows else {}
+
+    async def finalize_job(
+        self,
+        job_id: str,
+        video_id: str,
+        video_url: str,
+        mode: str,
+        result_json: dict,
+        video_title: Optional[str] = None,
+        video_thumbnail: Optional[str] = None,
+        video_duration_seconds: Optional[int] = None,
+        transcript: Optional[str] = None,
+        worker_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Upsert the analysis result and mark the job COMPLETED in one transaction.
+        Returns the result id. With worker_id, does nothing (returns None)
+        unless the job is still PROCESSING under that worker's lease.
+        """
+        result_id = await self.client.rpc("finalize_job", {
+            "p_job_id": job_id,
+            "p_video_id": video_id,
+            "p_video_url": video_url,
+            "p_mode": mode,
+            "p_result_json": result_json,
+            "p_video_title": video_title,
+            "p_video_thumbnail": video_thumbnail,
+            "p_video_duration_seconds": video_duration_seconds,
+            "p_transcript": transcript,
+            "p_worker_id": worker_id,
+        })
+        return result_id or None
+
+    async def fail_job(self, job_id: str, error_message: str, error_code: str = "ANALYSIS_006") -> dict:
+        """Mark job as failed with error info"""
+        rows = await self.client.update(
+            "analysis_jobs",
+            {
+                "status": "FAILED",
+                "error_message": error_message,
+                "error_code": error_code,
+                "completed_at": "now()"
+            },
+            {"id": f"eq.{job_id}"},
+        )
+        return rows[0] if rows else {}
+
+    async def fail_and_refund_job(
+        self,
+        job_id: str,
+        error_message: str,
+        error_code: str = "ANALYSIS_006",
+        worker_id: Optional[str] = None
+    ) -> int:
+        """
+        Mark job as failed and refund its reserved credits in one transaction.
+        Idempotent per job_id. Returns the number of credits refunded.
+        With worker_id, does nothing unless the job is still PROCESSING under
+        that worker's lease.
+        """
+        refunded = await self.client.rpc("fail_and_refund_job", {
+            "p_job_id": job_id,
+            "p_error_message": error_message,
+            "p_error_code": error_code,
+            "p_worker_id": worker_id,
+        })
+        return refunded or 0
+
+    async def requeue_job(
+        self,
+        job_id: str,
+        worker_id: str,
+        delay_seconds: int,
+        reason: str,
+        max_requeues: int = 5
+    ) -> str:
+        """
+        Return a job to PENDING after a transient upstream error, not to be
+        claimed again for delay_seconds. Once max_requeues is reached the job
+        is failed and refunded instead.
+        Returns "REQUEUED", "FAILED" or "NOT_OWNED" (lease lost).
+        """
+        return await self.client.rpc("requeue_job", {
+            "p_job_id": job_id,
+            "p_worker_id": worker_id,
+            "p_delay_seconds": delay_seconds,
+            "p_reason": reason,
+            "p_max_requeues": max_requeues,
+        }) or "NOT_OWNED"
+
+    async def get_queue_stats(self, window_minutes: int = 15) -> list[dict]:
+        """
+        Queue depth, oldest pending age and recent average service time per mode,
+        from one aggregate query (see get_queue_stats in migrations 00010, 00015)
+        """
+        return await self.client.rpc("get_queue_stats", {
+            "p_window_minutes": window_minutes,
+        }) or []
+
+    async def get_trending_videos(
+        self,
+        window_hours: int = 24,
+        min_requests: int = 2,
+        limit: int = 50
+    ) -> list[dict]:
+        """
+        Most-requested recent videos without a Standard result or a Standard
+        job in flight (see get_trending_videos in migrations 00013, 00016)
+        """
+        return await self.client.rpc("get_trending_videos", {
+            "p_window_hours": window_hours,
+            "p_min_requests": min_requests,
+            "p_limit": limit,
+        }) or []
+
+
+class AsyncAnalysisResultRepository:
+    """Async repository for analysis_results table operations"""
+
+    def __init__(self, client: Optional[AsyncPostgrestClient] = None):
+        self.client = client or AsyncPostgrestClient()
+
+    async def find_by_video_and_mode(self, video_id: str, mode: str) -> Optional[dict]:
+        """Find existing result by video ID and mode"""
+        rows = await self.client.select("analysis_results", {
+            "select": "*",
+            "video_id": f"eq.{video_id}",
+            "mode": f"eq.{mode}",
+            "limit": 1,
+        })
+        return rows[0] if rows else None
+
+    async def create_result(
+        self,
+        video_id: str,
+        video_url: str,
+        mode: str,
+        result_json: dict,
+        video_title: Optional[str] = None,
+        video_thumbnail: Optional[str] = None,
+        video_duration_seconds: Optional[int] = None,
+        transcript: Optional[str] = None,
+    ) -> dict:
+        """Create or update analysis result"""
+        rows = await self.client.insert(
+            "analysis_results",
+            {
+                "video_id": video_id,
+                "video_url": video_url,
+                "mode": mode,
+                "result_json": result_json,
+                "video_title": video_title,
+                "video_thumbnail": video_thumbnail,
+                "video_duration_seconds": video_duration_seconds,
+                "transcript": transcript,
+            },
+            on_conflict="video_id,mode",
+        )
+        return rows[0] if rows else {}
@@ -1,16 +1,34 @@
 """
 Glint Worker - Video Analysis Job Processor
 FastAPI application that polls for pending analysis jobs and processes them
+
+Startup is lazy: the runners (and with them yt_dlp, google.generativeai and
+the API clients) are imported and built in a background thread after the
+port is bound, so /health answers immediately on a cold container. If that
+warm-up fails, /health answers 503 from then on.
+
+With WORKER_PROCESSES > 1 this process only supervises: the runners live in
+child processes (see services/supervisor.py) and /health aggregates them.
 """
+import os
+import json
+import time
 import logging
 import asyncio
+from dataclasses import asdict
+from typing import TYPE_CHECKING, AsyncIterator, Optional
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from .core.config import get_settings, Settings
-from .services.job_processor import JobRunner
+from .core.config import get_settings, runner_process_count, Settings
+
+if TYPE_CHECKING:
+    from .services.job_processor import JobRunner
+    from .services.batch_processor import BatchRunner
+    from .services.supervisor import WorkerSupervisor
 
 # Configure logging
 logging.basicConfig(
@@ -19,15 +37,71 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global job runner instance
-job_runner: JobRunner | None = None
+# Global job runner instance (None until warm-up finishes)
+job_runner: "JobRunner | None" = None
+batch_runner: "BatchRunner | None" = None
+supervisor: "WorkerSupervisor | None" = None
+runner_tasks: list[asyncio.Task] = []
+# Set if warm-up raised; /health then answers 503 so the orchestrator restarts us
+warm_up_error: Optional[str] = None
+
+# Comment lines keep idle SSE connections open through proxies
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def _build_job_runner(settings: Settings) -> "JobRunner":
+    from .services.job_processor import JobRunner
+
+    return JobRunner.from_settings(settings)
+
+
+def _build_batch_runner(settings: Settings, worker_id: str) -> "BatchRunner":
+    from .services.batch_processor import BatchRunner
+
+    return BatchRunner.from_settings(settings, worker_id=worker_id)
+
+
+async def _warm_up(settings: Settings):
+    """Import and build the runners off the event loop, then start them"""
+    global warm_up_error
+
+    try:
+        await _start_runners(settings)
+    except Exception as e:
+        # Nothing awaits this task, so keep the error for /health instead of raising
+        warm_up_error = str(e) or type(e).__name__
+        logger.error(f"Worker warm-up failed: {e}")
+
+
+async def _start_runners(settings: Settings):
+    global job_runner, batch_runner, supervisor
+
+    started = time.perf_counter()
+
+    processes = runner_process_count(settings)
+    if processes > 1:
+        from .services.supervisor import WorkerSupervisor
+
+        # The bulk runner goes to the first runner process
+        supervisor = WorkerSupervisor(processes, worker_id=settings.worker_id, run_bulk=settings.bulk_mode_enabled)
+        runner_tasks.append(asyncio.create_task(supervisor.run()))
+        logger.info(f"Worker started in supervisor mode with {processes} runner processes")
+        return
+
+    job_runner = await asyncio.to_thread(_build_job_runner, settings)
+    runner_tasks.append(asyncio.create_task(job_runner.start()))
+
+    # Start bulk runner for deferred jobs (optional)
+    if settings.bulk_mode_enabled:
+        batch_runner = await asyncio.to_thread(_build_batch_runner, settings, job_runner.worker_id)
+        runner_tasks.append(asyncio.create_task(batch_runner.start()))
+
+    logger.info(f"Worker started successfully (warm-up {time.perf_counter() - started:.1f}s)")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
-    global job_runner
-
     settings = get_settings()
 
     # Initialize Sentry if configured
@@ -44,24 +118,28 @@ async def lifespan(app: FastAPI):
         except ImportError:
             logger.warning("Sentry SDK not installed, skipping initialization")
 
-    # Start job runner
-    job_runner = JobRunner(
-        max_concurrent=settings.max_concurrent_jobs,
-        poll_interval=settings.poll_interval_seconds
-    )
-    runner_task = asyncio.create_task(job_runner.start())
-    logger.info("Worker started successfully")
+    # Warm up in the background so the port is bound right away
+    warm_up_task = asyncio.create_task(_warm_up(settings))
 
     yield
 
-    # Shutdown
+    # Shutdown: hand in-flight jobs back to the queue before exiting
+    if not warm_up_task.done():
+        warm_up_task.cancel()
+    await asyncio.gather(warm_up_task, return_exceptions=True)
+
+    if supervisor:
+        await asyncio.to_thread(supervisor.stop)
+    if batch_runner:
+        await batch_runner.shutdown()
     if job_runner:
-        job_runner.stop()
-    runner_task.cancel()
-    try:
-        await runner_task
-    except asyncio.CancelledError:
-        pass
+        await job_runner.shutdown()
+    for task in runner_tasks:
+        task.cancel()
+    await asyncio.gather(*runner_tasks, return_exceptions=True)
+
+    from .core.async_database import close_async_http_client
+    await close_async_http_client()
     logger.info("Worker shutdown complete")
 
 
@@ -94,6 +172,18 @@ class HealthResponse(BaseModel):
     version: str
     active_jobs: int
     max_concurrent: int
+    processes: int = 1
+
+
+class MetricsResponse(BaseModel):
+    processes: int
+    ready_processes: int
+    restarts: int
+    active_jobs: int
+    max_concurrent: int
+    completed_jobs: int
+    failed_jobs: int
+    per_process: list[dict]
 
 
 class JobStatusResponse(BaseModel):
@@ -102,25 +192,153 @@ class JobStatusResponse(BaseModel):
     is_processing: bool
 
 
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def _runner_stats() -> dict:
+    """Runner totals for /health and metrics, from the supervisor's shared stats in supervisor mode"""
+    if supervisor:
+        stats = supervisor.aggregate_stats()
+        stats["per_process"] = supervisor.process_stats()
+        return stats
+
+    if not job_runner:
+        return {
+            "status": "starting", "processes": 1, "ready_processes": 0, "restarts": 0,
+            "active_jobs": 0, "max_concurrent": 0, "completed_jobs": 0, "failed_jobs": 0,
+            "per_process": [],
+        }
+
+    row = {
+        "index": 0,
+        "pid": os.getpid(),
+        "ready": True,
+        "active_jobs": len(job_runner.active_jobs),
+        "max_concurrent": job_runner.max_concurrent,
+        "completed_jobs": job_runner.completed_jobs,
+        "failed_jobs": job_runner.failed_jobs,
+    }
+    if job_runner.pipeline:
+        row["stages"] = job_runner.pipeline.stats()
+    if job_runner.precompute:
+        row["precompute"] = {"active": job_runner.precompute.active, "completed": job_runner.precompute.completed}
+
+    from .services.circuit_breaker import Upstream, get_circuit_breaker
+    row["circuits"] = {
+        upstream: get_circuit_breaker(upstream).stats() for upstream in (Upstream.YOUTUBE, Upstream.GEMINI)
+    }
+    return {
+        "status": "healthy", "processes": 1, "ready_processes": 1, "restarts": 0,
+        **{key: row[key] for key in ("active_jobs", "max_concurrent", "completed_jobs", "failed_jobs")},
+        "per_process": [row],
+    }
+
+
+async def _job_state(job_id: str) -> Optional[dict]:
+    """In-memory state of a job on this worker, from the runner process that has it"""
+    if supervisor:
+        return await asyncio.to_thread(supervisor.job_state, job_id)
+
+    from .services.job_state import get_job_states
+    return get_job_states().get(job_id)
+
+
+async def _poll_job_state(job_id: str) -> AsyncIterator[dict]:
+    """State changes of a job in a runner process (supervisor mode has no push)"""
+    from .services.job_state import TERMINAL_STATUSES
+
+    last_update = None
+    while True:
+        state = await _job_state(job_id)
+        if state is None:
+            return
+        if state["updated_at"] != last_update:
+            last_update = state["updated_at"]
+            yield state
+        if state["status"] in TERMINAL_STATUSES:
+            return
+        await asyncio.sleep(1)
+
+
+async def _job_events(job_id: str) -> AsyncIterator[str]:
+    """Format a job's state changes as Server-Sent Events, with keep-alives"""
+    if supervisor:
+        states = _poll_job_state(job_id)
+    else:
+        from .services.job_state import get_job_states
+        states = get_job_states().subscribe(job_id)
+
+    next_state = asyncio.ensure_future(states.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_state}, timeout=SSE_KEEPALIVE_SECONDS)
+            if not done:
+                yield ": keep-alive\n\n"
+                continue
+            try:
+                state = next_state.result()
+            except StopAsyncIteration:
+                return
+            yield f"event: state\ndata: {json.dumps(state)}\n\n"
+            next_state = asyncio.ensure_future(states.__anext__())
+    finally:
+        next_state.cancel()
+        await asyncio.gather(next_state, return_exceptions=True)
+        await states.aclose()
+
+
 # ============================================================================
 # Routes
 # ============================================================================
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint for load balancers and monitoring"""
+    """Health check endpoint for load balancers and monitoring (503 once warm-up has failed)"""
+    if warm_up_error:
+        raise HTTPException(status_code=503, detail=f"Worker warm-up failed: {warm_up_error}")
+
+    stats = _runner_stats()
     return HealthResponse(
-        status="healthy",
+        status=stats["status"],
         version="1.0.0",
-        active_jobs=len(job_runner.active_jobs) if job_runner else 0,
-        max_concurrent=job_runner.max_concurrent if job_runner else 0
+        active_jobs=stats["active_jobs"],
+        max_concurrent=stats["max_concurrent"],
+        processes=stats["processes"]
     )
 
 
+@app.get("/worker/metrics", response_model=MetricsResponse, dependencies=[Depends(verify_api_key)])
+async def get_metrics():
+    """Runner counters, summed across runner processes in supervisor mode"""
+    stats = _runner_stats()
+    stats.pop("status")
+    return MetricsResponse(**stats)
+
+
+@app.get("/worker/queue", dependencies=[Depends(verify_api_key)])
+async def get_queue_stats():
+    """
+    Fleet-wide queue depth, oldest pending age, recent service time and
+    estimated drain time per mode, for autoscaling
+    """
+    from .services.queue_monitor import get_queue_monitor
+
+    try:
+        stats = await get_queue_monitor().stats()
+    except Exception as e:
+        logger.error(f"Failed to read queue stats: {e}")
+        raise HTTPException(status_code=503, detail="Queue stats unavailable")
+    return asdict(stats)
+
+
 @app.get("/worker/jobs/{job_id}", response_model=JobStatusResponse, dependencies=[Depends(verify_api_key)])
 async def get_job_status(job_id: str):
     """Get the status of a specific job"""
-    is_processing = job_id in (job_runner.active_jobs if job_runner else set())
+    if supervisor:
+        is_processing = await asyncio.to_thread(supervisor.is_processing, job_id)
+    else:
+        is_processing = job_id in (job_runner.active_jobs if job_runner else set())
     return JobStatusResponse(
         job_id=job_id,
         status="processing" if is_processing else "unknown",
@@ -128,18 +346,51 @@ async def get_job_status(job_id: str):
     )
 
 
+@app.get("/worker/jobs/{job_id}/state", dependencies=[Depends(verify_api_key)])
+async def get_job_state(job_id: str):
+    """
+    Detailed state of a job on this worker: current stage, seconds per stage,
+    attempt, progress and partial result. Finished jobs stay visible for
+    JOB_STATE_RETENTION_SECONDS.
+    """
+    state = await _job_state(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Job is not known to this worker")
+    return state
+
+
+@app.get("/worker/jobs/{job_id}/events", dependencies=[Depends(verify_api_key)])
+async def stream_job_events(job_id: str):
+    """
+    Server-Sent Events stream of a job's state: the current state first, then
+    every change until the job completes, fails, is cancelled or is requeued
+    """
+    if await _job_state(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job is not known to this worker")
+
+    return StreamingResponse(
+        _job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/worker/jobs/{job_id}/cancel", dependencies=[Depends(verify_api_key)])
 async def cancel_job(job_id: str):
     """
-    Cancel a job.
-    Note: This only prevents picking up new jobs, does not interrupt running ones.
+    Cancel a job running on this worker.
+    The job stops at its next checkpoint (between stages or mid download/upload),
+    its remote files are deleted, credits are refunded and its slot is freed.
     """
-    # For now, we don't support cancellation of in-progress jobs
-    # This would require more sophisticated job tracking
-    if job_runner and job_id in job_runner.active_jobs:
-        return {"message": "Job is currently processing, cannot cancel"}
+    if supervisor:
+        cancelled = await asyncio.to_thread(supervisor.cancel_job, job_id)
+    else:
+        cancelled = bool(job_runner and job_runner.cancel_job(job_id))
+
+    if cancelled:
+        return {"message": "Job cancellation requested"}
 
-    return {"message": "Job cancellation requested"}
+    return {"message": "Job is not running on this worker"}
 
 
 @app.get("/")
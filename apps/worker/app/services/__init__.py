@@ -1,7 +1,86 @@
-"""Services module"""
-from .youtube_service import YouTubeService, VideoMetadata, TranscriptResult, extract_video_id
-from .gemini_analyzer import GeminiAnalyzer, AnalysisResult
-from .job_processor import JobProcessor, JobRunner
+"""
+Services module
+Exports resolve lazily (PEP 562) so importing one service, or app.main,
+doesn't pull in yt_dlp / google.generativeai for all of them.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .youtube_service import YouTubeService, VideoMetadata, TranscriptResult, extract_video_id
+    from .gemini_analyzer import GeminiAnalyzer, AnalysisResult
+    from .cancellation import CancellationToken, JobCancelled
+    from .negative_cache import NegativeCache, NegativeCause, get_negative_cache
+    from .rate_limiter import YouTubeRateLimiter, YouTubeBucket, get_youtube_rate_limiter
+    from .circuit_breaker import (
+        CircuitBreaker,
+        CircuitOpen,
+        Upstream,
+        UpstreamUnavailable,
+        get_circuit_breaker,
+    )
+    from .checkpoint_store import CheckpointStore, get_checkpoint_store
+    from .model_router import ModelRouter, ModelRoute, get_model_router
+    from .storage_manager import StorageManager, StorageUnavailable, get_storage_manager
+    from .upload_registry import UploadRegistry, get_upload_registry
+    from .video_segmenter import VideoSegment, split_video
+    from .pipeline import Stage, StagePipeline
+    from .job_state import JobState, JobStateRegistry, get_job_states
+    from .precompute import IdlePrecomputer
+    from .job_processor import JobProcessor, JobRunner
+    from .batch_processor import BatchRunner, BatchPredictionClient, get_batch_client
+    from .supervisor import WorkerSupervisor
+    from .queue_monitor import QueueMonitor, QueueStats, get_queue_monitor
+
+# Public name -> submodule, imported on first access
+_EXPORTS = {
+    "YouTubeService": ".youtube_service",
+    "VideoMetadata": ".youtube_service",
+    "TranscriptResult": ".youtube_service",
+    "extract_video_id": ".youtube_service",
+    "GeminiAnalyzer": ".gemini_analyzer",
+    "AnalysisResult": ".gemini_analyzer",
+    "CancellationToken": ".cancellation",
+    "JobCancelled": ".cancellation",
+    "NegativeCache": ".negative_cache",
+    "NegativeCause": ".negative_cache",
+    "get_negative_cache": ".negative_cache",
+    "YouTubeRateLimiter": ".rate_limiter",
+    "YouTubeBucket": ".rate_limiter",
+    "get_youtube_rate_limiter": ".rate_limiter",
+    "CircuitBreaker": ".circuit_breaker",
+    "CircuitOpen": ".circuit_breaker",
+    "Upstream": ".circuit_breaker",
+    "UpstreamUnavailable": ".circuit_breaker",
+    "get_circuit_breaker": ".circuit_breaker",
+    "CheckpointStore": ".checkpoint_store",
+    "get_checkpoint_store": ".checkpoint_store",
+    "ModelRouter": ".model_router",
+    "ModelRoute": ".model_router",
+    "get_model_router": ".model_router",
+    "StorageManager": ".storage_manager",
+    "StorageUnavailable": ".storage_manager",
+    "get_storage_manager": ".storage_manager",
+    "UploadRegistry": ".upload_registry",
+    "get_upload_registry": ".upload_registry",
+    "VideoSegment": ".video_segmenter",
+    "split_video": ".video_segmenter",
+    "Stage": ".pipeline",
+    "StagePipeline": ".pipeline",
+    "JobState": ".job_state",
+    "JobStateRegistry": ".job_state",
+    "get_job_states": ".job_state",
+    "IdlePrecomputer": ".precompute",
+    "JobProcessor": ".job_processor",
+    "JobRunner": ".job_processor",
+    "BatchRunner": ".batch_processor",
+    "BatchPredictionClient": ".batch_processor",
+    "get_batch_client": ".batch_processor",
+    "WorkerSupervisor": ".supervisor",
+    "QueueMonitor": ".queue_monitor",
+    "QueueStats": ".queue_monitor",
+    "get_queue_monitor": ".queue_monitor",
+}
 
 __all__ = [
     "YouTubeService",
@@ -10,6 +89,53 @@ __all__ = [
     "extract_video_id",
     "GeminiAnalyzer",
     "AnalysisResult",
+    "CancellationToken",
+    "JobCancelled",
+    "NegativeCache",
+    "NegativeCause",
+    "get_negative_cache",
+    "YouTubeRateLimiter",
+    "YouTubeBucket",
+    "get_youtube_rate_limiter",
+    "CircuitBreaker",
+    "CircuitOpen",
+    "Upstream",
+    "UpstreamUnavailable",
+    "get_circuit_breaker",
+    "CheckpointStore",
+    "get_checkpoint_store",
+    "ModelRouter",
+    "ModelRoute",
+    "get_model_router",
+    "StorageManager",
+    "StorageUnavailable",
+    "get_storage_manager",
+    "UploadRegistry",
+    "get_upload_registry",
+    "VideoSegment",
+    "split_video",
+    "Stage",
+    "StagePipeline",
+    "JobState",
+    "JobStateRegistry",
+    "get_job_states",
+    "IdlePrecomputer",
     "JobProcessor",
     "JobRunner",
+    "BatchRunner",
+    "BatchPredictionClient",
+    "get_batch_client",
+    "WorkerSupervisor",
+    "QueueMonitor",
+    "QueueStats",
+    "get_queue_monitor",
 ]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # Cache so __getattr__ runs once per name
+    return value
@@ -0,0 +1,575 @@
+"""
+Bulk Analysis via Gemini Batch Prediction
+Gathers deferred STANDARD jobs (backfills, scheduled digests) into batch
+prediction jobs so they run on batch pricing/quota instead of competing
+with interactive traffic for synchronous generate_content calls.
+
+Flow:
+1. Claim up to `batch_max_jobs` PENDING jobs with priority = 'DEFERRED'
+2. Fetch metadata + transcript for each (checkpointed like regular jobs)
+3. Submit one batch-prediction job with a prompt per video and checkpoint
+   its name per job, so a restarted runner resumes polling it instead of
+   submitting (and paying for) the batch again
+4. Poll until it finishes while a heartbeat keeps the job leases alive
+5. Parse each response (regenerating missing fields) and persist it through
+   finalize_job (or fail + refund)
+
+Transient Batch API errors (429/5xx, network) and batches that end without
+succeeding requeue the jobs with a delay instead of failing them. Failing
+and finalizing pass the runner's worker id, so a job whose lease was lost
+is left alone. On shutdown the leases are released back to PENDING.
+"""
+import math
+import uuid
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+
+import httpx
+
+from ..core.config import get_settings
+from ..core.async_database import AsyncAnalysisJobRepository
+from .youtube_service import YouTubeService, VideoMetadata, TranscriptResult, extract_video_id
+from .gemini_analyzer import GeminiAnalyzer, FLASH_GENERATION_CONFIG, SAFETY_SETTINGS, genai
+from .checkpoint_store import get_checkpoint_store
+from .circuit_breaker import Upstream, UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+
+class BatchState:
+    """Normalized batch job states"""
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+    EXPIRED = "EXPIRED"
+
+    TERMINAL = {SUCCEEDED, FAILED, CANCELLED, EXPIRED}
+
+
+@dataclass
+class BatchRequest:
+    """A single prompt inside a batch, keyed by job id"""
+    key: str
+    prompt: str
+
+
+class BatchPredictionClient(ABC):
+    """Base interface for batch-prediction backends"""
+
+    @abstractmethod
+    def submit(self, model: str, requests: list[BatchRequest], display_name: str) -> str:
+        """Submit a batch and return its name"""
+
+    @abstractmethod
+    def get_state(self, batch_name: str) -> str:
+        """Get the normalized BatchState of a batch"""
+
+    @abstractmethod
+    def get_results(self, batch_name: str) -> dict[str, Optional[str]]:
+        """Get response text per request key (None for failed requests)"""
+
+
+class LocalBatchClient(BatchPredictionClient):
+    """
+    Local stand-in for batch prediction.
+
+    Runs each request through the synchronous API in a background thread so the
+    whole bulk flow can be exercised locally without the batch endpoint.
+    """
+
+    def __init__(self):
+        self._batches: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, model: str, requests: list[BatchRequest], display_name: str) -> str:
+        batch_name = f"local-batches/{uuid.uuid4().hex}"
+        with self._lock:
+            self._batches[batch_name] = {"state": BatchState.RUNNING, "results": {}}
+
+        threading.Thread(
+            target=self._run,
+            args=(batch_name, model, requests),
+            name=display_name,
+            daemon=True
+        ).start()
+        return batch_name
+
+    def _run(self, batch_name: str, model: str, requests: list[BatchRequest]):
+        generative_model = genai.GenerativeModel(
+            model_name=model,
+            generation_config=FLASH_GENERATION_CONFIG,
+            safety_settings=SAFETY_SETTINGS
+        )
+        results: dict[str, Optional[str]] = {}
+
+        for request in requests:
+            try:
+                results[request.key] = generative_model.generate_content(request.prompt).text
+            except Exception as e:
+                logger.warning(f"Local batch request {request.key} failed: {e}")
+                results[request.key] = None
+
+        with self._lock:
+            self._batches[batch_name] = {"state": BatchState.SUCCEEDED, "results": results}
+
+    def get_state(self, batch_name: str) -> str:
+        with self._lock:
+            batch = self._batches.get(batch_name)
+        return batch["state"] if batch else BatchState.EXPIRED
+
+    def get_results(self, batch_name: str) -> dict[str, Optional[str]]:
+        with self._lock:
+            batch = self._batches.pop(batch_name, None)
+        return batch["results"] if batch else {}
+
+
+class GeminiBatchClient(BatchPredictionClient):
+    """Gemini Batch API client (inline requests, REST)"""
+
+    BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+    TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, api_key: str):
+        self.http = httpx.Client(
+            base_url=self.BASE_URL,
+            headers={"x-goog-api-key": api_key},
+            timeout=60.0
+        )
+
+    def submit(self, model: str, requests: list[BatchRequest], display_name: str) -> str:
+        model = model if model.startswith("models/") else f"models/{model}"
+        safety_settings = [
+            {"category": category.name, "threshold": threshold.name}
+            for category, threshold in SAFETY_SETTINGS.items()
+        ]
+        body = {
+            "batch": {
+                "display_name": display_name,
+                "input_config": {
+                    "requests": {
+                        "requests": [
+                            {
+                                "request": {
+                                    "contents": [{"role": "user", "parts": [{"text": request.prompt}]}],
+                                    "generation_config": FLASH_GENERATION_CONFIG,
+                                    "safety_settings": safety_settings,
+                                },
+                                "metadata": {"key": request.key},
+                            }
+                            for request in requests
+                        ]
+                    }
+                }
+            }
+        }
+
+        data = self._request("POST", f"/{model}:batchGenerateContent", json=body)
+        # Creation returns a long-running operation wrapping the batch
+        return data.get("metadata", {}).get("name") or data["name"]
+
+    def _request(self, method: str, path: str, **kwargs) -> dict:
+        """Send a request; throttling, 5xx and network errors raise UpstreamUnavailable"""
+        try:
+            response = self.http.request(method, path, **kwargs)
+        except httpx.TransportError as e:
+            raise UpstreamUnavailable(Upstream.GEMINI, f"Batch API request failed: {e}")
+
+        if response.status_code in self.TRANSIENT_STATUS:
+            try:
+                retry_after = float(response.headers.get("retry-after", 0))
+            except ValueError:
+                retry_after = 0
+            raise UpstreamUnavailable(
+                Upstream.GEMINI, f"Batch API returned {response.status_code}", retry_after=retry_after
+            )
+
+        response.raise_for_status()
+        return response.json()
+
+    def _get(self, batch_name: str) -> dict:
+        return self._request("GET", f"/{batch_name}")
+
+    def get_state(self, batch_name: str) -> str:
+        data = self._get(batch_name)
+        state = data.get("metadata", {}).get("state") or data.get("state", "")
+        # e.g. BATCH_STATE_SUCCEEDED / JOB_STATE_SUCCEEDED -> SUCCEEDED
+        state = state.rsplit("_STATE_", 1)[-1]
+        if state in BatchState.TERMINAL:
+            return state
+        return BatchState.RUNNING if state == "RUNNING" else BatchState.PENDING
+
+    def get_results(self, batch_name: str) -> dict[str, Optional[str]]:
+        data = self._get(batch_name)
+        output = data.get("response") or data.get("dest") or {}
+        inlined = output.get("inlinedResponses", {})
+        if isinstance(inlined, dict):
+            inlined = inlined.get("inlinedResponses", [])
+
+        results: dict[str, Optional[str]] = {}
+        for item in inlined:
+            key = item.get("metadata", {}).get("key")
+            if not key:
+                continue
+            try:
+                parts = item["response"]["candidates"][0]["content"]["parts"]
+                results[key] = "".join(part.get("text", "") for part in parts)
+            except (KeyError, IndexError, TypeError):
+                logger.warning(f"Batch request {key} returned no content: {item.get('error')}")
+                results[key] = None
+        return results
+
+
+@lru_cache()
+def get_batch_client() -> BatchPredictionClient:
+    """Get cached batch client for the configured backend"""
+    settings = get_settings()
+
+    if settings.batch_backend == "gemini":
+        return GeminiBatchClient(settings.gemini_api_key)
+
+    return LocalBatchClient()
+
+
+class BatchRunner:
+    """
+    Background runner for deferred STANDARD jobs.
+    Keeps up to `max_inflight_batches` batch-prediction jobs running at once.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        max_jobs: int = 50,
+        max_inflight_batches: int = 2,
+        poll_interval: int = 60,
+        lease_seconds: int = 60,
+        heartbeat_interval: int = 20,
+    ):
+        self.settings = get_settings()
+        self.worker_id = worker_id
+        self.max_jobs = max_jobs
+        self.max_inflight_batches = max_inflight_batches
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.job_repo = AsyncAnalysisJobRepository()
+        self.youtube = YouTubeService()
+        self.analyzer = GeminiAnalyzer()
+        self.checkpoints = get_checkpoint_store()
+        self.client = get_batch_client()
+        self.running = False
+        self.batch_jobs: set[str] = set()
+        self._batch_tasks: set[asyncio.Task] = set()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, settings=None, worker_id: str = "") -> "BatchRunner":
+        """Build a bulk runner from worker settings"""
+        settings = settings or get_settings()
+        return cls(
+            worker_id=worker_id,
+            max_jobs=settings.batch_max_jobs,
+            max_inflight_batches=settings.batch_max_inflight,
+            poll_interval=settings.batch_poll_interval_seconds,
+            lease_seconds=settings.lease_seconds,
+            heartbeat_interval=settings.heartbeat_interval_seconds,
+        )
+
+    async def start(self):
+        """Start the bulk runner loop"""
+        self.running = True
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        logger.info(
+            f"Bulk runner started (max_jobs={self.max_jobs}, "
+            f"max_inflight_batches={self.max_inflight_batches}, backend={self.settings.batch_backend})"
+        )
+
+        while self.running:
+            try:
+                await self._gather_and_submit()
+            except Exception as e:
+                logger.error(f"Error in bulk runner loop: {e}")
+
+            await asyncio.sleep(self.poll_interval)
+
+    def stop(self):
+        """Stop the bulk runner loop"""
+        self.running = False
+        logger.info("Bulk runner stopping...")
+
+    async def shutdown(self):
+        """
+        Stop polling, cancel in-flight batches and release their leases back
+        to PENDING. Submitted batches keep running upstream; their names are
+        checkpointed, so the next runner to claim the jobs resumes polling them.
+        """
+        self.stop()
+
+        in_flight = list(self.batch_jobs)
+        tasks = list(self._batch_tasks)
+        if self._heartbeat_task:
+            tasks.append(self._heartbeat_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if in_flight:
+            try:
+                released = await self.job_repo.release_leases(self.worker_id, in_flight)
+                logger.info(f"Released {released} bulk jobs back to the queue")
+            except Exception as e:
+                logger.error(f"Failed to release bulk job leases (reaper will reclaim them): {e}")
+
+    async def _heartbeat_loop(self):
+        """Renew leases for every job held by an in-flight batch"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+
+            job_ids = list(self.batch_jobs)
+            if not job_ids:
+                continue
+
+            try:
+                await self.job_repo.renew_leases(self.worker_id, job_ids, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Bulk lease heartbeat failed: {e}")
+
+    async def _gather_and_submit(self):
+        """Claim deferred jobs and start a batch for them"""
+        if len(self._batch_tasks) >= self.max_inflight_batches:
+            return
+
+        deferred_jobs = await self.job_repo.get_deferred_jobs(limit=self.max_jobs)
+        claimed_jobs = []
+
+        for job in deferred_jobs:
+            claimed = await self.job_repo.claim_job(job["id"], self.worker_id, self.lease_seconds)
+            if claimed:
+                claimed_jobs.append(claimed)
+                self.batch_jobs.add(claimed["id"])
+
+        if not claimed_jobs:
+            return
+
+        task = asyncio.create_task(self._run_batch(claimed_jobs))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, jobs: list[dict]):
+        """
+        Prepare, submit (or resume), await and persist one batch.
+        Jobs leave batch_jobs as they are settled, so on error only the jobs
+        this runner still holds are requeued or failed.
+        """
+        job_ids = [job["id"] for job in jobs]
+        try:
+            prepared = {}
+            for job in jobs:
+                inputs = await self._prepare_job(job)
+                if inputs:
+                    prepared[job["id"]] = (job, *inputs)
+
+            if not prepared:
+                return
+
+            # Prompt building counts tokens for transcript compaction (API call)
+            prompts = {}
+            for job_id, (_, metadata, transcript) in prepared.items():
+                prompts[job_id] = await asyncio.to_thread(self._build_prompt, metadata, transcript)
+
+            # Jobs whose batch was submitted before a restart resume polling it
+            batches: dict[str, list[str]] = {}
+            unsubmitted = []
+            for job_id in prepared:
+                batch_name = self.checkpoints.load(job_id).get("batch")
+                if batch_name:
+                    batches.setdefault(batch_name, []).append(job_id)
+                else:
+                    unsubmitted.append(job_id)
+
+            for batch_name, batch_job_ids in batches.items():
+                logger.info(f"Resuming batch {batch_name} for {len(batch_job_ids)} jobs")
+
+            if unsubmitted:
+                requests = [BatchRequest(key=job_id, prompt=prompts[job_id]) for job_id in unsubmitted]
+                batch_name = await asyncio.to_thread(
+                    self.client.submit,
+                    self.settings.batch_model_name,
+                    requests,
+                    f"glint-bulk-{uuid.uuid4().hex[:8]}"
+                )
+                for job_id in unsubmitted:
+                    self.checkpoints.save(job_id, "batch", batch_name)
+                batches[batch_name] = unsubmitted
+                logger.info(f"Submitted batch {batch_name} with {len(requests)} jobs")
+
+            outcomes = await asyncio.gather(
+                *(
+                    self._collect_batch(batch_name, batch_job_ids, prepared, prompts)
+                    for batch_name, batch_job_ids in batches.items()
+                ),
+                return_exceptions=True
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+
+        except asyncio.CancelledError:
+            raise
+        except UpstreamUnavailable as e:
+            for job_id in job_ids:
+                if job_id in self.batch_jobs:
+                    await self._requeue_delayed(job_id, e)
+        except Exception as e:
+            logger.error(f"Batch run failed: {e}")
+            for job_id in job_ids:
+                if job_id in self.batch_jobs:
+                    await self._fail(job_id, f"Bulk analysis failed: {e}")
+        finally:
+            self.batch_jobs.difference_update(job_ids)
+
+    async def _collect_batch(self, batch_name: str, job_ids: list[str], prepared: dict, prompts: dict[str, str]):
+        """Await one submitted batch and persist its jobs' results"""
+        state = await self._await_batch(batch_name)
+        if state != BatchState.SUCCEEDED:
+            # Resubmit on the next attempt (requeues are capped by max_job_requeues)
+            logger.error(f"Batch {batch_name} ended in state {state}")
+            error = UpstreamUnavailable(Upstream.GEMINI, f"batch {batch_name} ended in state {state}")
+            for job_id in job_ids:
+                self.checkpoints.discard(job_id, "batch")
+                await self._requeue_delayed(job_id, error)
+            return
+
+        results = await asyncio.to_thread(self.client.get_results, batch_name)
+        for job_id in job_ids:
+            job, metadata, transcript = prepared[job_id]
+            await self._persist(job, metadata, transcript, results.get(job_id), prompts[job_id])
+
+    async def _prepare_job(self, job: dict) -> Optional[tuple[VideoMetadata, Optional[TranscriptResult]]]:
+        """Fetch (or resume) metadata and transcript for a job"""
+        job_id = job["id"]
+        video_id = job.get("video_id") or extract_video_id(job["video_url"])
+        checkpoint = self.checkpoints.load(job_id)
+
+        try:
+            if "metadata" in checkpoint:
+                metadata = VideoMetadata(**checkpoint["metadata"])
+            else:
+                metadata = await asyncio.to_thread(self.youtube.get_video_metadata, video_id)
+                if not metadata:
+                    raise Exception(f"Failed to fetch video metadata for {video_id}")
+                self.checkpoints.save(job_id, "metadata", asdict(metadata))
+
+            if "transcript" in checkpoint:
+                saved = checkpoint["transcript"]
+                transcript = TranscriptResult(**saved) if saved else None
+            else:
+                transcript = await asyncio.to_thread(self.youtube.get_transcript, video_id)
+                self.checkpoints.save(job_id, "transcript", asdict(transcript) if transcript else None)
+
+            await self.job_repo.update_progress(job_id, 40)
+            return metadata, transcript
+
+        except UpstreamUnavailable as e:
+            await self._requeue_delayed(job_id, e)
+            return None
+        except Exception as e:
+            await self._fail(job_id, str(e))
+            return None
+
+    def _build_prompt(self, metadata: VideoMetadata, transcript: Optional[TranscriptResult]) -> str:
+        """Standard prompt, or the metadata-only fallback without a transcript"""
+        if transcript:
+            return self.analyzer.build_standard_prompt(metadata, transcript)
+        return self.analyzer.build_metadata_prompt(metadata)
+
+    async def _await_batch(self, batch_name: str) -> str:
+        """Poll a batch until it reaches a terminal state"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+
+            try:
+                state = await asyncio.to_thread(self.client.get_state, batch_name)
+            except UpstreamUnavailable as e:
+                # The batch keeps running upstream; try again next interval
+                logger.warning(f"Polling batch {batch_name} failed: {e}")
+                continue
+            if state in BatchState.TERMINAL:
+                return state
+
+    async def _persist(
+        self,
+        job: dict,
+        metadata: VideoMetadata,
+        transcript: Optional[TranscriptResult],
+        text: Optional[str],
+        prompt: str
+    ):
+        """Parse one batch response and save it, or fail the job"""
+        job_id = job["id"]
+        analysis = None
+        if text:
+            # Missing fields are regenerated with a small synchronous request,
+            # routed like the original request would have been
+            analysis = await asyncio.to_thread(
+                self.analyzer.parse_response,
+                text,
+                contents=prompt,
+                routes=self.analyzer.router.route("STANDARD", metadata.duration_seconds, len(prompt))
+            )
+
+        if not analysis:
+            await self._fail(job_id, "Analysis returned empty result")
+            return
+
+        try:
+            result_id = await self.job_repo.finalize_job(
+                job_id=job_id,
+                video_id=metadata.video_id,
+                video_url=job["video_url"],
+                mode=job["mode"],
+                result_json=analysis.to_result_json(),
+                video_title=metadata.title,
+                video_thumbnail=metadata.thumbnail,
+                video_duration_seconds=metadata.duration_seconds,
+                transcript=transcript.text if transcript else None,
+                worker_id=self.worker_id
+            )
+            if not result_id:
+                raise Exception("Failed to save analysis result")
+
+            self.batch_jobs.discard(job_id)
+            self.checkpoints.clear(job_id)
+            logger.info(f"Bulk job {job_id} completed with result {result_id}")
+        except Exception as e:
+            await self._fail(job_id, str(e))
+
+    async def _requeue_delayed(self, job_id: str, error: UpstreamUnavailable):
+        """Put a bulk job hit by an upstream outage back to PENDING until the delay passes"""
+        self.batch_jobs.discard(job_id)
+        delay = max(self.settings.requeue_delay_seconds, math.ceil(error.retry_after))
+        logger.warning(f"Requeueing bulk job {job_id} in {delay}s: {error}")
+        try:
+            outcome = await self.job_repo.requeue_job(
+                job_id, self.worker_id, delay, str(error), self.settings.max_job_requeues
+            )
+            if outcome == "FAILED":
+                logger.error(f"Bulk job {job_id} failed after {self.settings.max_job_requeues} requeues")
+        except Exception as requeue_error:
+            logger.error(f"Failed to requeue job {job_id} (reaper will reclaim it): {requeue_error}")
+
+    async def _fail(self, job_id: str, error_message: str):
+        """Mark a bulk job failed and refund its credits, if this runner still holds its lease"""
+        self.batch_jobs.discard(job_id)
+        logger.error(f"Bulk job {job_id} failed: {error_message}")
+        try:
+            await self.job_repo.fail_and_refund_job(job_id, error_message, "ANALYSIS_006", worker_id=self.worker_id)
+        except Exception as fail_error:
+            logger.error(f"Failed to mark job {job_id} as failed: {fail_error}")
@@ -0,0 +1,38 @@
+"""
+Cooperative Job Cancellation
+Tokens that JobRunner threads through process_job so a running job can be
+stopped between stages and inside long downloads/uploads.
+"""
+import threading
+
+
+class JobCancelled(Exception):
+    """Raised when a job notices its cancellation token has been set"""
+    pass
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation flag.
+
+    Blocking stages run in worker threads (yt-dlp hooks, Gemini upload polling),
+    so the flag is a threading.Event rather than an asyncio primitive.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds, waking early on cancel. Returns True if cancelled."""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise JobCancelled("Job was cancelled")
@@ -0,0 +1,162 @@
+"""
+Job Stage Checkpoints
+Persists each stage's output per job so a retried job resumes from the last
+completed stage instead of re-fetching from YouTube or re-running Gemini.
+
+Backends:
+1. Local - One JSON file per job under `checkpoint_path` (can be a shared volume),
+            updated under an flock so runner processes don't lose writes
+2. Redis - One hash per job in `redis_url`, shared across workers
+"""
+import os
+import json
+import time
+import logging
+from abc import ABC, abstractmethod
+from typing import Any
+from functools import lru_cache
+
+from ..core.config import get_settings
+from .file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore(ABC):
+    """Base interface for per-job stage checkpoints"""
+
+    @abstractmethod
+    def load(self, job_id: str) -> dict[str, Any]:
+        """Get all completed stages for a job as {stage: payload}"""
+
+    @abstractmethod
+    def save(self, job_id: str, stage: str, payload: Any) -> None:
+        """Record a completed stage's output (must be JSON-serializable)"""
+
+    @abstractmethod
+    def discard(self, job_id: str, stage: str) -> None:
+        """Forget a single stage (e.g. when its output is no longer usable)"""
+
+    @abstractmethod
+    def clear(self, job_id: str) -> None:
+        """Remove all checkpoints for a job"""
+
+    def prune_expired(self) -> int:
+        """Remove checkpoints older than the TTL. Returns number removed."""
+        return 0
+
+
+class LocalCheckpointStore(CheckpointStore):
+    """Filesystem-backed checkpoints: {base_path}/{job_id}.json"""
+
+    LOCK_NAME = ".lock"
+
+    def __init__(self, base_path: str, ttl_seconds: int):
+        self.base_path = base_path
+        self.ttl_seconds = ttl_seconds
+        self.lock_path = os.path.join(base_path, self.LOCK_NAME)
+        os.makedirs(base_path, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.base_path, f"{job_id}.json")
+
+    def load(self, job_id: str) -> dict[str, Any]:
+        path = self._path(job_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                self.clear(job_id)
+                return {}
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint for job {job_id}: {e}")
+            return {}
+
+    def _write(self, job_id: str, data: dict[str, Any]) -> None:
+        # Write to a temp file and rename so readers never see a partial file
+        path = self._path(job_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def save(self, job_id: str, stage: str, payload: Any) -> None:
+        with file_lock(self.lock_path):
+            data = self.load(job_id)
+            data[stage] = payload
+            self._write(job_id, data)
+
+    def discard(self, job_id: str, stage: str) -> None:
+        with file_lock(self.lock_path):
+            data = self.load(job_id)
+            if stage in data:
+                del data[stage]
+                self._write(job_id, data)
+
+    def clear(self, job_id: str) -> None:
+        try:
+            os.remove(self._path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def prune_expired(self) -> int:
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.base_path):
+            if name == self.LOCK_NAME:
+                continue
+            path = os.path.join(self.base_path, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+class RedisCheckpointStore(CheckpointStore):
+    """Redis-backed checkpoints: hash `glint:checkpoint:{job_id}` with field per stage"""
+
+    KEY_PREFIX = "glint:checkpoint:"
+
+    def __init__(self, redis_url: str, ttl_seconds: int):
+        import redis
+        self.redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}"
+
+    def load(self, job_id: str) -> dict[str, Any]:
+        raw = self.redis.hgetall(self._key(job_id))
+        return {stage: json.loads(value) for stage, value in raw.items()}
+
+    def save(self, job_id: str, stage: str, payload: Any) -> None:
+        key = self._key(job_id)
+        pipe = self.redis.pipeline()
+        pipe.hset(key, stage, json.dumps(payload, ensure_ascii=False))
+        pipe.expire(key, self.ttl_seconds)  # Redis handles expiry, no pruning needed
+        pipe.execute()
+
+    def discard(self, job_id: str, stage: str) -> None:
+        self.redis.hdel(self._key(job_id), stage)
+
+    def clear(self, job_id: str) -> None:
+        self.redis.delete(self._key(job_id))
+
+
+@lru_cache()
+def get_checkpoint_store() -> CheckpointStore:
+    """Get cached checkpoint store for the configured backend"""
+    settings = get_settings()
+
+    if settings.checkpoint_backend == "redis" and settings.redis_url:
+        return RedisCheckpointStore(settings.redis_url, settings.checkpoint_ttl_seconds)
+
+    return LocalCheckpointStore(
+        settings.checkpoint_path or os.path.join(settings.temp_storage_path, "checkpoints"),
+        settings.checkpoint_ttl_seconds
+    )
@@ -0,0 +1,120 @@
+"""
+Upstream Circuit Breakers
+One breaker per upstream (YouTube, Gemini) so an outage fails jobs fast
+instead of every job waiting out its own timeouts and retries.
+
+States:
+1. closed    - Calls go through; consecutive transient failures are counted
+2. open      - After `circuit_failure_threshold` failures, calls raise
+               CircuitOpen until `circuit_open_seconds` have passed
+3. half-open - One trial call goes through; success closes the breaker,
+               failure opens it again
+
+Both CircuitOpen and transient upstream errors raise UpstreamUnavailable,
+which the job processor turns into a delayed requeue (PENDING with
+not_before) rather than a failed, refunded job. Breakers are per process.
+"""
+import time
+import logging
+import threading
+from functools import lru_cache
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Upstream:
+    """Upstream service names"""
+    YOUTUBE = "youtube"
+    GEMINI = "gemini"
+
+
+class UpstreamUnavailable(Exception):
+    """An upstream failed transiently; the job should be retried later"""
+
+    def __init__(self, upstream: str, message: str, retry_after: float = 0):
+        super().__init__(f"{upstream} unavailable: {message}")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class CircuitOpen(UpstreamUnavailable):
+    """The upstream's breaker is open; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, open_seconds: float = 60.0):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.open_seconds = open_seconds
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_started_at = 0.0  # Half-open trial in flight (0 = none)
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def check(self) -> None:
+        """Raise CircuitOpen unless a call may go through now"""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+
+            remaining = self._opened_at + self.open_seconds - now
+            if self._state == self.OPEN and remaining > 0:
+                raise CircuitOpen(self.name, "circuit open", retry_after=remaining)
+
+            # Half-open: let one trial through (a lost trial expires after open_seconds)
+            if self._trial_started_at and now - self._trial_started_at < self.open_seconds:
+                raise CircuitOpen(self.name, "circuit half-open, trial in progress", retry_after=self.open_seconds)
+            self._state = self.HALF_OPEN
+            self._trial_started_at = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self.failures = 0
+            self._trial_started_at = 0.0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(
+                        f"Circuit for {self.name} opened after {self.failures} failures "
+                        f"({self.open_seconds:.0f}s)"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_started_at = 0.0
+
+    def stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures}
+
+
+@lru_cache()
+def get_circuit_breaker(upstream: str) -> CircuitBreaker:
+    """Get the process-wide breaker for an upstream"""
+    settings = get_settings()
+    return CircuitBreaker(
+        upstream,
+        failure_threshold=settings.circuit_failure_threshold,
+        open_seconds=settings.circuit_open_seconds,
+    )
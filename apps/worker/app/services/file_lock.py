@@ -0,0 +1,34 @@
+"""
+File Locks
+Advisory cross-process locks for the file-backed stores (checkpoints, upload
+registry), which several runner processes may update at the same time. Uses
+fcntl.flock on a separate lock file; on platforms without fcntl the lock is
+a no-op.
+"""
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on `path` for the duration of the block.
+    Each call opens its own descriptor, so it also excludes threads of the
+    same process (and must not be nested for the same path).
+    """
+    if fcntl is None:
+        yield
+        return
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # Closing the descriptor releases the lock
@@ -4,15 +4,24 @@ Uses Google's Gemini API for video content analysis
 """
 import os
 import json
+import time
 import logging
-from typing import Optional
+import threading
+from collections import Counter
+from typing import Callable, Optional
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 from ..core.config import get_settings
 from .youtube_service import VideoMetadata, TranscriptResult
+from .cancellation import CancellationToken, JobCancelled
+from .transcript_compactor import compact_transcript, fit_to_token_budget
+from .model_router import ModelRoute, get_model_router
+from .circuit_breaker import Upstream, UpstreamUnavailable, get_circuit_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +36,21 @@ class AnalysisResult:
     keywords: list[str]
     visual_audit: Optional[list[dict]] = None  # Deep Mode only
 
+    def to_result_json(self) -> dict:
+        """Convert to the result_json shape stored in analysis_results"""
+        result_json = {
+            "title": self.title,
+            "summary": self.summary,
+            "keyTakeaways": self.key_takeaways,
+            "timeline": self.timeline,
+            "keywords": self.keywords,
+        }
+
+        if self.visual_audit:
+            result_json["visualAudit"] = self.visual_audit
+
+        return result_json
+
 
 # System prompts for analysis
 STANDARD_ANALYSIS_PROMPT = """You are an expert video content analyst. Analyze the following video transcript and provide a comprehensive analysis.
@@ -124,6 +148,265 @@ IMPORTANT:
 
 Respond ONLY with valid JSON, no additional text."""
 
+# Prepended to DEEP_ANALYSIS_PROMPT for each segment of a long video
+DEEP_SEGMENT_CONTEXT = """This clip is part {part} of {parts} of the video and covers {start} to {end} of it.
+Analyze only this clip. All timestamps must be relative to the start of this clip (00:00 in the clip is {start} in the video).
+
+"""
+
+# Combines per-segment analyses into the overall title, summary and takeaways
+DEEP_MERGE_PROMPT = """You are combining analyses of consecutive parts of one video into a single analysis.
+
+VIDEO INFORMATION:
+- Title: {title}
+- Channel: {channel}
+- Duration: {duration}
+
+PART ANALYSES:
+{parts}
+
+Write the overall "title", a comprehensive 3-4 paragraph "summary" of the whole video and the 10-15 most important "keyTakeaways" across all parts, in the same language as the part analyses."""
+
+MAX_MERGED_KEYWORDS = 15
+MAX_MERGED_TAKEAWAYS = 15
+
+
+# Base generation configs; model names and max_output_tokens come from the router
+FLASH_GENERATION_CONFIG = {
+    "temperature": 0.3,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 8192,
+    "response_mime_type": "application/json",  # JSON mode: no fences or prose around the object
+}
+
+# Thinking models don't support JSON mode; their output relies on repair_json
+PRO_GENERATION_CONFIG = {
+    "temperature": 0.4,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 16384,
+}
+
+# Gemini errors that mean the service is failing, not the request
+TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+
+SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+}
+
+
+# Fields published as a partial result while the rest is still streaming
+PARTIAL_RESULT_FIELDS = ("title", "summary")
+
+# Response schema per result field, used to regenerate only missing fields
+FIELD_SCHEMAS = {
+    "title": {"type": "STRING"},
+    "summary": {"type": "STRING"},
+    "keyTakeaways": {"type": "ARRAY", "items": {"type": "STRING"}},
+    "timeline": {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "timestamp": {"type": "STRING"},
+                "description": {"type": "STRING"},
+                "details": {"type": "ARRAY", "items": {"type": "STRING"}},
+            },
+            "required": ["timestamp", "description"],
+        },
+    },
+    "keywords": {"type": "ARRAY", "items": {"type": "STRING"}},
+    "visualAudit": {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "timestamp": {"type": "STRING"},
+                "detail": {"type": "STRING"},
+                "type": {"type": "STRING"},
+            },
+            "required": ["timestamp", "detail", "type"],
+        },
+    },
+}
+
+STANDARD_FIELDS = ("title", "summary", "keyTakeaways", "timeline", "keywords")
+
+REGENERATE_FIELDS_PROMPT = """Your previous response was cut off or malformed. These fields were recovered:
+{recovered}
+
+Provide ONLY the following missing fields as a JSON object, consistent with the recovered fields and in the same language: {missing}"""
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing } or ], leaving string values untouched"""
+    chars = list(text)
+    in_string = escaped = False
+    comma = -1  # Index of a comma that may turn out to be trailing
+
+    for index, char in enumerate(chars):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            comma = -1
+        elif char == ",":
+            comma = index
+        elif char in "}]":
+            if comma >= 0:
+                chars[comma] = ""
+            comma = -1
+        elif char not in " \t\r\n":
+            comma = -1
+
+    return "".join(chars)
+
+
+def _scan_object(text: str, salvage_arrays: bool = False) -> dict:
+    """
+    Decode the top-level members of a JSON object one at a time, keeping every
+    member that is complete and stopping at the first one that isn't.
+
+    With salvage_arrays, an array cut off mid-way keeps its complete elements.
+    """
+    decoder = json.JSONDecoder()
+    found: dict = {}
+
+    # Skip a leading markdown code fence or prose if present
+    start = text.find("{")
+    if start < 0:
+        return found
+    pos = start + 1
+
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "}":
+            break
+
+        try:
+            key, pos = decoder.raw_decode(text, pos)
+            while pos < len(text) and text[pos] in " \t\r\n":
+                pos += 1
+            if pos >= len(text) or text[pos] != ":":
+                break
+            pos += 1
+            while pos < len(text) and text[pos] in " \t\r\n":
+                pos += 1
+        except json.JSONDecodeError:
+            break  # Key not fully streamed yet
+
+        try:
+            value, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            if salvage_arrays and pos < len(text) and text[pos] == "[":
+                items = _scan_array(text, pos)
+                if items:
+                    found[key] = items
+            break  # Member not fully streamed yet
+
+        found[key] = value
+
+    return found
+
+
+def _scan_array(text: str, pos: int) -> list:
+    """Decode the complete elements of an array starting at text[pos] == '['"""
+    decoder = json.JSONDecoder()
+    items: list = []
+    pos += 1
+
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            break
+        try:
+            item, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        items.append(item)
+
+    return items
+
+
+def extract_complete_fields(text: str, fields: tuple[str, ...]) -> dict:
+    """
+    Extract the requested top-level fields that are already complete in a
+    partially streamed JSON object. Stops at the first incomplete member.
+    """
+    return {key: value for key, value in _scan_object(text).items() if key in fields}
+
+
+def repair_json(text: str) -> Optional[dict]:
+    """
+    Parse a near-valid JSON object from model output.
+
+    Handles markdown fences, surrounding prose, trailing commas and output
+    truncated mid-object (e.g. at max_output_tokens), in which case only the
+    members that were completed are returned. None if nothing is recoverable.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    decoder = json.JSONDecoder()
+    candidate = text[start:]
+    for attempt in (candidate, _strip_trailing_commas(candidate)):
+        try:
+            data, _ = decoder.raw_decode(attempt)
+            if isinstance(data, dict):
+                return data
+        except json.JSONDecodeError:
+            pass
+
+    data = _scan_object(_strip_trailing_commas(candidate), salvage_arrays=True)
+    return data or None
+
+
+def _chunk_text(chunk) -> str:
+    """
+    Text of a streamed chunk. chunk.text raises on chunks without parts (a
+    final chunk cut off at MAX_TOKENS, a safety block), which would discard the
+    whole stream; those count as empty and repair_json handles the truncation.
+    """
+    try:
+        parts = chunk.candidates[0].content.parts
+    except (AttributeError, IndexError):
+        return ""
+    return "".join(getattr(part, "text", "") or "" for part in parts)
+
+
+def missing_fields(data: dict, include_visual: bool = False) -> list[str]:
+    """List result fields that are absent, empty or of the wrong type"""
+    missing = []
+    for field in STANDARD_FIELDS:
+        value = data.get(field)
+        expected = str if FIELD_SCHEMAS[field]["type"] == "STRING" else list
+        if not isinstance(value, expected) or not value:
+            missing.append(field)
+
+    # An empty visual audit is legitimate (nothing notable on screen)
+    if include_visual and not isinstance(data.get("visualAudit"), list):
+        missing.append("visualAudit")
+
+    return missing
+
 
 class GeminiAnalyzer:
     """Gemini-based video content analyzer"""
@@ -132,71 +415,172 @@ class GeminiAnalyzer:
         self.settings = get_settings()
         genai.configure(api_key=self.settings.gemini_api_key)
 
-        # Model configurations
-        self.flash_model = genai.GenerativeModel(
-            model_name="gemini-2.0-flash-exp",
-            generation_config={
-                "temperature": 0.3,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 8192,
-            },
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-            }
-        )
+        # Models are created on first use; the router picks one per request
+        self.router = get_model_router()
+        self.breaker = get_circuit_breaker(Upstream.GEMINI)
+        self._models: dict[str, genai.GenerativeModel] = {}
 
-        self.pro_model = genai.GenerativeModel(
-            model_name="gemini-2.0-flash-thinking-exp-01-21",
-            generation_config={
-                "temperature": 0.4,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 16384,
-            },
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-            }
-        )
+        # Limits concurrent segment generations across all jobs in this process
+        self._segment_slots = threading.BoundedSemaphore(self.settings.deep_segment_concurrency)
+
+    def _model(self, model_name: str) -> genai.GenerativeModel:
+        if model_name not in self._models:
+            self._models[model_name] = genai.GenerativeModel(
+                model_name=model_name,
+                safety_settings=SAFETY_SETTINGS
+            )
+        return self._models[model_name]
+
+    def _generation_config(self, route: ModelRoute, extra: Optional[dict] = None) -> dict:
+        """Base config for the route's tier with its output budget and JSON mode support"""
+        config = dict(PRO_GENERATION_CONFIG if route.tier == "deep" else FLASH_GENERATION_CONFIG)
+        config["max_output_tokens"] = route.max_output_tokens
+        if route.json_mode:
+            config["response_mime_type"] = "application/json"
+        else:
+            config.pop("response_mime_type", None)
+        config.update(extra or {})
+        return config
+
+    def _generate(
+        self,
+        routes: list[ModelRoute],
+        contents: str | list,
+        on_partial: Optional[Callable[[dict], None]] = None,
+        extra_config: Optional[dict] = None
+    ) -> str:
+        """
+        Generate with the first route, spilling over to the next one when a
+        model answers 429 / RESOURCE_EXHAUSTED.
+
+        Raises UpstreamUnavailable when every route is exhausted, Gemini
+        answers 5xx / times out, or the Gemini circuit breaker is open.
+        """
+        self.breaker.check()
+        last_error: Optional[Exception] = None
+
+        for route in routes:
+            model = self._model(route.model_name)
+            config = self._generation_config(route, extra_config)
+            self.router.record_request(route.model_name)
+
+            try:
+                if on_partial:
+                    text = self._generate_streaming(model, contents, config, on_partial)
+                else:
+                    text = model.generate_content(contents, generation_config=config).text
+            except google_exceptions.ResourceExhausted as e:
+                self.router.record_rate_limited(route.model_name)
+                last_error = e
+                continue
+            except TRANSIENT_ERRORS as e:
+                self.breaker.record_failure()
+                raise UpstreamUnavailable(Upstream.GEMINI, str(e))
+
+            self.breaker.record_success()
+            return text
+
+        if isinstance(last_error, google_exceptions.ResourceExhausted):
+            self.breaker.record_failure()
+            raise UpstreamUnavailable(
+                Upstream.GEMINI, str(last_error),
+                retry_after=self.settings.router_rate_limit_cooldown_seconds
+            )
+        raise last_error or Exception("No model routes available")
 
     def analyze_standard(
         self,
         metadata: VideoMetadata,
-        transcript: TranscriptResult
+        transcript: TranscriptResult,
+        on_partial: Optional[Callable[[dict], None]] = None
     ) -> Optional[AnalysisResult]:
         """
         Perform Standard Mode analysis using transcript only.
-        Uses Gemini Flash for fast processing.
+        Short videos are routed to the fast tier (see ModelRouter).
+
+        With on_partial, the response is streamed and on_partial is called once
+        with {"title", "summary"} as soon as both fields are complete, while the
+        timeline and takeaways are still generating.
+
+        Fields missing from a truncated response are regenerated separately
+        (see parse_response).
         """
         try:
-            # Format duration
-            duration_str = self._format_duration(metadata.duration_seconds)
+            prompt = self.build_standard_prompt(metadata, transcript)
+            routes = self.router.route("STANDARD", metadata.duration_seconds, len(prompt))
 
-            prompt = STANDARD_ANALYSIS_PROMPT.format(
-                title=metadata.title,
-                channel=metadata.channel,
-                duration=duration_str,
-                transcript=transcript.text[:50000]  # Limit transcript length
-            )
+            text = self._generate(routes, prompt, on_partial=on_partial)
 
-            response = self.flash_model.generate_content(prompt)
-
-            if not response.text:
-                logger.error("Empty response from Gemini Flash")
+            if not text:
+                logger.error("Empty response from Gemini (standard)")
                 return None
 
-            return self._parse_response(response.text)
+            return self.parse_response(text, contents=prompt, routes=routes)
 
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Standard analysis failed: {e}")
             return None
 
+    def _generate_streaming(
+        self,
+        model: genai.GenerativeModel,
+        contents: str | list,
+        config: dict,
+        on_partial: Callable[[dict], None]
+    ) -> str:
+        """Stream a generation, publishing early fields once, and return the full text"""
+        chunks: list[str] = []
+        published = False
+
+        for chunk in model.generate_content(contents, generation_config=config, stream=True):
+            chunks.append(_chunk_text(chunk))
+
+            if published:
+                continue
+
+            partial = extract_complete_fields("".join(chunks), PARTIAL_RESULT_FIELDS)
+            if len(partial) == len(PARTIAL_RESULT_FIELDS):
+                published = True
+                try:
+                    on_partial(partial)
+                except Exception as e:
+                    logger.warning(f"Failed to publish partial result: {e}")
+
+        return "".join(chunks)
+
+    def build_standard_prompt(self, metadata: VideoMetadata, transcript: TranscriptResult) -> str:
+        """Build the Standard Mode prompt for a transcript"""
+        return STANDARD_ANALYSIS_PROMPT.format(
+            title=metadata.title,
+            channel=metadata.channel,
+            duration=self._format_duration(metadata.duration_seconds),
+            transcript=self.prepare_transcript(transcript)
+        )
+
+    def prepare_transcript(self, transcript: TranscriptResult) -> str:
+        """
+        Compact a transcript and fit it to the token budget, measured with
+        the standard tier model's token counter rather than a fixed character cut.
+        """
+        blocks = compact_transcript(transcript.text)
+        text = fit_to_token_budget(
+            blocks,
+            self.settings.transcript_token_budget,
+            lambda t: self._model(self.settings.router_standard_model).count_tokens(t).total_tokens
+        )
+        logger.info(f"Compacted transcript from {len(transcript.text)} to {len(text)} chars")
+        return text
+
+    def build_metadata_prompt(self, metadata: VideoMetadata) -> str:
+        """Build the metadata-only fallback prompt"""
+        return METADATA_ANALYSIS_PROMPT.format(
+            title=metadata.title,
+            channel=metadata.channel,
+            duration=self._format_duration(metadata.duration_seconds)
+        )
+
     def analyze_metadata_only(
         self,
         metadata: VideoMetadata
@@ -206,22 +590,19 @@ class GeminiAnalyzer:
         Uses just the video title and channel to provide basic insights.
         """
         try:
-            duration_str = self._format_duration(metadata.duration_seconds)
+            prompt = self.build_metadata_prompt(metadata)
+            routes = self.router.route("METADATA", metadata.duration_seconds, len(prompt))
 
-            prompt = METADATA_ANALYSIS_PROMPT.format(
-                title=metadata.title,
-                channel=metadata.channel,
-                duration=duration_str
-            )
-
-            response = self.flash_model.generate_content(prompt)
+            text = self._generate(routes, prompt)
 
-            if not response.text:
-                logger.error("Empty response from Gemini Flash (metadata-only)")
+            if not text:
+                logger.error("Empty response from Gemini (metadata-only)")
                 return None
 
-            return self._parse_response(response.text)
+            return self.parse_response(text, contents=prompt, routes=routes)
 
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Metadata-only analysis failed: {e}")
             return None
@@ -233,23 +614,110 @@ class GeminiAnalyzer:
     ) -> Optional[AnalysisResult]:
         """
         Perform Deep Mode analysis using actual video file.
-        Uses Gemini Pro with video understanding capabilities.
+        Uses the deep tier model with video understanding capabilities.
         """
+        file_name = self.upload_video(video_path)
+
+        if not file_name:
+            return None
+
+        return self.analyze_uploaded_video(metadata, file_name)
+
+    def upload_video(
+        self,
+        video_path: str,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Optional[str]:
+        """
+        Upload a local video to Gemini and wait until it is ready.
+        Returns the Gemini file name, which can be checkpointed and reused.
+        The local file is removed once the upload has succeeded or failed for
+        good; after a cancel or an upstream outage it is kept for the caller
+        (a requeued job resumes from its checkpointed download).
+
+        If cancel_token is set, the remote file is deleted as soon as the
+        upload call returns and JobCancelled is raised.
+        """
+        video_file = None
+        keep_local = False
         try:
+            self.breaker.check()
+
             # Upload video to Gemini
             logger.info(f"Uploading video for deep analysis: {video_path}")
             video_file = genai.upload_file(path=video_path)
 
             # Wait for file to be processed
-            import time
             while video_file.state.name == "PROCESSING":
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
                 time.sleep(5)
                 video_file = genai.get_file(video_file.name)
 
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+
             if video_file.state.name == "FAILED":
                 logger.error("Video upload failed")
                 return None
 
+            self.breaker.record_success()
+            return video_file.name
+
+        except (JobCancelled, UpstreamUnavailable):
+            keep_local = True
+            if video_file is not None:
+                self.delete_upload(video_file.name)
+            raise
+        except TRANSIENT_ERRORS as e:
+            logger.error(f"Video upload failed: {e}")
+            keep_local = True
+            if video_file is not None:
+                self.delete_upload(video_file.name)
+            self.breaker.record_failure()
+            raise UpstreamUnavailable(Upstream.GEMINI, str(e))
+        except Exception as e:
+            logger.error(f"Video upload failed: {e}")
+            return None
+        finally:
+            # Clean up local video file
+            if not keep_local and os.path.exists(video_path):
+                try:
+                    os.remove(video_path)
+                except Exception:
+                    pass
+
+    def delete_upload(self, file_name: str) -> None:
+        """Delete an uploaded Gemini file, ignoring errors"""
+        try:
+            genai.delete_file(file_name)
+        except Exception:
+            pass  # Ignore cleanup errors
+
+    def is_upload_active(self, file_name: str) -> bool:
+        """Check whether a previously uploaded Gemini file is still usable"""
+        try:
+            return genai.get_file(file_name).state.name == "ACTIVE"
+        except Exception:
+            return False
+
+    def analyze_uploaded_video(
+        self,
+        metadata: VideoMetadata,
+        file_name: str,
+        keep_upload: bool = False
+    ) -> Optional[AnalysisResult]:
+        """
+        Run Deep Mode analysis against an already uploaded Gemini file.
+        The uploaded file is deleted only after a successful generation,
+        so a failed attempt can be retried without uploading again.
+
+        With keep_upload, the file is left in place for reuse by later jobs
+        (see UploadRegistry) and expires on Gemini's side instead.
+        """
+        try:
+            video_file = genai.get_file(file_name)
+
             # Format duration
             duration_str = self._format_duration(metadata.duration_seconds)
 
@@ -260,59 +728,296 @@ class GeminiAnalyzer:
             )
 
             # Generate analysis with video
-            response = self.pro_model.generate_content([video_file, prompt])
+            contents = [video_file, prompt]
+            routes = self.router.route("DEEP", metadata.duration_seconds)
+            text = self._generate(routes, contents)
 
-            # Clean up uploaded file
-            try:
-                genai.delete_file(video_file.name)
-            except Exception:
-                pass  # Ignore cleanup errors
-
-            if not response.text:
-                logger.error("Empty response from Gemini Pro")
+            if not text:
+                logger.error("Empty response from Gemini (deep)")
                 return None
 
-            return self._parse_response(response.text, include_visual=True)
+            # Parse before cleanup: regenerating missing fields needs the video
+            result = self.parse_response(text, include_visual=True, contents=contents, routes=routes)
+
+            # Clean up uploaded file
+            if not keep_upload:
+                self.delete_upload(video_file.name)
+
+            return result
 
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Deep analysis failed: {e}")
             return None
-        finally:
-            # Clean up local video file
-            if os.path.exists(video_path):
-                try:
-                    os.remove(video_path)
-                except Exception:
-                    pass
 
-    def _parse_response(self, text: str, include_visual: bool = False) -> Optional[AnalysisResult]:
-        """Parse JSON response from Gemini"""
+    def analyze_segments(
+        self,
+        metadata: VideoMetadata,
+        segments: list[dict],
+        done: Optional[dict[int, AnalysisResult]] = None,
+        on_result: Optional[Callable[[int, AnalysisResult], None]] = None
+    ) -> Optional[AnalysisResult]:
+        """
+        Run Deep Mode analysis on the uploaded segments of a long video in
+        parallel and merge them. Each segment is {"file_name", "start", "end"}
+        (seconds into the video); segment timestamps are shifted by "start".
+
+        Segments in `done` (index -> result from an earlier attempt) are not
+        analyzed again, and on_result(index, result) is called as each segment
+        finishes so a retry can reuse it. Returns None unless every segment
+        succeeded, so a Deep result never silently skips part of the video.
+        UpstreamUnavailable is raised only after the other segments finish.
+
+        Segment uploads are deleted once the merged result is ready.
+        """
+        results = dict(done or {})
+        remaining = [index for index in range(len(segments)) if index not in results]
+        unavailable: Optional[UpstreamUnavailable] = None
+
+        if remaining:
+            with ThreadPoolExecutor(max_workers=len(remaining)) as pool:
+                futures = {
+                    pool.submit(self._analyze_segment, metadata, index, len(segments), segments[index]): index
+                    for index in remaining
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        result = future.result()
+                    except UpstreamUnavailable as e:
+                        unavailable = unavailable or e
+                        continue
+                    if result:
+                        results[index] = result
+                        if on_result:
+                            on_result(index, result)
+
+        if unavailable:
+            raise unavailable
+        if len(results) < len(segments):
+            logger.error(f"Deep analysis failed for {len(segments) - len(results)} of {len(segments)} segments")
+            return None
+
+        merged = self._merge_segments(metadata, [results[index] for index in range(len(segments))])
+
+        for segment in segments:
+            self.delete_upload(segment["file_name"])
+
+        return merged
+
+    def _analyze_segment(
+        self,
+        metadata: VideoMetadata,
+        index: int,
+        count: int,
+        segment: dict
+    ) -> Optional[AnalysisResult]:
+        """Analyze one uploaded segment and shift its timestamps into video time"""
+        offset = int(segment["start"])
         try:
-            # Clean up response - remove markdown code blocks if present
-            cleaned = text.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:]
-            if cleaned.startswith("```"):
-                cleaned = cleaned[3:]
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3]
-            cleaned = cleaned.strip()
-
-            data = json.loads(cleaned)
-
-            return AnalysisResult(
-                title=data.get("title", ""),
-                summary=data.get("summary", ""),
-                key_takeaways=data.get("keyTakeaways", []),
-                timeline=data.get("timeline", []),
-                keywords=data.get("keywords", []),
-                visual_audit=data.get("visualAudit") if include_visual else None
+            video_file = genai.get_file(segment["file_name"])
+
+            prompt = DEEP_SEGMENT_CONTEXT.format(
+                part=index + 1,
+                parts=count,
+                start=self._format_duration(offset),
+                end=self._format_duration(int(segment["end"]))
+            ) + DEEP_ANALYSIS_PROMPT.format(
+                title=metadata.title,
+                channel=metadata.channel,
+                duration=self._format_duration(metadata.duration_seconds)
+            )
+
+            contents = [video_file, prompt]
+            routes = self.router.route("DEEP", int(segment["end"]) - offset)
+
+            with self._segment_slots:
+                text = self._generate(routes, contents)
+                result = self.parse_response(
+                    text, include_visual=True, contents=contents, routes=routes
+                ) if text else None
+
+            if not result:
+                return None
+
+            result.timeline = self._offset_timestamps(result.timeline, offset)
+            result.visual_audit = self._offset_timestamps(result.visual_audit or [], offset)
+            return result
+
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            logger.error(f"Deep analysis of segment {index + 1}/{count} failed: {e}")
+            return None
+
+    def _merge_segments(self, metadata: VideoMetadata, results: list[AnalysisResult]) -> AnalysisResult:
+        """Concatenate timelines/visual audits and synthesize the overall title, summary and takeaways"""
+        keyword_counts = Counter(keyword for result in results for keyword in result.keywords)
+
+        merged = AnalysisResult(
+            title=metadata.title,
+            summary="\n\n".join(result.summary for result in results if result.summary),
+            key_takeaways=[t for result in results for t in result.key_takeaways][:MAX_MERGED_TAKEAWAYS],
+            timeline=[entry for result in results for entry in result.timeline],
+            keywords=[keyword for keyword, _ in keyword_counts.most_common(MAX_MERGED_KEYWORDS)],
+            visual_audit=[entry for result in results for entry in (result.visual_audit or [])],
+        )
+
+        schema = {
+            "type": "OBJECT",
+            "properties": {field: FIELD_SCHEMAS[field] for field in ("title", "summary", "keyTakeaways")},
+            "required": ["title", "summary", "keyTakeaways"],
+        }
+        prompt = DEEP_MERGE_PROMPT.format(
+            title=metadata.title,
+            channel=metadata.channel,
+            duration=self._format_duration(metadata.duration_seconds),
+            parts="\n\n".join(
+                json.dumps(
+                    {"summary": result.summary, "keyTakeaways": result.key_takeaways},
+                    ensure_ascii=False
+                )
+                for result in results
             )
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Gemini response: {e}")
+        )
+        # Route by the whole video, so a long one doesn't land on the fast tier
+        routes = [
+            route for route in self.router.route("STANDARD", metadata.duration_seconds, len(prompt))
+            if route.json_mode
+        ]
+
+        try:
+            data = repair_json(self._generate(routes, prompt, extra_config={"response_schema": schema})) or {}
+        except Exception as e:
+            logger.warning(f"Failed to synthesize merged summary, concatenating segments: {e}")
+            data = {}
+
+        if isinstance(data.get("title"), str) and data["title"]:
+            merged.title = data["title"]
+        if isinstance(data.get("summary"), str) and data["summary"]:
+            merged.summary = data["summary"]
+        if isinstance(data.get("keyTakeaways"), list) and data["keyTakeaways"]:
+            merged.key_takeaways = data["keyTakeaways"]
+
+        return merged
+
+    def _offset_timestamps(self, entries: list[dict], offset: int) -> list[dict]:
+        """Shift "timestamp"/"endTimestamp" of each entry by offset seconds"""
+        shifted = []
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            entry = dict(entry)
+            for key in ("timestamp", "endTimestamp"):
+                seconds = self._parse_timestamp(entry.get(key))
+                if seconds is not None:
+                    entry[key] = self._format_duration(seconds + offset)
+            shifted.append(entry)
+        return shifted
+
+    def _parse_timestamp(self, value) -> Optional[int]:
+        """Parse MM:SS or HH:MM:SS into seconds (None if not a timestamp)"""
+        if not isinstance(value, str):
+            return None
+        try:
+            parts = [int(float(part)) for part in value.strip().split(":")]
+        except ValueError:
+            return None
+        if len(parts) not in (2, 3):
+            return None
+        seconds = 0
+        for part in parts:
+            seconds = seconds * 60 + part
+        return seconds
+
+    def parse_response(
+        self,
+        text: str,
+        include_visual: bool = False,
+        contents: Optional[str | list] = None,
+        routes: Optional[list[ModelRoute]] = None
+    ) -> Optional[AnalysisResult]:
+        """
+        Parse JSON response from Gemini, repairing near-valid output.
+
+        With contents (the original request), fields missing from a truncated or
+        malformed response are regenerated in one small schema-constrained
+        request instead of failing the job after the full generation was paid for.
+        routes are the original request's routes, so the regeneration gets at
+        least the output budget the cut-off response had.
+        Returns None if a required field is still missing, so the job fails and
+        is refunded rather than caching a half-empty result for every user.
+        """
+        data = repair_json(text)
+        if data is None:
+            logger.warning("Failed to parse Gemini response")
             logger.debug(f"Raw response: {text[:1000]}")
+            data = {}
+
+        missing = missing_fields(data, include_visual)
+        if missing and contents is not None and self.settings.regenerate_missing_fields:
+            data.update(self._regenerate_fields(contents, data, missing, routes))
+            missing = missing_fields(data, include_visual)
+
+        if missing:
+            logger.error(f"Analysis result is missing fields: {missing}")
             return None
 
+        return AnalysisResult(
+            title=data.get("title", ""),
+            summary=data.get("summary", ""),
+            key_takeaways=data.get("keyTakeaways", []),
+            timeline=data.get("timeline", []),
+            keywords=data.get("keywords", []),
+            visual_audit=data.get("visualAudit") if include_visual else None
+        )
+
+    def _regenerate_fields(
+        self,
+        contents: str | list,
+        recovered: dict,
+        missing: list[str],
+        routes: Optional[list[ModelRoute]] = None
+    ) -> dict:
+        """Ask a JSON-mode model for only the missing fields, constrained by their response schema"""
+        logger.info(f"Regenerating missing fields: {missing}")
+
+        schema = {
+            "type": "OBJECT",
+            "properties": {field: FIELD_SCHEMAS[field] for field in missing},
+            "required": missing,
+        }
+        prompt = REGENERATE_FIELDS_PROMPT.format(
+            recovered=json.dumps(recovered, ensure_ascii=False),
+            missing=", ".join(missing)
+        )
+        parts = list(contents) if isinstance(contents, list) else [contents]
+
+        routes = self._regeneration_routes(routes or self.router.route("STANDARD"))
+
+        try:
+            text = self._generate(routes, parts + [prompt], extra_config={"response_schema": schema})
+            regenerated = repair_json(text) or {}
+        except Exception as e:
+            logger.warning(f"Failed to regenerate missing fields: {e}")
+            return {}
+
+        return {field: value for field, value in regenerated.items() if field in missing}
+
+    def _regeneration_routes(self, routes: list[ModelRoute]) -> list[ModelRoute]:
+        """
+        JSON-mode routes for a regeneration, largest output budget first,
+        keeping only those with at least the preferred original route's budget
+        (or the largest available if none has it)
+        """
+        budget = routes[0].max_output_tokens
+        json_routes = [route for route in routes if route.json_mode]
+        if not json_routes:
+            json_routes = [route for route in self.router.route("STANDARD") if route.json_mode]
+        large_enough = [route for route in json_routes if route.max_output_tokens >= budget]
+        return sorted(large_enough or json_routes, key=lambda route: route.max_output_tokens, reverse=True)
+
     def _format_duration(self, seconds: int) -> str:
         """Format seconds to MM:SS or HH:MM:SS"""
         if seconds >= 3600:
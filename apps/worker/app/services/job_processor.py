@@ -2,14 +2,34 @@
 Job Processor
 Orchestrates the analysis workflow from job pickup to completion
 """
+import os
+import math
+import socket
 import logging
 import asyncio
-from typing import Optional
+from typing import Callable, Optional
+from concurrent.futures import Future
 from dataclasses import asdict
 
-from ..core.database import AnalysisJobRepository, AnalysisResultRepository
-from .youtube_service import YouTubeService, extract_video_id
-from .gemini_analyzer import GeminiAnalyzer
+from ..core.config import get_settings
+from ..core.async_database import AsyncAnalysisJobRepository, AsyncAnalysisResultRepository
+from .youtube_service import (
+    YouTubeService,
+    VideoMetadata,
+    TranscriptResult,
+    extract_video_id,
+    DOWNLOAD_PROFILE,
+)
+from .gemini_analyzer import GeminiAnalyzer, AnalysisResult
+from .checkpoint_store import get_checkpoint_store
+from .storage_manager import StorageUnavailable, get_storage_manager
+from .upload_registry import get_upload_registry
+from .video_segmenter import split_video
+from .cancellation import CancellationToken, JobCancelled
+from .circuit_breaker import UpstreamUnavailable
+from .pipeline import Stage, StagePipeline, PipelineTicket
+from .job_state import get_job_states
+from .precompute import IdlePrecomputer
 
 logger = logging.getLogger(__name__)
 
@@ -17,87 +37,172 @@ logger = logging.getLogger(__name__)
 class JobProcessor:
     """Processes analysis jobs from PENDING to COMPLETED/FAILED"""
 
-    def __init__(self):
-        self.job_repo = AnalysisJobRepository()
-        self.result_repo = AnalysisResultRepository()
+    def __init__(self, pipeline: Optional[StagePipeline] = None):
+        self.pipeline = pipeline
+        self.job_repo = AsyncAnalysisJobRepository()
+        self.result_repo = AsyncAnalysisResultRepository()
         self.youtube = YouTubeService()
         self.analyzer = GeminiAnalyzer()
-
-    async def process_job(self, job: dict) -> bool:
+        self.checkpoints = get_checkpoint_store()
+        self.storage = get_storage_manager()
+        self.uploads = get_upload_registry()
+        self.states = get_job_states()
+        self.settings = get_settings()
+        self._partial_writes: dict[str, Future] = {}  # job_id -> partial-result write in flight
+
+    async def process_job(self, job: dict, cancel_token: Optional[CancellationToken] = None) -> bool:
         """
         Process a single analysis job.
 
-        Returns True if successful, False if failed.
+        Blocking YouTube/Gemini calls run in worker threads so the event loop
+        stays responsive. The cancel token is checked between stages and inside
+        downloads/uploads; a cancelled job is failed, refunded and cleaned up.
+        With a stage pipeline, each stage waits for a slot in its own pool.
+
+        Returns True if successful, False if failed. Raises StorageUnavailable
+        and UpstreamUnavailable for the runner to requeue the job; checkpoints
+        are kept so the retry resumes where this attempt stopped.
         """
+        token = cancel_token or CancellationToken()
         job_id = job["id"]
         video_url = job["video_url"]
         video_id = job.get("video_id") or extract_video_id(video_url)
         mode = job["mode"]
         user_id = job["user_id"]
-        credits_reserved = job.get("credits_reserved", 0)
+        worker_id = job.get("lease_owner")  # Finalize/fail only while we still hold the lease
 
         logger.info(f"Processing job {job_id} for video {video_id} in {mode} mode")
+        self.states.start(job, video_id)
+
+        # Resume from the last completed stage if this job was attempted before
+        checkpoint = self.checkpoints.load(job_id)
+        if checkpoint:
+            logger.info(f"Resuming job {job_id} from checkpointed stages: {', '.join(checkpoint)}")
+
+        stages = PipelineTicket(self.pipeline)
+        finished = False  # Completed, failed or cancelled, as opposed to requeued
 
         try:
+            await self._enter_stage(stages, job_id, Stage.FETCH)
+
             # Update progress: Starting
-            self.job_repo.update_progress(job_id, 10)
+            await self._progress(job_id, 10)
 
             # Step 1: Get video metadata
-            logger.info(f"Fetching metadata for video {video_id}")
-            metadata = self.youtube.get_video_metadata(video_id)
+            if "metadata" in checkpoint:
+                metadata = VideoMetadata(**checkpoint["metadata"])
+            else:
+                self.states.update(job_id, stage="metadata")
+                logger.info(f"Fetching metadata for video {video_id}")
+                metadata = await asyncio.to_thread(self.youtube.get_video_metadata, video_id)
 
-            if not metadata:
-                raise Exception(f"Failed to fetch video metadata for {video_id}")
+                if not metadata:
+                    raise Exception(f"Failed to fetch video metadata for {video_id}")
 
-            self.job_repo.update_progress(job_id, 20)
+                self.checkpoints.save(job_id, "metadata", asdict(metadata))
+
+            await self._progress(job_id, 20)
+            token.raise_if_cancelled()
 
             # Step 2: Get transcript (required for Standard with full analysis, optional for fallback)
-            logger.info(f"Fetching transcript for video {video_id}")
-            transcript = self.youtube.get_transcript(video_id)
+            if "transcript" in checkpoint:
+                saved = checkpoint["transcript"]
+                transcript = TranscriptResult(**saved) if saved else None
+            else:
+                self.states.update(job_id, stage="transcript")
+                logger.info(f"Fetching transcript for video {video_id}")
+                transcript = await asyncio.to_thread(self.youtube.get_transcript, video_id)
+                self.checkpoints.save(job_id, "transcript", asdict(transcript) if transcript else None)
 
-            self.job_repo.update_progress(job_id, 40)
+            await self._progress(job_id, 40)
+            token.raise_if_cancelled()
 
             # Step 3: Perform analysis
-            if mode == "STANDARD":
+            if "analysis" in checkpoint:
+                analysis = AnalysisResult(**checkpoint["analysis"])
+            elif mode == "STANDARD":
+                await self._enter_stage(stages, job_id, Stage.ANALYZE)
+                self.states.update(job_id, stage="analysis")
                 if transcript:
                     logger.info(f"Running Standard analysis with transcript for {video_id}")
-                    analysis = self.analyzer.analyze_standard(metadata, transcript)
+                    analysis = await asyncio.to_thread(
+                        self.analyzer.analyze_standard,
+                        metadata,
+                        transcript,
+                        self._partial_publisher(job_id) if self.settings.stream_partial_results else None
+                    )
                 else:
                     # Fallback to metadata-only analysis
                     logger.info(f"No transcript available, running metadata-only analysis for {video_id}")
-                    analysis = self.analyzer.analyze_metadata_only(metadata)
+                    analysis = await asyncio.to_thread(self.analyzer.analyze_metadata_only, metadata)
+            elif metadata.duration_seconds > self.settings.deep_segment_threshold_seconds:
+                await self._enter_stage(stages, job_id, Stage.DOWNLOAD)
+                analysis = await self._analyze_deep_segmented(job_id, video_id, metadata, checkpoint, token, stages)
             else:
-                # Deep Mode: Download video for visual analysis
-                logger.info(f"Downloading video {video_id} for Deep analysis")
-                video_path = self.youtube.download_video(video_id)
-
-                if not video_path:
-                    raise Exception(f"Failed to download video {video_id}")
-
-                self.job_repo.update_progress(job_id, 60)
-
+                await self._enter_stage(stages, job_id, Stage.DOWNLOAD)
+                file_name = checkpoint.get("upload")
+
+                if file_name and not await asyncio.to_thread(self.analyzer.is_upload_active, file_name):
+                    logger.info(f"Checkpointed upload {file_name} expired, uploading again")
+                    self.checkpoints.discard(job_id, "upload")
+                    file_name = None
+
+                if not file_name:
+                    # Reuse a file another job already uploaded for this video
+                    file_name = self.uploads.get(video_id, DOWNLOAD_PROFILE)
+                    if file_name and await asyncio.to_thread(self.analyzer.is_upload_active, file_name):
+                        logger.info(f"Reusing Gemini upload {file_name} for video {video_id}")
+                        self.checkpoints.save(job_id, "upload", file_name)
+                    elif file_name:
+                        self.uploads.remove(video_id, DOWNLOAD_PROFILE)
+                        file_name = None
+
+                if not file_name:
+                    # Deep Mode: Download video for visual analysis
+                    video_path = await self._download(job_id, video_id, metadata, checkpoint, token)
+                    self.states.update(job_id, stage="upload")
+                    file_name = await asyncio.to_thread(
+                        self.analyzer.upload_video, video_path, cancel_token=token
+                    )
+                    self.checkpoints.discard(job_id, "download")
+                    self.storage.release(job_id)
+
+                    if not file_name:
+                        raise Exception(f"Failed to upload video {video_id}")
+
+                    self.checkpoints.save(job_id, "upload", file_name)
+                    self.uploads.put(video_id, DOWNLOAD_PROFILE, file_name)
+
+                await self._progress(job_id, 60)
+
+                await self._enter_stage(stages, job_id, Stage.ANALYZE)
+                self.states.update(job_id, stage="analysis")
                 logger.info(f"Running Deep analysis for {video_id}")
-                analysis = self.analyzer.analyze_deep(metadata, video_path)
+                token.raise_if_cancelled()
+                analysis = await asyncio.to_thread(
+                    self.analyzer.analyze_uploaded_video, metadata, file_name, keep_upload=True
+                )
 
-            self.job_repo.update_progress(job_id, 80)
+            await self._progress(job_id, 80)
+            token.raise_if_cancelled()
 
             if not analysis:
                 raise Exception("Analysis returned empty result")
 
+            self.checkpoints.save(job_id, "analysis", asdict(analysis))
+
+            await self._enter_stage(stages, job_id, Stage.PERSIST)
+            self.states.update(job_id, stage="persist")
+
             # Step 4: Create analysis result
             logger.info(f"Saving analysis result for {video_id}")
-            result_json = {
-                "title": analysis.title,
-                "summary": analysis.summary,
-                "keyTakeaways": analysis.key_takeaways,
-                "timeline": analysis.timeline,
-                "keywords": analysis.keywords,
-            }
-
-            if analysis.visual_audit:
-                result_json["visualAudit"] = analysis.visual_audit
-
-            result = self.result_repo.create_result(
+            result_json = analysis.to_result_json()
+
+            # Step 5: Upsert result and mark job as completed in one transaction
+            # (after any partial-result write, so it can't land on a completed job)
+            await self._await_partial_write(job_id)
+            result_id = await self.job_repo.finalize_job(
+                job_id=job_id,
                 video_id=video_id,
                 video_url=video_url,
                 mode=mode,
@@ -105,54 +210,366 @@ class JobProcessor:
                 video_title=metadata.title,
                 video_thumbnail=metadata.thumbnail,
                 video_duration_seconds=metadata.duration_seconds,
-                transcript=transcript.text if transcript else None
+                transcript=transcript.text if transcript else None,
+                worker_id=worker_id
             )
 
-            if not result or "id" not in result:
+            if not result_id:
                 raise Exception("Failed to save analysis result")
 
-            # Step 5: Mark job as completed
-            self.job_repo.complete_job(job_id, result["id"])
-            logger.info(f"Job {job_id} completed successfully with result {result['id']}")
+            finished = True
+            self.checkpoints.clear(job_id)
+            self.states.finish(job_id, "completed")
+            logger.info(f"Job {job_id} completed successfully with result {result_id}")
 
             return True
 
+        except StorageUnavailable as e:
+            self.states.finish(job_id, "requeued", str(e))
+            raise  # Not the job's fault: the runner hands it back to the queue
+
+        except UpstreamUnavailable:
+            raise  # YouTube/Gemini outage: the runner requeues the job with a delay
+
+        except (JobCancelled, asyncio.CancelledError):
+            if not token.cancelled:
+                self.states.finish(job_id, "requeued", "Worker shutting down")
+                raise  # Worker shutdown, not a user cancel: the lease release requeues the job
+
+            logger.info(f"Job {job_id} cancelled, cleaning up")
+            finished = True
+            await asyncio.to_thread(self._discard_artifacts, job_id)
+
+            try:
+                refunded = await self.job_repo.fail_and_refund_job(
+                    job_id, "Job was cancelled", "ANALYSIS_008", worker_id=worker_id
+                )
+                if refunded:
+                    logger.info(f"Refunded {refunded} credits to user {user_id}")
+            except Exception as fail_error:
+                logger.error(f"Failed to mark job {job_id} as cancelled: {fail_error}")
+
+            self.states.finish(job_id, "cancelled")
+            return False
+
         except Exception as e:
             error_message = str(e)
             logger.error(f"Job {job_id} failed: {error_message}")
+            self.states.finish(job_id, "failed", error_message)
+            finished = True
 
-            # Mark job as failed
-            self.job_repo.fail_job(job_id, error_message, "ANALYSIS_006")
-
-            # Refund credits
-            if credits_reserved > 0:
-                try:
-                    self.job_repo.refund_credits(user_id, credits_reserved, job_id)
-                    logger.info(f"Refunded {credits_reserved} credits to user {user_id}")
-                except Exception as refund_error:
-                    logger.error(f"Failed to refund credits: {refund_error}")
+            # Mark job as failed and refund credits atomically
+            try:
+                refunded = await self.job_repo.fail_and_refund_job(
+                    job_id, error_message, "ANALYSIS_006", worker_id=worker_id
+                )
+                if refunded:
+                    logger.info(f"Refunded {refunded} credits to user {user_id}")
+            except Exception as fail_error:
+                logger.error(f"Failed to mark job {job_id} as failed: {fail_error}")
 
             return False
 
+        finally:
+            stages.leave()
+            partial_write = self._partial_writes.pop(job_id, None)
+            if partial_write:
+                partial_write.cancel()
+            # Drop the download reservation; a requeued job keeps its checkpointed
+            # download for the retry, a finished one has its files deleted
+            self.storage.release(job_id, delete_files=finished)
+
+    async def _download(
+        self,
+        job_id: str,
+        video_id: str,
+        metadata: VideoMetadata,
+        checkpoint: dict,
+        token: CancellationToken,
+        reserve_factor: int = 1
+    ) -> str:
+        """Download (or resume) a Deep-mode video within a storage reservation"""
+        self.states.update(job_id, stage="download")
+        video_path = checkpoint.get("download")
+
+        if not video_path or not os.path.exists(video_path):
+            reserved = self.storage.estimate_bytes(metadata.duration_seconds)
+            output_path = self.storage.reserve(job_id, reserved * reserve_factor)
+
+            def reserve_more(nbytes: int) -> None:
+                # The estimate only sizes the reservation; a larger video grows it
+                if not self.storage.grow(job_id, nbytes * reserve_factor):
+                    raise StorageUnavailable(
+                        f"Not enough temp storage for {nbytes // (1024 * 1024)} MB download of {video_id}"
+                    )
+
+            logger.info(f"Downloading video {video_id} for Deep analysis")
+            video_path = await asyncio.to_thread(
+                self.youtube.download_video,
+                video_id,
+                output_path,
+                cancel_token=token,
+                reserve=reserve_more
+            )
+
+            if not video_path:
+                raise Exception(f"Failed to download video {video_id}")
+
+            self.checkpoints.save(job_id, "download", video_path)
+        else:
+            logger.info(f"Resuming from checkpointed download of {video_id}")
+            self.storage.adopt(job_id, video_path)
+
+        token.raise_if_cancelled()
+        return video_path
+
+    async def _analyze_deep_segmented(
+        self,
+        job_id: str,
+        video_id: str,
+        metadata: VideoMetadata,
+        checkpoint: dict,
+        token: CancellationToken,
+        stages: PipelineTicket
+    ) -> Optional[AnalysisResult]:
+        """
+        Deep analysis for long videos: split into time windows with ffmpeg,
+        upload and analyze the segments concurrently, then merge. Wall-clock
+        time follows segment length rather than video length.
+        """
+        segments = checkpoint.get("segments")
+
+        if segments:
+            active = await asyncio.gather(*(
+                asyncio.to_thread(self.analyzer.is_upload_active, segment["file_name"])
+                for segment in segments
+            ))
+            if not all(active):
+                logger.info(f"Checkpointed segment uploads for job {job_id} expired, uploading again")
+                for segment in segments:
+                    await asyncio.to_thread(self.analyzer.delete_upload, segment["file_name"])
+                self.checkpoints.discard(job_id, "segments")
+                segments = None
+
+        if not segments:
+            # Uploads left by an attempt that lost its lease mid-upload
+            for file_name in checkpoint.get("segment_uploads") or []:
+                await asyncio.to_thread(self.analyzer.delete_upload, file_name)
+
+            # Stream copy writes a second copy before the original is removed
+            video_path = await self._download(job_id, video_id, metadata, checkpoint, token, reserve_factor=2)
+
+            self.states.update(job_id, stage="upload")
+            parts = await asyncio.to_thread(
+                split_video, video_path, self.settings.deep_segment_seconds, self.settings.ffmpeg_path
+            )
+            os.remove(video_path)
+            self.checkpoints.discard(job_id, "download")
+
+            if not parts:
+                raise Exception(f"Failed to split video {video_id}")
+
+            slots = asyncio.Semaphore(self.settings.deep_segment_concurrency)
+            finished: list[str] = []
+
+            async def upload(path: str) -> Optional[str]:
+                async with slots:
+                    file_name = await asyncio.to_thread(self.analyzer.upload_video, path, cancel_token=token)
+                if file_name:
+                    # Checkpoint at once, so a cancel or error mid-gather still cleans it up
+                    finished.append(file_name)
+                    self.checkpoints.save(job_id, "segment_uploads", finished)
+                return file_name
+
+            uploaded = await asyncio.gather(*(upload(part.path) for part in parts), return_exceptions=True)
+            self.storage.release(job_id)
+
+            file_names = [name for name in uploaded if isinstance(name, str)]
+            if len(file_names) < len(parts):
+                for file_name in file_names:
+                    await asyncio.to_thread(self.analyzer.delete_upload, file_name)
+                self.checkpoints.discard(job_id, "segment_uploads")
+                token.raise_if_cancelled()
+                for error in uploaded:
+                    if isinstance(error, UpstreamUnavailable):
+                        raise error
+                raise Exception(f"Failed to upload segments of video {video_id}")
+
+            segments = [
+                {"file_name": file_name, "start": part.start_seconds, "end": part.end_seconds}
+                for file_name, part in zip(file_names, parts)
+            ]
+            self.checkpoints.save(job_id, "segments", segments)
+            self.checkpoints.discard(job_id, "segment_uploads")
+
+        await self._progress(job_id, 60)
+
+        # Segments analyzed before a requeue are not sent to Gemini again
+        saved = dict(checkpoint.get("segment_results") or {})
+        done = {int(index): AnalysisResult(**result) for index, result in saved.items()}
+
+        def save_result(index: int, result: AnalysisResult) -> None:
+            saved[str(index)] = asdict(result)
+            self.checkpoints.save(job_id, "segment_results", saved)
+
+        await self._enter_stage(stages, job_id, Stage.ANALYZE)
+        self.states.update(job_id, stage="analysis")
+        logger.info(
+            f"Running segmented Deep analysis for {video_id} "
+            f"({len(segments) - len(done)} of {len(segments)} segments)"
+        )
+        token.raise_if_cancelled()
+        return await asyncio.to_thread(self.analyzer.analyze_segments, metadata, segments, done, save_result)
+
+    async def _progress(self, job_id: str, progress: int) -> None:
+        """Record progress in the job's in-memory state and in the database"""
+        self.states.update(job_id, progress=progress)
+        await self.job_repo.update_progress(job_id, progress)
+
+    async def _enter_stage(self, stages: PipelineTicket, job_id: str, stage: str) -> None:
+        """Wait for a pipeline stage slot, recording the wait as its own stage"""
+        if self.pipeline and stages.stage != stage:
+            self.states.update(job_id, stage=f"waiting_{stage}")
+        await stages.enter(stage)
+
+    def _partial_publisher(self, job_id: str) -> Callable[[dict], None]:
+        """Build a thread-safe callback that publishes a partial result for a job"""
+        loop = asyncio.get_running_loop()
+
+        async def publish(partial: dict):
+            self.states.update(job_id, partial_result=partial)
+            try:
+                await self.job_repo.update_partial_result(job_id, partial)
+                logger.info(f"Published partial result for job {job_id}")
+            except Exception as e:
+                logger.warning(f"Failed to publish partial result for job {job_id}: {e}")
+
+        def schedule(partial: dict):
+            # Called from the analyzer's worker thread
+            self._partial_writes[job_id] = asyncio.run_coroutine_threadsafe(publish(partial), loop)
+
+        return schedule
+
+    async def _await_partial_write(self, job_id: str) -> None:
+        """Wait for a job's partial-result write still in flight, if any"""
+        partial_write = self._partial_writes.pop(job_id, None)
+        if partial_write:
+            await asyncio.wrap_future(partial_write)
+
+    def _discard_artifacts(self, job_id: str):
+        """Delete the Gemini upload and local download recorded for a job, then its checkpoints"""
+        checkpoint = self.checkpoints.load(job_id)
+
+        # Registered uploads are shared with other jobs and expire on their own
+        file_name = checkpoint.get("upload")
+        video_id = checkpoint.get("metadata", {}).get("video_id")
+        if file_name and (not video_id or self.uploads.get(video_id, DOWNLOAD_PROFILE) != file_name):
+            self.analyzer.delete_upload(file_name)
+
+        for segment in checkpoint.get("segments") or []:
+            self.analyzer.delete_upload(segment["file_name"])
+        for file_name in checkpoint.get("segment_uploads") or []:
+            self.analyzer.delete_upload(file_name)
+
+        video_path = checkpoint.get("download")
+        if video_path and os.path.exists(video_path):
+            try:
+                os.remove(video_path)
+            except OSError:
+                pass
+
+        self.checkpoints.clear(job_id)
+
 
 class JobRunner:
     """
     Background job runner that polls for pending jobs.
     Can run multiple jobs concurrently.
+
+    Claimed jobs are held under a lease that a heartbeat loop renews. A reaper
+    loop returns jobs whose leases expired (crashed or redeployed workers) to
+    PENDING, and a graceful shutdown hands in-flight jobs straight back.
     """
 
-    def __init__(self, max_concurrent: int = 3, poll_interval: int = 5):
-        self.max_concurrent = max_concurrent
+    def __init__(
+        self,
+        max_concurrent: int = 3,
+        poll_interval: int = 5,
+        worker_id: str = "",
+        lease_seconds: int = 60,
+        heartbeat_interval: int = 20,
+        reaper_interval: int = 60,
+        max_attempts: int = 3,
+        include_deferred: bool = True,
+        storage_sweep_interval: int = 600,
+        pipeline: Optional[StagePipeline] = None,
+        requeue_delay: int = 60,
+        max_requeues: int = 5,
+        precompute: bool = False,
+    ):
+        # With a pipeline, max_concurrent (the analyze pool) is part of its capacity
+        self.pipeline = pipeline
+        self.max_concurrent = pipeline.capacity if pipeline else max_concurrent
         self.poll_interval = poll_interval
-        self.processor = JobProcessor()
-        self.job_repo = AnalysisJobRepository()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.reaper_interval = reaper_interval
+        self.max_attempts = max_attempts
+        self.include_deferred = include_deferred
+        self.storage_sweep_interval = storage_sweep_interval
+        self.requeue_delay = requeue_delay
+        self.max_requeues = max_requeues
+        self.processor = JobProcessor(pipeline=pipeline)
+        self.precompute = IdlePrecomputer(self.processor) if precompute else None
+        self.job_repo = AsyncAnalysisJobRepository()
         self.running = False
         self.active_jobs: set[str] = set()
+        self._job_tasks: dict[str, asyncio.Task] = {}
+        self._cancel_tokens: dict[str, CancellationToken] = {}
+        self._background_tasks: list[asyncio.Task] = []
+        self.completed_jobs = 0
+        self.failed_jobs = 0
+
+    @classmethod
+    def from_settings(cls, settings=None, worker_id: str = "") -> "JobRunner":
+        """Build a runner from worker settings (worker_id overrides settings.worker_id)"""
+        settings = settings or get_settings()
+        return cls(
+            max_concurrent=settings.max_concurrent_jobs,
+            poll_interval=settings.poll_interval_seconds,
+            worker_id=worker_id or settings.worker_id,
+            lease_seconds=settings.lease_seconds,
+            heartbeat_interval=settings.heartbeat_interval_seconds,
+            reaper_interval=settings.reaper_interval_seconds,
+            max_attempts=settings.max_job_attempts,
+            # Deferred STANDARD jobs belong to the bulk runner when it is enabled
+            include_deferred=not settings.bulk_mode_enabled,
+            storage_sweep_interval=settings.storage_sweep_interval_seconds,
+            pipeline=StagePipeline.from_settings(settings) if settings.pipeline_enabled else None,
+            requeue_delay=settings.requeue_delay_seconds,
+            max_requeues=settings.max_job_requeues,
+            precompute=settings.precompute_enabled,
+        )
 
     async def start(self):
         """Start the job runner loop"""
         self.running = True
-        logger.info(f"Job runner started (max_concurrent={self.max_concurrent}, poll_interval={self.poll_interval}s)")
+
+        pruned = self.processor.checkpoints.prune_expired()
+        if pruned:
+            logger.info(f"Pruned {pruned} expired job checkpoints")
+
+        self._background_tasks = [
+            asyncio.create_task(self._heartbeat_loop()),
+            asyncio.create_task(self._reaper_loop()),
+            asyncio.create_task(self._storage_sweep_loop()),
+        ]
+
+        logger.info(
+            f"Job runner started (worker_id={self.worker_id}, max_concurrent={self.max_concurrent}, "
+            f"poll_interval={self.poll_interval}s, lease={self.lease_seconds}s)"
+        )
 
         while self.running:
             try:
@@ -167,16 +584,145 @@ class JobRunner:
         self.running = False
         logger.info("Job runner stopping...")
 
+    async def shutdown(self):
+        """Stop polling, cancel in-flight jobs and release their leases back to PENDING"""
+        self.stop()
+
+        for task in self._background_tasks:
+            task.cancel()
+
+        if self.precompute:
+            await self.precompute.stop()
+
+        in_flight = list(self.active_jobs)
+        for task in self._job_tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, *self._job_tasks.values(), return_exceptions=True)
+
+        if in_flight:
+            try:
+                released = await self.job_repo.release_leases(self.worker_id, in_flight)
+                logger.info(f"Released {released} in-flight jobs back to the queue")
+            except Exception as e:
+                logger.error(f"Failed to release job leases (reaper will reclaim them): {e}")
+
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancel a job running on this worker.
+
+        Sets the job's cancel token (so threads abort downloads/uploads and
+        clean up remote files) and cancels its task so the slot frees up at once.
+        Returns False if the job is not running here.
+        """
+        token = self._cancel_tokens.get(job_id)
+        task = self._job_tasks.get(job_id)
+
+        if not token or not task:
+            return False
+
+        token.cancel()
+        task.cancel()
+        logger.info(f"Cancellation requested for job {job_id}")
+        return True
+
+    def _abandon_job(self, job_id: str) -> None:
+        """
+        Stop working on a job whose lease was lost. The job is neither failed
+        nor refunded: it belongs to whichever worker claims it next.
+        """
+        self.processor.states.finish(job_id, "requeued", "Lease lost")
+        task = self._job_tasks.get(job_id)
+        if task:
+            task.cancel()
+
+    async def _heartbeat_loop(self):
+        """Periodically renew leases for jobs this worker is processing"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+
+            job_ids = list(self.active_jobs)
+            if not job_ids:
+                continue
+
+            try:
+                owned = await self.job_repo.renew_leases(self.worker_id, job_ids, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Lease heartbeat failed: {e}")
+                continue
+
+            # Jobs that finished while the renewal was in flight are no longer active
+            lost = (set(job_ids) - owned) & self.active_jobs
+            if lost:
+                logger.warning(f"Lost lease on jobs {', '.join(lost)}; they were reclaimed by the reaper")
+            for job_id in lost:
+                self._abandon_job(job_id)
+
+    async def _reaper_loop(self):
+        """Periodically return jobs with expired leases to PENDING"""
+        while True:
+            try:
+                reclaimed = await self.job_repo.reclaim_expired_jobs(self.max_attempts)
+                if reclaimed:
+                    logger.info(f"Reclaimed {reclaimed} jobs with expired leases")
+            except Exception as e:
+                logger.error(f"Lease reaper failed: {e}")
+
+            await asyncio.sleep(self.reaper_interval)
+
+    async def _storage_sweep_loop(self):
+        """
+        Remove download files orphaned by crashed jobs and Gemini uploads whose
+        registry entries expired (first sweep at startup)
+        """
+        while True:
+            try:
+                removed = await asyncio.to_thread(self.processor.storage.sweep_orphans)
+                if removed:
+                    logger.info(f"Swept {removed} orphaned download files")
+            except Exception as e:
+                logger.error(f"Storage sweep failed: {e}")
+
+            try:
+                expired = await asyncio.to_thread(self.processor.uploads.pop_expired)
+                for file_name in expired:
+                    await asyncio.to_thread(self.processor.analyzer.delete_upload, file_name)
+                if expired:
+                    logger.info(f"Deleted {len(expired)} expired Gemini uploads")
+            except Exception as e:
+                logger.error(f"Upload registry sweep failed: {e}")
+
+            await asyncio.sleep(self.storage_sweep_interval)
+
     async def _poll_and_process(self):
         """Poll for pending jobs and process them"""
         # Check how many slots are available
         available_slots = self.max_concurrent - len(self.active_jobs)
+        if self.pipeline:
+            # Only claim what fits in the fetch queue; a full pipeline backs up to here
+            available_slots = min(available_slots, self.pipeline.admission_room())
 
         if available_slots <= 0:
             return
 
-        # Get pending jobs
-        pending_jobs = self.job_repo.get_pending_jobs(limit=available_slots)
+        # Get pending jobs (round-robin across users unless fair share is off)
+        settings = self.processor.settings
+        if settings.fair_share_enabled:
+            pending_jobs = await self.job_repo.get_fair_pending_jobs(
+                limit=available_slots,
+                include_deferred=self.include_deferred,
+                plan_weights=settings.fair_share_plan_weights
+            )
+        else:
+            pending_jobs = await self.job_repo.get_pending_jobs(
+                limit=available_slots,
+                include_deferred=self.include_deferred
+            )
+
+        if self.precompute:
+            if pending_jobs:
+                self.precompute.yield_slots()  # Real jobs first: no new precomputes
+            else:
+                await self.precompute.fill(available_slots)
 
         for job in pending_jobs:
             job_id = job["id"]
@@ -185,18 +731,59 @@ class JobRunner:
             if job_id in self.active_jobs:
                 continue
 
+            # Leave Deep jobs for other workers while this one is short on disk
+            if job["mode"] == "DEEP" and not self.processor.storage.has_capacity(
+                self.processor.settings.storage_admission_estimate_bytes
+            ):
+                logger.debug(f"Not enough temp storage to admit Deep job {job_id}")
+                continue
+
             # Try to claim the job
-            claimed = self.job_repo.claim_job(job_id)
+            claimed = await self.job_repo.claim_job(job_id, self.worker_id, self.lease_seconds)
 
             if claimed:
                 self.active_jobs.add(job_id)
+                self._cancel_tokens[job_id] = CancellationToken()
                 # Process job in background
-                asyncio.create_task(self._process_job_wrapper(claimed))
+                self._job_tasks[job_id] = asyncio.create_task(self._process_job_wrapper(claimed))
 
     async def _process_job_wrapper(self, job: dict):
         """Wrapper to process job and clean up tracking"""
         job_id = job["id"]
         try:
-            await self.processor.process_job(job)
+            succeeded = await self.processor.process_job(job, self._cancel_tokens.get(job_id))
+            if succeeded:
+                self.completed_jobs += 1
+            else:
+                self.failed_jobs += 1
+        except StorageUnavailable as e:
+            logger.warning(f"Requeueing job {job_id}: {e}")
+            try:
+                await self.job_repo.release_leases(self.worker_id, [job_id])
+            except Exception as release_error:
+                logger.error(f"Failed to requeue job {job_id} (reaper will reclaim it): {release_error}")
+        except UpstreamUnavailable as e:
+            await self._requeue_delayed(job_id, e)
         finally:
             self.active_jobs.discard(job_id)
+            self._job_tasks.pop(job_id, None)
+            self._cancel_tokens.pop(job_id, None)
+
+    async def _requeue_delayed(self, job_id: str, error: UpstreamUnavailable):
+        """Put a job hit by an upstream outage back to PENDING until the delay passes"""
+        delay = max(self.requeue_delay, math.ceil(error.retry_after))
+        outcome = "NOT_OWNED"
+        try:
+            outcome = await self.job_repo.requeue_job(
+                job_id, self.worker_id, delay, str(error), self.max_requeues
+            )
+        except Exception as requeue_error:
+            logger.error(f"Failed to requeue job {job_id} (reaper will reclaim it): {requeue_error}")
+
+        if outcome == "FAILED":
+            logger.error(f"Job {job_id} failed after {self.max_requeues} requeues: {error}")
+            self.processor.states.finish(job_id, "failed", str(error))
+            self.failed_jobs += 1
+        else:
+            logger.warning(f"Requeueing job {job_id} in {delay}s: {error}")
+            self.processor.states.finish(job_id, "requeued", str(error))
@@ -0,0 +1,172 @@
+"""
+In-Memory Job State
+Per-job state records for jobs this runner is processing: current stage,
+time spent in each stage, attempt count, progress and partial result.
+
+Clients read them through the worker's detailed status endpoint or subscribe
+to a Server-Sent Events stream, instead of polling analysis_jobs.progress.
+Finished jobs are kept for `job_state_retention_seconds` so a late subscriber
+still sees the final state. Records live on the runner's event loop and are
+only touched from it.
+"""
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a job's state no longer changes
+TERMINAL_STATUSES = ("completed", "failed", "cancelled", "requeued")
+
+
+@dataclass
+class JobState:
+    """Live state of one job on this runner"""
+    job_id: str
+    video_id: Optional[str]
+    mode: str
+    attempt: int
+    status: str = "processing"
+    stage: str = "claimed"
+    progress: int = 0
+    stage_seconds: dict[str, float] = field(default_factory=dict)  # Completed stages
+    partial_result: Optional[dict] = None
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    stage_started_at: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("stage_started_at")
+        if self.status == "processing":
+            # Include time spent in the running stage so far
+            data["stage_seconds"][self.stage] = round(
+                self.stage_seconds.get(self.stage, 0) + time.monotonic() - self.stage_started_at, 3
+            )
+        return data
+
+
+class JobStateRegistry:
+    """Job states plus subscriber queues for SSE streams"""
+
+    def __init__(self, retention_seconds: int = 300, subscriber_buffer: int = 16):
+        self.retention_seconds = retention_seconds
+        self.subscriber_buffer = subscriber_buffer
+        self._states: dict[str, JobState] = {}
+        self._finished_at: dict[str, float] = {}
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    def start(self, job: dict, video_id: Optional[str] = None) -> None:
+        """Begin tracking a claimed job (replaces the state of an earlier attempt)"""
+        self._prune()
+        self._finished_at.pop(job["id"], None)
+        self._states[job["id"]] = JobState(
+            job_id=job["id"],
+            video_id=video_id or job.get("video_id"),
+            mode=job["mode"],
+            attempt=job.get("attempts") or 1,
+        )
+        self._publish(job["id"])
+
+    def update(
+        self,
+        job_id: str,
+        stage: Optional[str] = None,
+        progress: Optional[int] = None,
+        partial_result: Optional[dict] = None
+    ) -> None:
+        """Record a stage change, progress and/or partial result"""
+        state = self._states.get(job_id)
+        if not state or state.status != "processing":
+            return
+
+        if stage and stage != state.stage:
+            self._close_stage(state)
+            state.stage = stage
+        if progress is not None:
+            state.progress = progress
+        if partial_result is not None:
+            state.partial_result = partial_result
+
+        state.updated_at = time.time()
+        self._publish(job_id)
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """Mark a job completed, failed, cancelled or requeued and end its streams"""
+        state = self._states.get(job_id)
+        if not state or state.status != "processing":
+            return
+
+        self._close_stage(state)
+        state.status = status
+        state.error = error
+        if status == "completed":
+            state.progress = 100
+        state.updated_at = time.time()
+        self._finished_at[job_id] = time.monotonic()
+        self._publish(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Snapshot of a job's state, or None if this runner doesn't know it"""
+        state = self._states.get(job_id)
+        return state.to_dict() if state else None
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[dict]:
+        """
+        Yield the job's current state, then every change until it finishes.
+        Yields nothing if the job is unknown here.
+        """
+        if job_id not in self._states:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_buffer)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            snapshot = self.get(job_id)
+            while True:
+                yield snapshot
+                if snapshot["status"] in TERMINAL_STATUSES:
+                    return
+                snapshot = await queue.get()
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    def _close_stage(self, state: JobState) -> None:
+        now = time.monotonic()
+        state.stage_seconds[state.stage] = round(
+            state.stage_seconds.get(state.stage, 0) + now - state.stage_started_at, 3
+        )
+        state.stage_started_at = now
+
+    def _publish(self, job_id: str) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if not subscribers:
+            return
+
+        snapshot = self.get(job_id)
+        for queue in subscribers:
+            if queue.full():
+                queue.get_nowait()  # A slow subscriber only needs the latest states
+            queue.put_nowait(snapshot)
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.retention_seconds
+        for job_id in [job_id for job_id, finished in self._finished_at.items() if finished < cutoff]:
+            del self._finished_at[job_id]
+            self._states.pop(job_id, None)
+
+
+@lru_cache()
+def get_job_states() -> JobStateRegistry:
+    """Get the process-wide job state registry"""
+    return JobStateRegistry(get_settings().job_state_retention_seconds)
@@ -0,0 +1,124 @@
+"""
+Gemini Model Router
+Picks the model and output budget per request from mode, video length and
+input size, and spills traffic over to another model when one is saturated.
+
+Tiers (model names and output budgets are configurable):
+1. fast     - Short videos and metadata-only analyses
+2. standard - Regular transcript analyses
+3. deep     - Video analyses (thinking model)
+
+Rate-limit state is tracked per model in-process: requests in the last
+minute against `router_model_rpm`, plus a cooldown after a 429.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Models that can't run in JSON mode (response_mime_type / response_schema)
+NO_JSON_MODE_MODELS = ("thinking",)
+
+
+@dataclass
+class ModelRoute:
+    """A model choice for one request"""
+    tier: str
+    model_name: str
+    max_output_tokens: int
+
+    @property
+    def json_mode(self) -> bool:
+        return not any(marker in self.model_name for marker in NO_JSON_MODE_MODELS)
+
+
+class ModelRouter:
+    """Routing policy plus live per-model rate-limit state"""
+
+    def __init__(self, settings=None):
+        self.settings = settings or get_settings()
+        self._requests: dict[str, deque] = {}
+        self._cooldown_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _tier(self, tier: str) -> ModelRoute:
+        s = self.settings
+        if tier == "fast":
+            return ModelRoute(tier, s.router_fast_model, s.router_fast_max_output_tokens)
+        if tier == "deep":
+            return ModelRoute(tier, s.router_deep_model, s.router_deep_max_output_tokens)
+        return ModelRoute(tier, s.router_standard_model, s.router_standard_max_output_tokens)
+
+    def route(
+        self,
+        mode: str,
+        duration_seconds: int = 0,
+        input_chars: int = 0
+    ) -> list[ModelRoute]:
+        """
+        Get candidate routes in order of preference for a request.
+
+        mode is STANDARD, METADATA or DEEP. Saturated models are moved to the
+        back rather than dropped, so there is always something to try.
+        """
+        short = (
+            duration_seconds <= self.settings.router_short_video_seconds
+            and input_chars <= self.settings.router_short_input_chars
+        )
+
+        if mode == "DEEP":
+            tiers = ["deep", "standard"]
+        elif mode == "METADATA" or short:
+            tiers = ["fast", "standard"]
+        else:
+            tiers = ["standard", "fast"]
+
+        routes = [self._tier(tier) for tier in tiers]
+        preferred = [r for r in routes if not self.is_saturated(r.model_name)]
+        saturated = [r for r in routes if self.is_saturated(r.model_name)]
+
+        if saturated and preferred and routes[0] is not preferred[0]:
+            logger.info(f"Model {routes[0].model_name} saturated, spilling over to {preferred[0].model_name}")
+
+        return preferred + saturated
+
+    def _recent(self, model_name: str, now: float) -> deque:
+        window = self._requests.setdefault(model_name, deque())
+        while window and window[0] < now - 60:
+            window.popleft()
+        return window
+
+    def is_saturated(self, model_name: str) -> bool:
+        """True while a model is cooling down from a 429 or at its RPM limit"""
+        now = time.monotonic()
+        with self._lock:
+            if self._cooldown_until.get(model_name, 0) > now:
+                return True
+            limit = self.settings.router_model_rpm.get(model_name)
+            return bool(limit) and len(self._recent(model_name, now)) >= limit
+
+    def record_request(self, model_name: str) -> None:
+        """Count a request against the model's per-minute window"""
+        now = time.monotonic()
+        with self._lock:
+            self._recent(model_name, now).append(now)
+
+    def record_rate_limited(self, model_name: str, retry_after: Optional[float] = None) -> None:
+        """Put a model in cooldown after it returned 429 / RESOURCE_EXHAUSTED"""
+        cooldown = retry_after or self.settings.router_rate_limit_cooldown_seconds
+        logger.warning(f"Model {model_name} rate limited, cooling down for {cooldown:.0f}s")
+        with self._lock:
+            self._cooldown_until[model_name] = time.monotonic() + cooldown
+
+
+@lru_cache()
+def get_model_router() -> ModelRouter:
+    """Get the process-wide model router (shares rate-limit state)"""
+    return ModelRouter()
@@ -0,0 +1,93 @@
+"""
+Negative Result Cache
+Remembers videos that have no captions or are unavailable/private so repeat
+jobs skip the transcript retries and yt-dlp fallback entirely.
+
+Entries expire after a short, per-cause TTL since captions can be added and
+videos can come back. Uses Redis (shared across workers) when `redis_url`
+is configured, otherwise an in-process dict.
+"""
+import time
+import logging
+import threading
+from typing import Optional
+from functools import lru_cache
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class NegativeCause:
+    """Why a video lookup is known to fail"""
+    NO_CAPTIONS = "no_captions"   # Transcripts disabled or no subtitle tracks at all
+    UNAVAILABLE = "unavailable"   # Private, removed or otherwise unavailable video
+
+
+class NegativeCache:
+    """Per-video negative lookup cache with TTLs by cause"""
+
+    KEY_PREFIX = "glint:negative:"
+
+    def __init__(self, ttls: dict[str, int], redis_url: str = ""):
+        self.ttls = ttls
+        self._entries: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+            except Exception as e:
+                logger.warning(f"Redis unavailable for negative cache, using in-process cache: {e}")
+
+    def get(self, video_id: str) -> Optional[str]:
+        """Get the cached failure cause for a video, or None if not known to fail"""
+        if self._redis is not None:
+            try:
+                return self._redis.get(f"{self.KEY_PREFIX}{video_id}")
+            except Exception as e:
+                logger.debug(f"Negative cache read failed: {e}")
+                return None
+
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if not entry:
+                return None
+            cause, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[video_id]
+                return None
+            return cause
+
+    def put(self, video_id: str, cause: str) -> None:
+        """Remember that a video lookup failed permanently for the cause's TTL"""
+        ttl = self.ttls.get(cause, 0)
+        if ttl <= 0:
+            return
+
+        logger.info(f"Caching {cause} for video {video_id} ({ttl}s)")
+
+        if self._redis is not None:
+            try:
+                self._redis.set(f"{self.KEY_PREFIX}{video_id}", cause, ex=ttl)
+            except Exception as e:
+                logger.debug(f"Negative cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._entries[video_id] = (cause, time.monotonic() + ttl)
+
+
+@lru_cache()
+def get_negative_cache() -> NegativeCache:
+    """Get cached negative result cache instance"""
+    settings = get_settings()
+    return NegativeCache(
+        ttls={
+            NegativeCause.NO_CAPTIONS: settings.negative_cache_no_captions_ttl_seconds,
+            NegativeCause.UNAVAILABLE: settings.negative_cache_unavailable_ttl_seconds,
+        },
+        redis_url=settings.redis_url,
+    )
@@ -0,0 +1,122 @@
+"""
+Stage Pipeline
+Separately sized pools for the stages of a job, connected by bounded queues,
+so YouTube fetches, downloads, Gemini analysis and persistence each stay busy
+on their own instead of every job holding one slot from start to finish.
+
+Stages (a job skips the ones it doesn't need):
+1. fetch    - Metadata and transcript
+2. download - Deep-mode download and Gemini upload
+3. analyze  - Gemini generation (pool size is `max_concurrent_jobs`)
+4. persist  - Saving the result
+
+Entering a stage first takes a place in that stage's queue and only then
+gives up the slot in the previous stage. When a queue is full the upstream
+slot stays taken, which backs up to the fetch queue and stops the runner
+from claiming more jobs than the pipeline can hold. Jobs waiting in the
+analyze queue already have their inputs fetched.
+"""
+import asyncio
+from typing import Optional
+
+from ..core.config import get_settings
+
+
+class Stage:
+    """Pipeline stage names, in order"""
+    FETCH = "fetch"
+    DOWNLOAD = "download"
+    ANALYZE = "analyze"
+    PERSIST = "persist"
+
+
+STAGES = (Stage.FETCH, Stage.DOWNLOAD, Stage.ANALYZE, Stage.PERSIST)
+
+
+def stage_pool_sizes(settings=None) -> dict[str, int]:
+    """Pool size per stage from worker settings"""
+    settings = settings or get_settings()
+    return {
+        Stage.FETCH: settings.pipeline_fetch_concurrency,
+        Stage.DOWNLOAD: settings.pipeline_download_concurrency,
+        Stage.ANALYZE: settings.max_concurrent_jobs,
+        Stage.PERSIST: settings.pipeline_persist_concurrency,
+    }
+
+
+def runner_capacity(settings=None) -> int:
+    """Jobs one runner holds at most: every pool slot plus every queue place"""
+    settings = settings or get_settings()
+    if not settings.pipeline_enabled:
+        return settings.max_concurrent_jobs
+    return sum(stage_pool_sizes(settings).values()) + settings.pipeline_queue_size * len(STAGES)
+
+
+class StagePipeline:
+    """Per-stage concurrency pools with a bounded queue in front of each"""
+
+    def __init__(self, pool_sizes: dict[str, int], queue_size: int):
+        self.pool_sizes = {stage: max(pool_sizes.get(stage, 1), 1) for stage in STAGES}
+        self.queue_size = max(queue_size, 1)
+        self._pools = {stage: asyncio.Semaphore(size) for stage, size in self.pool_sizes.items()}
+        self._queues = {stage: asyncio.Semaphore(self.queue_size) for stage in STAGES}
+        self.queued = {stage: 0 for stage in STAGES}
+        self.busy = {stage: 0 for stage in STAGES}
+
+    @classmethod
+    def from_settings(cls, settings=None) -> "StagePipeline":
+        settings = settings or get_settings()
+        return cls(stage_pool_sizes(settings), settings.pipeline_queue_size)
+
+    @property
+    def capacity(self) -> int:
+        return sum(self.pool_sizes.values()) + self.queue_size * len(STAGES)
+
+    def admission_room(self) -> int:
+        """Free places in the fetch queue, i.e. how many jobs the runner may claim now"""
+        return self.queue_size - self.queued[Stage.FETCH]
+
+    def ticket(self) -> "PipelineTicket":
+        return PipelineTicket(self)
+
+    def stats(self) -> dict[str, dict]:
+        """Busy slots and queued jobs per stage"""
+        return {
+            stage: {"busy": self.busy[stage], "queued": self.queued[stage], "size": self.pool_sizes[stage]}
+            for stage in STAGES
+        }
+
+
+class PipelineTicket:
+    """One job's position in the pipeline. A ticket without a pipeline never waits."""
+
+    def __init__(self, pipeline: Optional[StagePipeline]):
+        self.pipeline = pipeline
+        self.stage: Optional[str] = None
+
+    async def enter(self, stage: str) -> None:
+        """Move to a stage: queue for it, hand back the current slot, then wait for a slot"""
+        pipeline = self.pipeline
+        if pipeline is None or stage == self.stage:
+            return
+
+        # Holding the current slot while the next queue is full is the backpressure
+        await pipeline._queues[stage].acquire()
+        pipeline.queued[stage] += 1
+        try:
+            self.leave()
+            await pipeline._pools[stage].acquire()
+        finally:
+            pipeline.queued[stage] -= 1
+            pipeline._queues[stage].release()
+
+        self.stage = stage
+        pipeline.busy[stage] += 1
+
+    def leave(self) -> None:
+        """Release the current stage slot (job finished, failed or moved on)"""
+        if self.pipeline is None or self.stage is None:
+            return
+        self.pipeline.busy[self.stage] -= 1
+        self.pipeline._pools[self.stage].release()
+        self.stage = None
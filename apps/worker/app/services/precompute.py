@@ -0,0 +1,273 @@
+"""
+Idle Precompute
+Uses idle runner slots to run Standard analyses for videos likely to be
+requested soon, saving them through create_result so later requests are
+served straight from the result cache.
+
+Candidates (trending first):
+1. trending  - Videos requested by at least `precompute_min_requests` users in
+               the last `precompute_trending_window_hours` with no Standard
+               result yet and whose latest job did not fail (get_trending_videos,
+               migrations 00013, 00016). Standard results never expire, so
+               these are mostly videos so far requested only in Deep mode.
+2. seed file - Video IDs or URLs listed in `precompute_seed_file`
+
+Precomputes start only when a poll finds no pending jobs. Once one finds any,
+no new ones start, but running ones finish and save their result: their
+YouTube/Gemini calls run in threads that cancelling would not stop, so the
+quota would be spent for nothing. Each analysis first takes
+quota from the hourly and daily caps and claims its video for
+`precompute_claim_ttl_seconds`, both in Redis (fleet-wide) when `redis_url`
+is configured, otherwise in-process. Videos without a transcript or longer
+than `precompute_max_duration_seconds` are skipped, as are videos in the
+negative cache (unavailable, no captions).
+"""
+import os
+import re
+import time
+import asyncio
+import logging
+import threading
+
+from ..core.config import get_settings
+from .youtube_service import extract_video_id
+from .circuit_breaker import UpstreamUnavailable
+from .pipeline import Stage, PipelineTicket
+
+logger = logging.getLogger(__name__)
+
+VIDEO_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{11}$')
+
+
+class IdlePrecomputer:
+    """Pre-analyzes candidate videos in a runner's idle slots"""
+
+    KEY_PREFIX = "glint:precompute:"
+
+    def __init__(self, processor, settings=None):
+        self.settings = settings or get_settings()
+        self.processor = processor
+        self.completed = 0
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._candidates: list[dict] = []
+        self._refreshed_at = 0.0
+        self._paused_until = 0.0  # Upstream outage: don't spend quota on failures
+        self._yielding = False
+        self._claims: dict[str, float] = {}  # video_id -> monotonic expiry (in-process)
+        self._quota: dict[str, int] = {}  # window key -> analyses started (in-process)
+        self._lock = threading.Lock()
+        self._redis = None
+
+        if self.settings.redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(self.settings.redis_url, decode_responses=True)
+            except Exception as e:
+                logger.warning(f"Redis unavailable for precompute quotas, using in-process counters: {e}")
+
+    @property
+    def active(self) -> int:
+        return len(self._tasks)
+
+    async def fill(self, idle_slots: int) -> None:
+        """Start precomputes in up to `idle_slots` slots (call only when no jobs are pending)"""
+        room = min(idle_slots, self.settings.precompute_concurrency - len(self._tasks))
+        if self.processor.pipeline:
+            # Never take the last fetch-queue place, so the next poll can still admit a job
+            room = min(room, self.processor.pipeline.admission_room() - 1)
+        self._yielding = False
+        if room <= 0 or time.monotonic() < self._paused_until:
+            return
+
+        await self._refresh_candidates()
+
+        while room > 0 and self._candidates:
+            candidate = self._candidates.pop(0)
+            video_id = candidate["video_id"]
+            if video_id in self._tasks:
+                continue
+            # Unavailable or caption-less videos would only spend quota
+            if await asyncio.to_thread(self.processor.youtube.negative_cache.get, video_id):
+                continue
+            if not await asyncio.to_thread(self._claim, video_id):
+                continue
+
+            if not await asyncio.to_thread(self._take_quota):
+                logger.debug("Precompute quota used up")
+                await asyncio.to_thread(self._unclaim, video_id)
+                self._candidates.insert(0, candidate)
+                return
+
+            self._tasks[video_id] = asyncio.create_task(self._precompute(candidate))
+            room -= 1
+
+    def yield_slots(self) -> None:
+        """Jobs are queued: start no new precomputes and let running ones finish"""
+        if self._tasks and not self._yielding:
+            logger.info(f"Jobs queued; letting {len(self._tasks)} running precomputes finish")
+        self._yielding = True
+
+    async def stop(self) -> None:
+        """Cancel running precomputes (worker shutdown)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _refresh_candidates(self) -> None:
+        """Reload trending videos and the seed file every `precompute_refresh_seconds`"""
+        if self._refreshed_at and time.monotonic() - self._refreshed_at < self.settings.precompute_refresh_seconds:
+            return
+        self._refreshed_at = time.monotonic()
+
+        settings = self.settings
+        candidates: list[dict] = []
+        try:
+            candidates = await self.processor.job_repo.get_trending_videos(
+                window_hours=settings.precompute_trending_window_hours,
+                min_requests=settings.precompute_min_requests,
+                limit=settings.precompute_candidate_limit,
+            )
+        except Exception as e:
+            logger.error(f"Failed to load trending videos: {e}")
+
+        seen = {candidate["video_id"] for candidate in candidates}
+        for video_id in await asyncio.to_thread(self._read_seed_file):
+            if video_id not in seen:
+                seen.add(video_id)
+                candidates.append({"video_id": video_id, "video_url": f"https://www.youtube.com/watch?v={video_id}"})
+
+        self._candidates = candidates
+
+    def _read_seed_file(self) -> list[str]:
+        path = self.settings.precompute_seed_file
+        if not path or not os.path.exists(path):
+            return []
+
+        video_ids = []
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    video_id = line if VIDEO_ID_PATTERN.match(line) else extract_video_id(line)
+                    if video_id:
+                        video_ids.append(video_id)
+        except OSError as e:
+            logger.error(f"Failed to read precompute seed file {path}: {e}")
+        return video_ids
+
+    async def _precompute(self, candidate: dict) -> None:
+        """Fetch, analyze and save one video through the runner's stage pools"""
+        video_id = candidate["video_id"]
+        processor = self.processor
+        stages = PipelineTicket(processor.pipeline)
+
+        try:
+            if await processor.result_repo.find_by_video_and_mode(video_id, "STANDARD"):
+                return
+
+            await stages.enter(Stage.FETCH)
+            metadata = await asyncio.to_thread(processor.youtube.get_video_metadata, video_id)
+            if not metadata or metadata.duration_seconds > self.settings.precompute_max_duration_seconds:
+                return
+
+            transcript = await asyncio.to_thread(processor.youtube.get_transcript, video_id)
+            if not transcript:
+                return  # A metadata-only result isn't worth the quota
+
+            await stages.enter(Stage.ANALYZE)
+            analysis = await asyncio.to_thread(processor.analyzer.analyze_standard, metadata, transcript)
+            if not analysis:
+                return
+
+            await stages.enter(Stage.PERSIST)
+            await processor.result_repo.create_result(
+                video_id=video_id,
+                video_url=candidate["video_url"],
+                mode="STANDARD",
+                result_json=analysis.to_result_json(),
+                video_title=metadata.title,
+                video_thumbnail=metadata.thumbnail,
+                video_duration_seconds=metadata.duration_seconds,
+                transcript=transcript.text,
+            )
+            self.completed += 1
+            logger.info(f"Precomputed Standard analysis for video {video_id}")
+
+        except asyncio.CancelledError:
+            # Worker shutting down: let another worker try the video again
+            await asyncio.to_thread(self._unclaim, video_id)
+            raise
+
+        except UpstreamUnavailable as e:
+            logger.warning(f"Pausing precompute: {e}")
+            self._paused_until = time.monotonic() + max(self.settings.requeue_delay_seconds, e.retry_after)
+            await asyncio.to_thread(self._unclaim, video_id)
+
+        except Exception as e:
+            logger.error(f"Precompute of video {video_id} failed: {e}")
+
+        finally:
+            stages.leave()
+            self._tasks.pop(video_id, None)
+
+    def _claim(self, video_id: str) -> bool:
+        """Claim a video for `precompute_claim_ttl_seconds` so it is tried once per TTL"""
+        ttl = self.settings.precompute_claim_ttl_seconds
+        if self._redis is not None:
+            try:
+                return bool(self._redis.set(f"{self.KEY_PREFIX}claim:{video_id}", "1", nx=True, ex=ttl))
+            except Exception as e:
+                logger.warning(f"Redis precompute claim failed, using in-process claims: {e}")
+
+        now = time.monotonic()
+        with self._lock:
+            if self._claims.get(video_id, 0) > now:
+                return False
+            self._claims = {key: expiry for key, expiry in self._claims.items() if expiry > now}
+            self._claims[video_id] = now + ttl
+            return True
+
+    def _unclaim(self, video_id: str) -> None:
+        if self._redis is not None:
+            try:
+                self._redis.delete(f"{self.KEY_PREFIX}claim:{video_id}")
+            except Exception as e:
+                logger.debug(f"Redis precompute unclaim failed: {e}")
+        with self._lock:
+            self._claims.pop(video_id, None)
+
+    def _take_quota(self) -> bool:
+        """Count one analysis against the hourly and daily caps; False if either is full"""
+        now = time.gmtime()
+        windows = (
+            (f"hour:{time.strftime('%Y%m%d%H', now)}", self.settings.precompute_max_per_hour, 3600),
+            (f"day:{time.strftime('%Y%m%d', now)}", self.settings.precompute_max_per_day, 86400),
+        )
+
+        if self._redis is not None:
+            try:
+                taken = []
+                for window, cap, seconds in windows:
+                    key = f"{self.KEY_PREFIX}quota:{window}"
+                    count = self._redis.incr(key)
+                    self._redis.expire(key, seconds * 2)
+                    taken.append(key)
+                    if count > cap:
+                        for key in taken:
+                            self._redis.decr(key)
+                        return False
+                return True
+            except Exception as e:
+                logger.warning(f"Redis precompute quota failed, using in-process counters: {e}")
+
+        with self._lock:
+            if any(self._quota.get(window, 0) >= cap for window, cap, _ in windows):
+                return False
+            current = {window for window, _, _ in windows}
+            self._quota = {window: count for window, count in self._quota.items() if window in current}
+            for window, _, _ in windows:
+                self._quota[window] = self._quota.get(window, 0) + 1
+            return True
@@ -0,0 +1,125 @@
+"""
+Queue Monitor
+Scaling signal for the worker fleet: queue depth per mode, age of the oldest
+pending job, recent average service time and the estimated time to drain the
+queue at current capacity.
+
+Everything comes from one aggregate RPC (get_queue_stats), cached for
+`queue_stats_cache_seconds` so frequent autoscaler scrapes across the fleet
+don't each hit the database.
+"""
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+from ..core.config import get_settings
+from ..core.async_database import AsyncAnalysisJobRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModeQueueStats:
+    """Queue state for one analysis mode"""
+    mode: str
+    pending: int  # Waiting for the job runners
+    deferred_pending: int  # Waiting for the bulk runner
+    delayed: int  # Requeued after an upstream error, not claimable yet (not in pending)
+    processing: int
+    oldest_pending_seconds: float
+    completed_recent: int
+    avg_service_seconds: float
+    service_time_estimated: bool  # No recent completions, configured fallback used
+    work_seconds: float  # (pending + processing) * avg_service_seconds
+
+
+@dataclass
+class QueueStats:
+    """Fleet-wide queue state and drain estimate"""
+    window_minutes: int
+    active_runners: int
+    capacity_slots: int
+    pending_jobs: int
+    oldest_pending_seconds: float
+    drain_seconds: float
+    modes: list[ModeQueueStats] = field(default_factory=list)
+    collected_at: float = 0.0
+
+
+class QueueMonitor:
+    """Reads and caches queue stats"""
+
+    def __init__(self, settings=None, job_repo: Optional[AsyncAnalysisJobRepository] = None):
+        self.settings = settings or get_settings()
+        self.job_repo = job_repo or AsyncAnalysisJobRepository()
+        self._cached: Optional[QueueStats] = None
+        self._cached_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def stats(self) -> QueueStats:
+        """Current queue stats, at most `queue_stats_cache_seconds` old"""
+        async with self._lock:
+            if self._cached and time.monotonic() - self._cached_at < self.settings.queue_stats_cache_seconds:
+                return self._cached
+
+            rows = await self.job_repo.get_queue_stats(self.settings.queue_stats_window_minutes)
+            self._cached = self._build(rows)
+            self._cached_at = time.monotonic()
+            return self._cached
+
+    def _build(self, rows: list[dict]) -> QueueStats:
+        s = self.settings
+        modes = []
+
+        for row in rows:
+            mode = row["mode"]
+            # Deferred STANDARD jobs go to the bulk runner when it is enabled
+            runner_takes_deferred = not (s.bulk_mode_enabled and mode == "STANDARD")
+            pending = row["pending_count"] + (row["deferred_pending_count"] if runner_takes_deferred else 0)
+
+            avg_service = row["avg_service_seconds"]
+            estimated = not row["completed_count"] or avg_service is None
+            if estimated:
+                avg_service = s.queue_fallback_service_seconds.get(mode, 60.0)
+
+            modes.append(ModeQueueStats(
+                mode=mode,
+                pending=pending,
+                deferred_pending=0 if runner_takes_deferred else row["deferred_pending_count"],
+                delayed=row["delayed_count"],
+                processing=row["processing_count"],
+                oldest_pending_seconds=row["oldest_pending_seconds"] or 0.0,
+                completed_recent=row["completed_count"],
+                avg_service_seconds=avg_service,
+                service_time_estimated=estimated,
+                work_seconds=(pending + row["processing_count"]) * avg_service,
+            ))
+
+        # Every runner with queued work holds a lease, so lease owners
+        # approximate the fleet while there is a backlog
+        active_runners = max((row["active_runners"] for row in rows), default=0)
+
+        # work_seconds is end-to-end service time, so divide by the bottleneck
+        # (the analyze pool, max_concurrent_jobs per runner), not every pool
+        # slot and queue place a runner can hold
+        capacity_slots = max(active_runners, 1) * s.max_concurrent_jobs
+
+        return QueueStats(
+            window_minutes=s.queue_stats_window_minutes,
+            active_runners=active_runners,
+            capacity_slots=capacity_slots,
+            pending_jobs=sum(m.pending for m in modes),
+            oldest_pending_seconds=max((m.oldest_pending_seconds for m in modes), default=0.0),
+            drain_seconds=sum(m.work_seconds for m in modes) / capacity_slots,
+            modes=modes,
+            collected_at=time.time(),
+        )
+
+
+@lru_cache()
+def get_queue_monitor() -> QueueMonitor:
+    """Get cached queue monitor (shares the stats cache)"""
+    return QueueMonitor()
@@ -0,0 +1,120 @@
+"""
+YouTube Rate Limiter
+Fleet-wide token buckets for YouTube requests, so adding workers doesn't
+multiply the request rate until every worker is getting 429s.
+
+Buckets (rates are for the whole fleet, in requests per second):
+1. timedtext - Transcript/subtitle fetches
+2. watch     - Watch-page extraction (yt-dlp extract_info)
+3. download  - Media downloads
+
+Each acquire reserves the next slot in its bucket and sleeps until that
+slot, so waiters are served in order without polling. Buckets live in Redis
+(one Lua script per acquire, using the Redis clock) when `redis_url` is
+configured, otherwise in-process; if Redis errors, the in-process bucket is
+used for that call.
+"""
+import time
+import logging
+import threading
+from typing import Optional
+from functools import lru_cache
+
+from ..core.config import get_settings
+from .cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+
+class YouTubeBucket:
+    """Bucket names for YouTube request types"""
+    TIMEDTEXT = "timedtext"
+    WATCH = "watch"
+    DOWNLOAD = "download"
+
+
+# Reserve one token: refill by elapsed time, take a token (the balance may go
+# negative, which queues the caller), and return how long to wait for it
+RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - 1
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 60)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+class YouTubeRateLimiter:
+    """Token buckets per YouTube request type, shared across workers through Redis"""
+
+    KEY_PREFIX = "glint:ratelimit:youtube:"
+
+    def __init__(self, rates: dict[str, float], bursts: dict[str, float], redis_url: str = ""):
+        self.rates = rates
+        self.bursts = bursts
+        self._buckets: dict[str, tuple[float, float]] = {}  # bucket -> (tokens, monotonic ts)
+        self._lock = threading.Lock()
+        self._redis = None
+        self._reserve_script = None
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+                self._reserve_script = self._redis.register_script(RESERVE_SCRIPT)
+            except Exception as e:
+                logger.warning(f"Redis unavailable for YouTube rate limiter, using in-process buckets: {e}")
+
+    def _reserve_local(self, bucket: str, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(bucket, (burst, now))
+            tokens = min(burst, tokens + (now - ts) * rate) - 1
+            self._buckets[bucket] = (tokens, now)
+        return max(0.0, -tokens / rate)
+
+    def _reserve(self, bucket: str, rate: float, burst: float) -> float:
+        """Take a token; returns seconds until it may be used"""
+        if self._reserve_script is not None:
+            try:
+                return float(self._reserve_script(keys=[f"{self.KEY_PREFIX}{bucket}"], args=[rate, burst]))
+            except Exception as e:
+                logger.warning(f"Redis rate limiter failed, using in-process bucket: {e}")
+        return self._reserve_local(bucket, rate, burst)
+
+    def acquire(self, bucket: str, stop: Optional[CancellationToken] = None) -> bool:
+        """
+        Block until the bucket allows one request.
+        Returns False if `stop` was set while waiting (the caller should give up).
+        """
+        rate = self.rates.get(bucket, 0)
+        if rate <= 0:
+            return True  # Unlimited
+
+        wait = self._reserve(bucket, rate, max(self.bursts.get(bucket, 1), 1))
+        if wait > 0:
+            logger.debug(f"YouTube {bucket} bucket empty, waiting {wait:.1f}s")
+            if stop:
+                return not stop.wait(wait)
+            time.sleep(wait)
+        return True
+
+
+@lru_cache()
+def get_youtube_rate_limiter() -> YouTubeRateLimiter:
+    """Get cached YouTube rate limiter instance"""
+    settings = get_settings()
+    return YouTubeRateLimiter(
+        rates=settings.youtube_rate_limits,
+        bursts=settings.youtube_rate_bursts,
+        redis_url=settings.redis_url,
+    )
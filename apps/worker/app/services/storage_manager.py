@@ -0,0 +1,218 @@
+"""
+Temp Storage Manager
+Disk budget for Deep-mode downloads.
+
+Each download reserves its estimated size (from the video duration) before
+it starts, so concurrent long videos cannot fill the container disk, and the
+runner only admits Deep jobs while there is room. Small files can go to a
+tmpfs mount. Files left behind by crashed jobs are swept at startup and on a
+timer.
+
+Reservations are per process, but runner processes in one container share the
+download directories, so each process gets a 1/N share of the budget and of
+the free space above `storage_min_free_bytes` (N = runner processes).
+"""
+import os
+import glob
+import time
+import shutil
+import logging
+import threading
+from typing import Optional
+from functools import lru_cache
+
+from ..core.config import get_settings, runner_process_count
+
+logger = logging.getLogger(__name__)
+
+
+class StorageUnavailable(Exception):
+    """Raised when a download cannot be reserved within the disk budget"""
+    pass
+
+
+class StorageManager:
+    """Byte reservations for job downloads across a disk directory and an optional tmpfs"""
+
+    def __init__(
+        self,
+        base_path: str,
+        budget_bytes: int,
+        min_free_bytes: int,
+        bytes_per_second: int,
+        orphan_age_seconds: int,
+        tmpfs_path: str = "",
+        tmpfs_max_bytes: int = 0,
+        processes: int = 1
+    ):
+        self.processes = max(processes, 1)
+        self.base_path = base_path
+        self.budget_bytes = budget_bytes // self.processes
+        self.min_free_bytes = min_free_bytes
+        self.bytes_per_second = bytes_per_second
+        self.orphan_age_seconds = orphan_age_seconds
+        self.tmpfs_path = tmpfs_path
+        self.tmpfs_max_bytes = tmpfs_max_bytes
+        self._reservations: dict[str, tuple[str, int]] = {}  # job_id -> (directory, bytes)
+        self._lock = threading.Lock()
+
+        for path in self._directories():
+            os.makedirs(path, exist_ok=True)
+
+    def _directories(self) -> list[str]:
+        return [self.base_path] + ([self.tmpfs_path] if self.tmpfs_path else [])
+
+    def estimate_bytes(self, duration_seconds: int) -> int:
+        """Estimated download size for a video, with 50% headroom for bitrate variance"""
+        return int(max(duration_seconds, 60) * self.bytes_per_second * 1.5)
+
+    def _reserved_in(self, directory: str) -> int:
+        return sum(size for path, size in self._reservations.values() if path == directory)
+
+    def _fits(self, directory: str, nbytes: int) -> bool:
+        try:
+            free = shutil.disk_usage(directory).free
+        except OSError:
+            return False
+        # Reserved bytes may not be written yet, so count them against free space.
+        # Other processes' downloads shrink `free` as they are written, so this
+        # process only claims its share of the headroom.
+        headroom = (free - self.min_free_bytes) // self.processes
+        return self._reserved_in(directory) + nbytes <= headroom
+
+    def has_capacity(self, nbytes: int) -> bool:
+        """Whether a download of nbytes could be reserved right now (admission check)"""
+        with self._lock:
+            return self._pick_directory(nbytes) is not None
+
+    def _pick_directory(self, nbytes: int) -> Optional[str]:
+        if self.tmpfs_path and nbytes <= self.tmpfs_max_bytes and self._fits(self.tmpfs_path, nbytes):
+            return self.tmpfs_path
+
+        total = sum(size for _, size in self._reservations.values())
+        if self.budget_bytes and total + nbytes > self.budget_bytes:
+            return None
+        if not self._fits(self.base_path, nbytes):
+            return None
+        return self.base_path
+
+    def reserve(self, job_id: str, nbytes: int) -> str:
+        """
+        Reserve nbytes for a job's download.
+        Returns the output path prefix to download to (without extension).
+        Raises StorageUnavailable if the budget or free space doesn't allow it.
+        """
+        with self._lock:
+            if job_id in self._reservations:
+                directory, _ = self._reservations[job_id]
+                return os.path.join(directory, job_id)
+
+            directory = self._pick_directory(nbytes)
+            if directory is None:
+                raise StorageUnavailable(
+                    f"Not enough temp storage for {nbytes // (1024 * 1024)} MB download"
+                )
+            self._reservations[job_id] = (directory, nbytes)
+
+        logger.info(f"Reserved {nbytes // (1024 * 1024)} MB in {directory} for job {job_id}")
+        return os.path.join(directory, job_id)
+
+    def grow(self, job_id: str, nbytes: int) -> bool:
+        """
+        Grow a job's reservation to nbytes when its download turns out larger
+        than estimated. Returns False if the budget or free space doesn't allow it.
+        """
+        with self._lock:
+            directory, reserved = self._reservations.get(job_id, (self.base_path, 0))
+            extra = nbytes - reserved
+            if extra <= 0:
+                return True
+
+            total = sum(size for _, size in self._reservations.values())
+            if directory == self.base_path and self.budget_bytes and total + extra > self.budget_bytes:
+                return False
+            if not self._fits(directory, extra):
+                return False
+            self._reservations[job_id] = (directory, nbytes)
+
+        logger.info(f"Grew reservation for job {job_id} to {nbytes // (1024 * 1024)} MB")
+        return True
+
+    def adopt(self, job_id: str, path: str) -> None:
+        """
+        Reserve the size of a download kept from an earlier attempt, so it
+        counts against the budget and is not swept while the job resumes
+        """
+        try:
+            nbytes = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            self._reservations.setdefault(job_id, (os.path.dirname(path), nbytes))
+
+    def release(self, job_id: str, delete_files: bool = True) -> None:
+        """
+        Drop a job's reservation and delete any files it left behind.
+        With delete_files=False (job requeued), the files are kept for the
+        retry to resume from; the orphan sweep removes them if it never comes.
+        """
+        with self._lock:
+            self._reservations.pop(job_id, None)
+
+        if not delete_files:
+            return
+
+        for directory in self._directories():
+            prefix = glob.escape(os.path.join(directory, job_id))
+            for path in glob.glob(f"{prefix}.*"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def sweep_orphans(self) -> int:
+        """
+        Remove stale files not owned by a current reservation.
+        Uses file age, since other workers may share the directory.
+        Returns number of files removed.
+        """
+        removed = 0
+        cutoff = time.time() - self.orphan_age_seconds
+
+        with self._lock:
+            active = set(self._reservations)
+
+        for directory in self._directories():
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+
+            for name in names:
+                if name.split(".", 1)[0] in active:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+
+        return removed
+
+
+@lru_cache()
+def get_storage_manager() -> StorageManager:
+    """Get cached storage manager for Deep-mode downloads"""
+    settings = get_settings()
+    return StorageManager(
+        base_path=os.path.join(settings.temp_storage_path, "downloads"),
+        budget_bytes=settings.storage_budget_bytes,
+        min_free_bytes=settings.storage_min_free_bytes,
+        bytes_per_second=settings.storage_bytes_per_second,
+        orphan_age_seconds=settings.storage_orphan_age_seconds,
+        tmpfs_path=settings.storage_tmpfs_path,
+        tmpfs_max_bytes=settings.storage_tmpfs_max_bytes,
+        processes=runner_process_count(settings),
+    )
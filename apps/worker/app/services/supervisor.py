@@ -0,0 +1,302 @@
+"""
+Worker Supervisor
+Runs several job runner processes per container, so yt-dlp page parsing and
+subtitle processing can use every core instead of one GIL-bound process.
+
+The FastAPI process only supervises: it spawns the runner processes, restarts
+ones that die, and answers /health and metrics from a shared-memory stats
+table every runner rewrites each second. Claiming needs no extra coordination:
+claim_analysis_job is atomic in the database and every process claims under
+its own worker_id ({worker_id}-{index}), so leases stay per process. Cancel,
+job-status and job-state requests are forwarded to the runners over one pipe
+each.
+"""
+import os
+import time
+import signal
+import socket
+import asyncio
+import logging
+import threading
+import multiprocessing
+from typing import Any, Optional
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# One row of doubles per runner process in the shared stats table
+STAT_FIELDS = ("pid", "active_jobs", "max_concurrent", "completed_jobs", "failed_jobs", "heartbeat")
+STATS_INTERVAL_SECONDS = 1.0
+# A runner whose row is older than this is reported as not ready
+STALE_STATS_SECONDS = 10.0
+
+
+def _write_stats(stats, index: int, values: dict) -> None:
+    base = index * len(STAT_FIELDS)
+    with stats.get_lock():
+        for offset, field in enumerate(STAT_FIELDS):
+            stats[base + offset] = float(values.get(field, 0))
+
+
+def _run_process(index: int, worker_id: str, stats, conn, run_bulk: bool) -> None:
+    """Entry point of a runner process (spawned, so it starts from a clean interpreter)"""
+    # Ctrl-C reaches the whole process group; the supervisor coordinates shutdown
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s - runner-{index} - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    try:
+        asyncio.run(_serve(index, worker_id, stats, conn, run_bulk))
+    except Exception as e:
+        logger.error(f"Runner process {index} crashed: {e}")
+        raise
+
+
+async def _serve(index: int, worker_id: str, stats, conn, run_bulk: bool) -> None:
+    from .job_processor import JobRunner
+    from .job_state import get_job_states
+    from ..core.async_database import close_async_http_client
+
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stopping.set)
+
+    runner = JobRunner.from_settings(settings, worker_id=worker_id)
+    tasks = [asyncio.create_task(runner.start())]
+
+    batch_runner = None
+    if run_bulk:
+        from .batch_processor import BatchRunner
+        batch_runner = BatchRunner.from_settings(settings, worker_id=worker_id)
+        tasks.append(asyncio.create_task(batch_runner.start()))
+
+    async def handle(command: str, job_id: str) -> Any:
+        if command == "cancel":
+            return runner.cancel_job(job_id)
+        if command == "state":
+            return get_job_states().get(job_id)
+        return job_id in runner.active_jobs
+
+    def serve_commands():
+        # Blocking pipe reads stay off the event loop
+        while True:
+            try:
+                seq, command, job_id = conn.recv()
+            except (EOFError, OSError):
+                command = "stop"  # Supervisor went away
+            if command == "stop":
+                loop.call_soon_threadsafe(stopping.set)
+                return
+            result = asyncio.run_coroutine_threadsafe(handle(command, job_id), loop).result()
+            try:
+                conn.send((seq, result))
+            except OSError:
+                pass
+
+    threading.Thread(target=serve_commands, name=f"runner-{index}-commands", daemon=True).start()
+
+    def report():
+        _write_stats(stats, index, {
+            "pid": os.getpid(),
+            "active_jobs": len(runner.active_jobs),
+            "max_concurrent": runner.max_concurrent,
+            "completed_jobs": runner.completed_jobs,
+            "failed_jobs": runner.failed_jobs,
+            "heartbeat": time.time(),
+        })
+
+    while not stopping.is_set():
+        report()
+        try:
+            await asyncio.wait_for(stopping.wait(), STATS_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    # Hand in-flight jobs back to the queue before exiting
+    if batch_runner:
+        await batch_runner.shutdown()
+    await runner.shutdown()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    report()
+
+    await close_async_http_client()
+    logger.info(f"Runner process {index} stopped")
+
+
+class WorkerSupervisor:
+    """Spawns, restarts and aggregates runner processes"""
+
+    def __init__(
+        self,
+        processes: int,
+        worker_id: str = "",
+        run_bulk: bool = False,
+        restart_delay: float = 5.0,
+        call_timeout: float = 5.0
+    ):
+        self.processes = processes
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.run_bulk = run_bulk
+        self.restart_delay = restart_delay
+        self.call_timeout = call_timeout
+        self.restarts = 0
+        self.running = False
+        # spawn rather than fork: the parent already runs threads and an event loop
+        self._ctx = multiprocessing.get_context("spawn")
+        self.stats = self._ctx.Array("d", processes * len(STAT_FIELDS))
+        self._procs: list[Optional[multiprocessing.process.BaseProcess]] = [None] * processes
+        self._conns: list = [None] * processes
+        self._conn_locks = [threading.Lock() for _ in range(processes)]
+        self._seq = 0
+
+    def _spawn(self, index: int) -> None:
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_run_process,
+            args=(index, f"{self.worker_id}-{index}", self.stats, child_conn, self.run_bulk and index == 0),
+            name=f"glint-runner-{index}",
+            daemon=True,
+        )
+        proc.start()
+        child_conn.close()
+
+        with self._conn_locks[index]:
+            self._procs[index] = proc
+            self._conns[index] = parent_conn
+        logger.info(f"Started runner process {index} (pid={proc.pid})")
+
+    def start(self) -> None:
+        """Spawn all runner processes"""
+        self.running = True
+        for index in range(self.processes):
+            self._spawn(index)
+        logger.info(f"Supervisor started {self.processes} runner processes (worker_id={self.worker_id})")
+
+    async def run(self) -> None:
+        """Start the runners, then restart any that exit until stopped"""
+        await asyncio.to_thread(self.start)
+
+        while self.running:
+            await asyncio.sleep(self.restart_delay)
+
+            for index, proc in enumerate(self._procs):
+                if not self.running or proc is None or proc.is_alive():
+                    continue
+                # Its claimed jobs come back through the lease reaper
+                logger.error(f"Runner process {index} exited with code {proc.exitcode}, restarting")
+                _write_stats(self.stats, index, {})
+                self.restarts += 1
+                await asyncio.to_thread(self._spawn, index)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Ask every runner to release its jobs and exit; terminate stragglers"""
+        self.running = False
+
+        for index, conn in enumerate(self._conns):
+            if conn is None:
+                continue
+            with self._conn_locks[index]:
+                try:
+                    conn.send((0, "stop", ""))
+                except OSError:
+                    pass
+
+        deadline = time.monotonic() + timeout
+        for index, proc in enumerate(self._procs):
+            if proc is None:
+                continue
+            proc.join(max(deadline - time.monotonic(), 0))
+            if proc.is_alive():
+                logger.warning(f"Runner process {index} did not stop in time, terminating")
+                proc.terminate()
+                proc.join(5)
+
+        logger.info("Supervisor stopped all runner processes")
+
+    def _call(self, index: int, command: str, job_id: str) -> Any:
+        proc, conn = self._procs[index], self._conns[index]
+        if proc is None or conn is None or not proc.is_alive():
+            return None
+
+        with self._conn_locks[index]:
+            self._seq += 1
+            seq = self._seq
+            try:
+                conn.send((seq, command, job_id))
+                deadline = time.monotonic() + self.call_timeout
+                # Skip late replies to earlier calls that timed out
+                while conn.poll(max(deadline - time.monotonic(), 0)):
+                    reply_seq, result = conn.recv()
+                    if reply_seq == seq:
+                        return result
+            except (EOFError, OSError) as e:
+                logger.warning(f"Runner process {index} did not answer {command}: {e}")
+        return None
+
+    def cancel_job(self, job_id: str) -> bool:
+        """Forward a cancel to every runner; True if one of them was running the job"""
+        return any([self._call(index, "cancel", job_id) for index in range(self.processes)])
+
+    def is_processing(self, job_id: str) -> bool:
+        """Whether any runner process is working on the job"""
+        return any(self._call(index, "status", job_id) for index in range(self.processes))
+
+    def job_state(self, job_id: str) -> Optional[dict]:
+        """A job's in-memory state from whichever runner knows it"""
+        for index in range(self.processes):
+            state = self._call(index, "state", job_id)
+            if state is not None:
+                return state
+        return None
+
+    def process_stats(self) -> list[dict]:
+        """Per-process rows from the shared stats table"""
+        with self.stats.get_lock():
+            values = self.stats[:]
+
+        now = time.time()
+        width = len(STAT_FIELDS)
+        rows = []
+        for index in range(self.processes):
+            row = dict(zip(STAT_FIELDS, values[index * width:(index + 1) * width]))
+            proc = self._procs[index]
+            alive = proc is not None and proc.is_alive()
+            rows.append({
+                "index": index,
+                "pid": int(row["pid"]),
+                "ready": alive and row["heartbeat"] > 0 and now - row["heartbeat"] < STALE_STATS_SECONDS,
+                "active_jobs": int(row["active_jobs"]),
+                "max_concurrent": int(row["max_concurrent"]),
+                "completed_jobs": int(row["completed_jobs"]),
+                "failed_jobs": int(row["failed_jobs"]),
+            })
+        return rows
+
+    def aggregate_stats(self) -> dict:
+        """Totals across runner processes for /health and metrics"""
+        rows = self.process_stats()
+        ready = sum(1 for row in rows if row["ready"])
+
+        if ready == self.processes:
+            status = "healthy"
+        elif ready:
+            status = "degraded"
+        else:
+            status = "starting"
+
+        return {
+            "status": status,
+            "processes": self.processes,
+            "ready_processes": ready,
+            "restarts": self.restarts,
+            "active_jobs": sum(row["active_jobs"] for row in rows),
+            "max_concurrent": sum(row["max_concurrent"] for row in rows),
+            "completed_jobs": sum(row["completed_jobs"] for row in rows),
+            "failed_jobs": sum(row["failed_jobs"] for row in rows),
+        }
@@ -0,0 +1,135 @@
+"""
+Transcript Compaction
+Shrinks "[MM:SS] text" transcripts before prompting: drops non-speech tags and
+the rolling/exact duplicates of auto-generated captions, merges caption lines
+into sentence-sized blocks and fits the result to a token budget.
+"""
+import re
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# "[MM:SS] text" lines as produced by YouTubeService
+LINE_PATTERN = re.compile(r"^\[(\d{2,}:\d{2})\]\s*(.*)$")
+
+# Non-speech annotations: [Music], [Applause], [음악], ♪ lyrics markers, (laughs)...
+NON_SPEECH_PATTERN = re.compile(
+    r"\[[^\]]{1,40}\]|[♪♫]+|"
+    r"\((?:music|applause|laughter|laughs|laughing|inaudible|silence|cheering|음악|박수|웃음)\)|"
+    r"^\s*>>\s*",
+    re.IGNORECASE
+)
+
+SENTENCE_END = (".", "?", "!", "。", "？", "！", "…")
+
+MIN_BLOCK_CHARS = 80    # Don't close a block on punctuation before this
+MAX_BLOCK_CHARS = 400   # Close a block here even without punctuation (auto captions)
+RECENT_WINDOW = 3       # Segments remembered for exact-duplicate detection
+MAX_TAIL_WORDS = 30     # Words remembered for rolling-overlap detection
+
+# Fallback when the token counter is unavailable (conservative for CJK text)
+CHARS_PER_TOKEN_FALLBACK = 3
+
+
+def _overlap(tail: list[str], words: list[str]) -> int:
+    """Longest k where the last k words of tail equal the first k of words"""
+    for k in range(min(len(tail), len(words)), 0, -1):
+        if tail[-k:] == words[:k]:
+            return k
+    return 0
+
+
+def compact_transcript(text: str) -> list[str]:
+    """
+    Compact a timestamped transcript into "[MM:SS] sentence" blocks.
+
+    Rolling captions repeat the tail of the previous line at the start of the
+    next one ("a b c" -> "b c d"), so only the words past the overlap with
+    what was already emitted are appended.
+    """
+    blocks: list[str] = []
+    timestamp = None
+    words: list[str] = []
+    tail: list[str] = []  # Last words emitted, across block boundaries
+    recent: list[str] = []
+
+    for line in text.splitlines():
+        match = LINE_PATTERN.match(line.strip())
+        if match:
+            line_timestamp, content = match.groups()
+        else:
+            line_timestamp, content = timestamp, line
+
+        content = " ".join(NON_SPEECH_PATTERN.sub(" ", content).split())
+        if not content:
+            continue
+
+        # Exact repeats of a recent segment
+        key = content.lower()
+        if key in recent:
+            continue
+        recent = (recent + [key])[-RECENT_WINDOW:]
+
+        segment = content.split()
+        overlap = _overlap(tail, segment)
+        if overlap < min(2, len(segment)):
+            overlap = 0
+        new_words = segment[overlap:]
+        if not new_words:
+            continue
+
+        if timestamp is None:
+            timestamp = line_timestamp or "00:00"
+        words.extend(new_words)
+        tail = (tail + new_words)[-MAX_TAIL_WORDS:]
+
+        block_chars = sum(len(w) + 1 for w in words)
+        if block_chars >= MAX_BLOCK_CHARS or (
+            block_chars >= MIN_BLOCK_CHARS and words[-1].endswith(SENTENCE_END)
+        ):
+            blocks.append(f"[{timestamp}] {' '.join(words)}")
+            timestamp, words = None, []
+
+    if words:
+        blocks.append(f"[{timestamp}] {' '.join(words)}")
+    return blocks
+
+
+def fit_to_token_budget(
+    blocks: list[str],
+    budget: int,
+    count_tokens: Callable[[str], int],
+    max_rounds: int = 3
+) -> str:
+    """
+    Join blocks and, if they exceed the token budget, keep an evenly spaced
+    subset so the whole video stays covered (timestamps show the gaps).
+    """
+    text = "\n".join(blocks)
+
+    for round_ in range(max_rounds + 1):
+        try:
+            tokens = count_tokens(text)
+        except Exception as e:
+            logger.debug(f"Token count failed, estimating from characters: {e}")
+            tokens = len(text) // CHARS_PER_TOKEN_FALLBACK + 1
+
+        if tokens <= budget or len(blocks) <= 1:
+            return text
+        if round_ == max_rounds:
+            break
+
+        # Keep the matching fraction of blocks, with headroom for uneven block sizes
+        keep_ratio = budget / tokens * 0.95
+        kept, carry = [], 1.0 - keep_ratio  # Always keep the first block
+        for block in blocks:
+            carry += keep_ratio
+            if carry >= 1:
+                kept.append(block)
+                carry -= 1
+        blocks = kept or blocks[:1]
+        text = "\n".join(blocks)
+
+    # Still over after max_rounds: hard cut on the estimated character budget
+    return text[:budget * CHARS_PER_TOKEN_FALLBACK]
@@ -0,0 +1,169 @@
+"""
+Gemini Upload Registry
+Remembers videos already uploaded to Gemini, keyed by video_id and download
+profile, so later Deep jobs for the same video reuse the uploaded file and
+skip both the download and the upload.
+
+Gemini keeps uploaded files for about 48 hours. Entries live for
+`upload_registry_ttl_seconds` (kept under that), and expired files are
+deleted by the runner's periodic sweep rather than right after each job.
+
+Backends:
+1. Local - One JSON file under `upload_registry_path` (can be a shared volume),
+            updated under an flock so runner processes don't lose writes
+2. Redis - One key per upload plus an expiry index, shared across workers
+"""
+import os
+import json
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+from functools import lru_cache
+
+from ..core.config import get_settings
+from .file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class UploadRegistry(ABC):
+    """Base interface for the shared registry of uploaded Gemini files"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(video_id: str, profile: str) -> str:
+        return f"{video_id}:{profile}"
+
+    @abstractmethod
+    def get(self, video_id: str, profile: str) -> Optional[str]:
+        """Get the Gemini file name for a video, or None if not uploaded"""
+
+    @abstractmethod
+    def put(self, video_id: str, profile: str, file_name: str) -> None:
+        """Register an uploaded file for reuse until the TTL runs out"""
+
+    @abstractmethod
+    def remove(self, video_id: str, profile: str) -> None:
+        """Forget an upload (e.g. Gemini already deleted it)"""
+
+    @abstractmethod
+    def pop_expired(self) -> list[str]:
+        """Remove expired entries and return their file names for deletion"""
+
+
+class LocalUploadRegistry(UploadRegistry):
+    """File-backed registry: {base_path}/uploads.json"""
+
+    def __init__(self, base_path: str, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        self.path = os.path.join(base_path, "uploads.json")
+        self.lock_path = f"{self.path}.lock"
+        self._lock = threading.Lock()
+        os.makedirs(base_path, exist_ok=True)
+
+    def _read(self) -> dict[str, dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable upload registry: {e}")
+            return {}
+
+    def _write(self, data: dict[str, dict]) -> None:
+        # Write to a temp file and rename so readers never see a partial file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, video_id: str, profile: str) -> Optional[str]:
+        with self._lock:
+            entry = self._read().get(self._key(video_id, profile))
+        if not entry or entry["expires_at"] < time.time():
+            return None
+        return entry["file_name"]
+
+    def put(self, video_id: str, profile: str, file_name: str) -> None:
+        with self._lock, file_lock(self.lock_path):
+            data = self._read()
+            data[self._key(video_id, profile)] = {
+                "file_name": file_name,
+                "expires_at": time.time() + self.ttl_seconds,
+            }
+            self._write(data)
+
+    def remove(self, video_id: str, profile: str) -> None:
+        with self._lock, file_lock(self.lock_path):
+            data = self._read()
+            if data.pop(self._key(video_id, profile), None):
+                self._write(data)
+
+    def pop_expired(self) -> list[str]:
+        now = time.time()
+        with self._lock, file_lock(self.lock_path):
+            data = self._read()
+            expired = [key for key, entry in data.items() if entry["expires_at"] < now]
+            if not expired:
+                return []
+            file_names = [data.pop(key)["file_name"] for key in expired]
+            self._write(data)
+        return file_names
+
+
+class RedisUploadRegistry(UploadRegistry):
+    """
+    Redis-backed registry: `glint:upload:{video_id}:{profile}` -> file name,
+    plus a sorted set of file names by expiry so expired files can be deleted.
+    """
+
+    KEY_PREFIX = "glint:upload:"
+    EXPIRY_INDEX = "glint:upload-expiry"
+
+    def __init__(self, redis_url: str, ttl_seconds: int):
+        super().__init__(ttl_seconds)
+        import redis
+        self.redis = redis.Redis.from_url(redis_url, decode_responses=True)
+
+    def get(self, video_id: str, profile: str) -> Optional[str]:
+        return self.redis.get(f"{self.KEY_PREFIX}{self._key(video_id, profile)}")
+
+    def put(self, video_id: str, profile: str, file_name: str) -> None:
+        pipe = self.redis.pipeline()
+        pipe.set(f"{self.KEY_PREFIX}{self._key(video_id, profile)}", file_name, ex=self.ttl_seconds)
+        pipe.zadd(self.EXPIRY_INDEX, {file_name: time.time() + self.ttl_seconds})
+        pipe.execute()
+
+    def remove(self, video_id: str, profile: str) -> None:
+        key = f"{self.KEY_PREFIX}{self._key(video_id, profile)}"
+        file_name = self.redis.get(key)
+        pipe = self.redis.pipeline()
+        pipe.delete(key)
+        if file_name:
+            pipe.zrem(self.EXPIRY_INDEX, file_name)
+        pipe.execute()
+
+    def pop_expired(self) -> list[str]:
+        now = time.time()
+        expired = self.redis.zrangebyscore(self.EXPIRY_INDEX, 0, now)
+        # zrem reports which members this worker removed, so each file is deleted once
+        return [name for name in expired if self.redis.zrem(self.EXPIRY_INDEX, name)]
+
+
+@lru_cache()
+def get_upload_registry() -> UploadRegistry:
+    """Get cached upload registry for the configured backend"""
+    settings = get_settings()
+
+    if settings.upload_registry_backend == "redis" and settings.redis_url:
+        return RedisUploadRegistry(settings.redis_url, settings.upload_registry_ttl_seconds)
+
+    return LocalUploadRegistry(
+        settings.upload_registry_path or os.path.join(settings.temp_storage_path, "uploads"),
+        settings.upload_registry_ttl_seconds
+    )
@@ -0,0 +1,69 @@
+"""
+Video Segmenter
+Splits long Deep-mode downloads into time windows with ffmpeg stream copy
+(no re-encoding), so segments can be uploaded and analyzed in parallel.
+"""
+import os
+import csv
+import logging
+import subprocess
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VideoSegment:
+    """One time window of a video"""
+    path: str
+    start_seconds: float
+    end_seconds: float
+
+
+def split_video(video_path: str, segment_seconds: int, ffmpeg_path: str = "ffmpeg") -> list[VideoSegment]:
+    """
+    Split a video into ~segment_seconds windows next to the source file:
+    {base}.seg000.{ext}, {base}.seg001.{ext}, ...
+
+    Stream copy can only cut on keyframes, so segments are rarely exactly
+    segment_seconds long. Real start/end times come from ffmpeg's segment
+    list rather than index * segment_seconds.
+    """
+    base, ext = os.path.splitext(video_path)
+    list_path = f"{base}.segments.csv"
+
+    command = [
+        ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y",
+        "-i", video_path,
+        "-map", "0", "-c", "copy",
+        "-f", "segment",
+        "-segment_time", str(segment_seconds),
+        "-reset_timestamps", "1",
+        "-segment_list", list_path,
+        "-segment_list_type", "csv",
+        f"{base}.seg%03d{ext}",
+    ]
+
+    try:
+        subprocess.run(command, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg segmenting failed: {e.stderr.strip()[:500]}") from e
+
+    try:
+        with open(list_path, newline='', encoding='utf-8') as f:
+            segments = [
+                VideoSegment(
+                    path=os.path.join(os.path.dirname(video_path), row[0]),
+                    start_seconds=float(row[1]),
+                    end_seconds=float(row[2]),
+                )
+                for row in csv.reader(f) if row
+            ]
+    finally:
+        try:
+            os.remove(list_path)
+        except OSError:
+            pass
+
+    logger.info(f"Split {video_path} into {len(segments)} segments")
+    return segments
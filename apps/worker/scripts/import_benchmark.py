@@ -0,0 +1,72 @@
+"""
+Import-Time Benchmark
+Measures how long a fresh interpreter takes to import a module (app.main by
+default) using `python -X importtime`, and lists the slowest imports.
+
+Usage (from apps/worker):
+    python scripts/import_benchmark.py
+    python scripts/import_benchmark.py --module app.services.job_processor --runs 10
+    python scripts/import_benchmark.py --max-ms 400   # exit 1 above budget (CI)
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+WORKER_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> dict[str, int]:
+    """Import module in a fresh interpreter; returns cumulative microseconds per imported module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=WORKER_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    # Lines look like: "import time:      self [us] |  cumulative | imported package"
+    cumulative: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark worker import time")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--max-ms", type=float, default=0, help="Fail if the median exceeds this")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals_ms = [run.get(args.module, 0) / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+
+    print(f"{args.module}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals_ms):.1f}, max {max(totals_ms):.1f})")
+
+    heavy = ("yt_dlp", "google.generativeai", "youtube_transcript_api")
+    loaded = [name for name in heavy if name in runs[-1]]
+    print(f"Heavy modules loaded: {', '.join(loaded) if loaded else 'none'}")
+
+    print("\nSlowest imports (cumulative, last run):")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+    for name, us in slowest[:args.top]:
+        print(f"  {us / 1000:9.1f} ms  {name}")
+
+    if args.max_ms and median_ms > args.max_ms:
+        print(f"\nFAIL: median {median_ms:.1f} ms exceeds budget of {args.max_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
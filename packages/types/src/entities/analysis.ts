@@ -83,6 +83,7 @@ export interface AnalysisJob {
   errorMessage: string | null;
   errorCode: string | null;
   progress: number;
+  partialResult: Partial<AnalysisResultJson> | null; // 스트리밍 중 먼저 완성된 필드 (title, summary)
   startedAt: string | null;
   completedAt: string | null;
   createdAt: string;
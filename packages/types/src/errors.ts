@@ -28,6 +28,7 @@ export enum ErrorCode {
   ANALYSIS_ALREADY_EXISTS = 'ANALYSIS_005',
   ANALYSIS_JOB_FAILED = 'ANALYSIS_006',
   ANALYSIS_JOB_NOT_FOUND = 'ANALYSIS_007',
+  ANALYSIS_JOB_CANCELLED = 'ANALYSIS_008',
 
   // Notion (NOTION_0xx)
   NOTION_NOT_CONNECTED = 'NOTION_001',
@@ -72,6 +73,7 @@ export const ErrorMessages: Record<ErrorCode, string> = {
   [ErrorCode.ANALYSIS_ALREADY_EXISTS]: 'Analysis already exists for this video',
   [ErrorCode.ANALYSIS_JOB_FAILED]: 'Analysis job failed',
   [ErrorCode.ANALYSIS_JOB_NOT_FOUND]: 'Analysis job not found',
+  [ErrorCode.ANALYSIS_JOB_CANCELLED]: 'Analysis job was cancelled',
 
   [ErrorCode.NOTION_NOT_CONNECTED]: 'Notion is not connected',
   [ErrorCode.NOTION_SYNC_CONFLICT]: 'Sync conflict detected. Please try again',
@@ -0,0 +1,50 @@
+-- =============================================
+-- 분석 작업 완료 함수 (원자적 처리)
+-- =============================================
+-- Upserts the analysis result on (video_id, mode) and marks the job
+-- COMPLETED in a single transaction. Replaces the worker's
+-- find -> insert/update -> complete_job round trips and prevents two
+-- workers from inserting duplicate result rows for the same video.
+CREATE OR REPLACE FUNCTION finalize_job(
+    p_job_id UUID,
+    p_video_id TEXT,
+    p_video_url TEXT,
+    p_mode TEXT,
+    p_result_json JSONB,
+    p_video_title TEXT DEFAULT NULL,
+    p_video_thumbnail TEXT DEFAULT NULL,
+    p_video_duration_seconds INT DEFAULT NULL,
+    p_transcript TEXT DEFAULT NULL
+)
+RETURNS UUID AS $$
+DECLARE
+    v_result_id UUID;
+BEGIN
+    INSERT INTO analysis_results (
+        video_id, video_url, mode, result_json,
+        video_title, video_thumbnail, video_duration_seconds, transcript
+    )
+    VALUES (
+        p_video_id, p_video_url, p_mode, p_result_json,
+        p_video_title, p_video_thumbnail, p_video_duration_seconds, p_transcript
+    )
+    ON CONFLICT (video_id, mode)
+    DO UPDATE SET
+        video_url = EXCLUDED.video_url,
+        result_json = EXCLUDED.result_json,
+        video_title = EXCLUDED.video_title,
+        video_thumbnail = EXCLUDED.video_thumbnail,
+        video_duration_seconds = EXCLUDED.video_duration_seconds,
+        transcript = EXCLUDED.transcript
+    RETURNING id INTO v_result_id;
+
+    UPDATE analysis_jobs
+    SET status = 'COMPLETED',
+        result_id = v_result_id,
+        progress = 100,
+        completed_at = NOW()
+    WHERE id = p_job_id;
+
+    RETURN v_result_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
@@ -0,0 +1,53 @@
+-- =============================================
+-- 분석 작업 실패 + 크레딧 환불 함수 (원자적, 멱등)
+-- =============================================
+-- Marks the job FAILED and refunds credits_reserved in one transaction.
+-- Safe to call repeatedly for the same job: the job row is locked and a
+-- refund is only issued when none exists yet for this job_id.
+-- A job that already COMPLETED is left untouched.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_credit_transactions_job_refund
+    ON credit_transactions(reference_id)
+    WHERE type = 'REFUND' AND reference_type = 'analysis_job';
+
+CREATE OR REPLACE FUNCTION fail_and_refund_job(
+    p_job_id UUID,
+    p_error_message TEXT,
+    p_error_code TEXT DEFAULT 'ANALYSIS_006'
+)
+RETURNS INT AS $$
+DECLARE
+    v_job RECORD;
+    v_refunded INT := 0;
+BEGIN
+    SELECT user_id, status, credits_reserved INTO v_job
+    FROM analysis_jobs WHERE id = p_job_id FOR UPDATE;
+
+    IF NOT FOUND OR v_job.status = 'COMPLETED' THEN
+        RETURN 0;
+    END IF;
+
+    IF v_job.status <> 'FAILED' THEN
+        UPDATE analysis_jobs
+        SET status = 'FAILED',
+            error_message = p_error_message,
+            error_code = p_error_code,
+            completed_at = NOW()
+        WHERE id = p_job_id;
+    END IF;
+
+    IF v_job.credits_reserved > 0 AND NOT EXISTS (
+        SELECT 1 FROM credit_transactions
+        WHERE reference_id = p_job_id AND type = 'REFUND' AND reference_type = 'analysis_job'
+    ) THEN
+        PERFORM refund_credits(
+            v_job.user_id,
+            v_job.credits_reserved,
+            'Refund for failed analysis job ' || p_job_id::TEXT,
+            p_job_id
+        );
+        v_refunded := v_job.credits_reserved;
+    END IF;
+
+    RETURN v_refunded;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
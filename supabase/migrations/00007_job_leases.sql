@@ -0,0 +1,111 @@
+-- =============================================
+-- 분석 작업 리스 (lease) + 하트비트 + 회수
+-- =============================================
+-- A worker that claims a job holds a lease on it and renews the lease with
+-- periodic heartbeats. If the worker crashes or is redeployed, the lease
+-- expires and reclaim_expired_jobs() returns the job to PENDING so another
+-- worker can pick it up. Jobs that keep getting stranded are failed (and
+-- refunded) after p_max_attempts claims.
+ALTER TABLE analysis_jobs
+    ADD COLUMN IF NOT EXISTS lease_owner TEXT,
+    ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS attempts INT NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_lease_expires
+    ON analysis_jobs(lease_expires_at) WHERE status = 'PROCESSING';
+
+-- Claim a PENDING job and take its lease (uses the database clock)
+CREATE OR REPLACE FUNCTION claim_analysis_job(
+    p_job_id UUID,
+    p_worker_id TEXT,
+    p_lease_seconds INT DEFAULT 60
+)
+RETURNS SETOF analysis_jobs AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE analysis_jobs
+    SET status = 'PROCESSING',
+        started_at = NOW(),
+        lease_owner = p_worker_id,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = attempts + 1
+    WHERE id = p_job_id AND status = 'PENDING'
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Extend the leases a worker still holds. Returns the ids still owned,
+-- so the worker can notice jobs that were reclaimed from under it.
+CREATE OR REPLACE FUNCTION renew_job_leases(
+    p_worker_id TEXT,
+    p_job_ids UUID[],
+    p_lease_seconds INT DEFAULT 60
+)
+RETURNS SETOF UUID AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE analysis_jobs
+    SET lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id = ANY(p_job_ids) AND status = 'PROCESSING' AND lease_owner = p_worker_id
+    RETURNING id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Hand a worker's in-flight jobs back to the queue (graceful shutdown)
+CREATE OR REPLACE FUNCTION release_job_leases(
+    p_worker_id TEXT,
+    p_job_ids UUID[]
+)
+RETURNS INT AS $$
+DECLARE
+    v_count INT;
+BEGIN
+    UPDATE analysis_jobs
+    SET status = 'PENDING',
+        lease_owner = NULL,
+        lease_expires_at = NULL,
+        attempts = GREATEST(attempts - 1, 0),  -- A clean handoff is not a failed attempt
+        progress = 0
+    WHERE id = ANY(p_job_ids) AND status = 'PROCESSING' AND lease_owner = p_worker_id;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Return PROCESSING jobs with expired leases to PENDING.
+-- Jobs claimed before leases existed fall back to started_at + 1 hour.
+CREATE OR REPLACE FUNCTION reclaim_expired_jobs(
+    p_max_attempts INT DEFAULT 3
+)
+RETURNS INT AS $$
+DECLARE
+    v_job RECORD;
+    v_count INT := 0;
+BEGIN
+    FOR v_job IN
+        SELECT id, attempts FROM analysis_jobs
+        WHERE status = 'PROCESSING'
+          AND COALESCE(lease_expires_at, started_at + INTERVAL '1 hour') < NOW()
+        FOR UPDATE SKIP LOCKED
+    LOOP
+        IF v_job.attempts >= p_max_attempts THEN
+            PERFORM fail_and_refund_job(
+                v_job.id,
+                'Job abandoned by worker ' || p_max_attempts || ' times',
+                'ANALYSIS_006'
+            );
+        ELSE
+            UPDATE analysis_jobs
+            SET status = 'PENDING',
+                lease_owner = NULL,
+                lease_expires_at = NULL,
+                progress = 0
+            WHERE id = v_job.id;
+        END IF;
+        v_count := v_count + 1;
+    END LOOP;
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
@@ -0,0 +1,13 @@
+-- =============================================
+-- 지연 처리(벌크) 작업 우선순위
+-- =============================================
+-- Backfills and scheduled digests are inserted with priority = 'DEFERRED'.
+-- When the worker runs in bulk mode, deferred STANDARD jobs are gathered
+-- into Gemini batch-prediction jobs instead of competing with interactive
+-- traffic for synchronous quota.
+ALTER TABLE analysis_jobs
+    ADD COLUMN IF NOT EXISTS priority TEXT NOT NULL DEFAULT 'INTERACTIVE'
+        CHECK (priority IN ('INTERACTIVE', 'DEFERRED'));
+
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_deferred_pending
+    ON analysis_jobs(created_at) WHERE status = 'PENDING' AND priority = 'DEFERRED';
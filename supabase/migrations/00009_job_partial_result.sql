@@ -0,0 +1,8 @@
+-- =============================================
+-- 분석 작업 부분 결과 (스트리밍)
+-- =============================================
+-- While a Standard analysis is still streaming, the worker publishes the
+-- fields that are already complete (title, summary) here so clients can
+-- show them before the full result lands in analysis_results.
+ALTER TABLE analysis_jobs
+    ADD COLUMN IF NOT EXISTS partial_result JSONB;
@@ -0,0 +1,68 @@
+-- =============================================
+-- 작업 큐 통계 (오토스케일링)
+-- =============================================
+-- One aggregate read per scrape for the worker's /worker/queue endpoint:
+-- queue depth and oldest pending age per mode (from the PENDING/PROCESSING
+-- partial index) and the recent average service time (from completions in
+-- the last p_window_minutes), plus how many runners currently hold leases.
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_completed_at
+    ON analysis_jobs(completed_at) WHERE status = 'COMPLETED';
+
+CREATE OR REPLACE FUNCTION get_queue_stats(
+    p_window_minutes INT DEFAULT 15
+)
+RETURNS TABLE(
+    mode TEXT,
+    pending_count BIGINT,
+    deferred_pending_count BIGINT,
+    processing_count BIGINT,
+    oldest_pending_seconds DOUBLE PRECISION,
+    completed_count BIGINT,
+    avg_service_seconds DOUBLE PRECISION,
+    active_runners BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH active AS (
+        SELECT
+            j.mode AS job_mode,
+            COUNT(*) FILTER (WHERE j.status = 'PENDING' AND j.priority = 'INTERACTIVE') AS pending,
+            COUNT(*) FILTER (WHERE j.status = 'PENDING' AND j.priority = 'DEFERRED') AS deferred_pending,
+            COUNT(*) FILTER (WHERE j.status = 'PROCESSING') AS processing,
+            MIN(j.created_at) FILTER (WHERE j.status = 'PENDING' AND j.priority = 'INTERACTIVE') AS oldest_pending_at
+        FROM analysis_jobs j
+        WHERE j.status IN ('PENDING', 'PROCESSING')
+        GROUP BY j.mode
+    ),
+    recent AS (
+        SELECT
+            j.mode AS job_mode,
+            COUNT(*) AS completed,
+            AVG(EXTRACT(EPOCH FROM j.completed_at - j.started_at)) AS avg_service
+        FROM analysis_jobs j
+        WHERE j.status = 'COMPLETED'
+          AND j.completed_at >= NOW() - make_interval(mins => p_window_minutes)
+          AND j.started_at IS NOT NULL
+        GROUP BY j.mode
+    ),
+    runners AS (
+        -- With a backlog every live runner holds at least one lease
+        SELECT COUNT(DISTINCT j.lease_owner) AS live
+        FROM analysis_jobs j
+        WHERE j.status = 'PROCESSING' AND j.lease_expires_at > NOW()
+    )
+    SELECT
+        m.job_mode,
+        COALESCE(a.pending, 0),
+        COALESCE(a.deferred_pending, 0),
+        COALESCE(a.processing, 0),
+        EXTRACT(EPOCH FROM NOW() - a.oldest_pending_at)::DOUBLE PRECISION,
+        COALESCE(r.completed, 0),
+        r.avg_service::DOUBLE PRECISION,
+        runners.live
+    FROM (VALUES ('STANDARD'), ('DEEP')) AS m(job_mode)
+    LEFT JOIN active a ON a.job_mode = m.job_mode
+    LEFT JOIN recent r ON r.job_mode = m.job_mode
+    CROSS JOIN runners;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
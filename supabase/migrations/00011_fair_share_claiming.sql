@@ -0,0 +1,63 @@
+-- =============================================
+-- 사용자별 공정 분배 (가중 라운드 로빈)
+-- =============================================
+-- Pending jobs are handed to workers round-robin across users instead of
+-- strictly by created_at, so one user bulk-submitting hundreds of videos
+-- doesn't starve everyone else. Each job gets a virtual finish time:
+--
+--   (user's jobs already PROCESSING + job's rank among the user's PENDING jobs)
+--     / weight of the user's plan
+--
+-- and candidates are returned in that order (interactive before deferred,
+-- ties by created_at). A user with nothing running gets the next free slot;
+-- a user with a long backlog gets one slot per round, and p_plan_weights
+-- (e.g. {"FREE": 1, "PRO": 4}) gives paid plans proportionally more rounds.
+CREATE OR REPLACE FUNCTION get_fair_pending_jobs(
+    p_limit INT DEFAULT 10,
+    p_include_deferred BOOLEAN DEFAULT TRUE,
+    p_plan_weights JSONB DEFAULT '{}'::JSONB
+)
+RETURNS SETOF analysis_jobs AS $$
+BEGIN
+    RETURN QUERY
+    WITH pending AS (
+        SELECT
+            j.id,
+            j.user_id,
+            j.priority,
+            j.created_at,
+            ROW_NUMBER() OVER (PARTITION BY j.user_id ORDER BY j.created_at) AS user_rank
+        FROM analysis_jobs j
+        WHERE j.status = 'PENDING'
+          AND (p_include_deferred OR j.priority = 'INTERACTIVE' OR j.mode <> 'STANDARD')
+    ),
+    candidates AS (
+        -- No user can fill more than p_limit slots in one poll
+        SELECT * FROM pending WHERE pending.user_rank <= p_limit
+    ),
+    in_flight AS (
+        SELECT j.user_id, COUNT(*) AS running
+        FROM analysis_jobs j
+        WHERE j.status = 'PROCESSING'
+          AND j.user_id IN (SELECT c.user_id FROM candidates c)
+        GROUP BY j.user_id
+    ),
+    ranked AS (
+        SELECT
+            c.id,
+            c.priority = 'DEFERRED' AS deferred,
+            (COALESCE(f.running, 0) + c.user_rank)
+                / GREATEST(COALESCE((p_plan_weights ->> pr.plan)::NUMERIC, 1), 0.01) AS virtual_finish,
+            c.created_at
+        FROM candidates c
+        LEFT JOIN profiles pr ON pr.id = c.user_id
+        LEFT JOIN in_flight f ON f.user_id = c.user_id
+        ORDER BY deferred, virtual_finish, c.created_at
+        LIMIT p_limit
+    )
+    SELECT j.*
+    FROM ranked r
+    JOIN analysis_jobs j ON j.id = r.id
+    ORDER BY r.deferred, r.virtual_finish, r.created_at;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
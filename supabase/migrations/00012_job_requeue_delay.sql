@@ -0,0 +1,127 @@
+-- =============================================
+-- 일시적 장애 시 지연 재대기 (not_before)
+-- =============================================
+-- When YouTube or Gemini is failing (or the worker's circuit breaker for it
+-- is open), a job goes back to PENDING with a not_before delay instead of
+-- being failed and refunded. Claiming skips jobs until their not_before, so
+-- workers stay free for work that can succeed and pick the job up again
+-- once the upstream recovers. After p_max_requeues requeues the job is
+-- failed and refunded as before.
+ALTER TABLE analysis_jobs
+    ADD COLUMN IF NOT EXISTS not_before TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS requeues INT NOT NULL DEFAULT 0;
+
+-- Return a job to PENDING after a transient upstream error.
+-- Returns 'REQUEUED', 'FAILED' (requeue limit reached, refunded) or
+-- 'NOT_OWNED' (the lease was lost to the reaper).
+CREATE OR REPLACE FUNCTION requeue_job(
+    p_job_id UUID,
+    p_worker_id TEXT,
+    p_delay_seconds INT,
+    p_reason TEXT,
+    p_max_requeues INT DEFAULT 5
+)
+RETURNS TEXT AS $$
+DECLARE
+    v_job RECORD;
+BEGIN
+    SELECT status, lease_owner, requeues INTO v_job
+    FROM analysis_jobs WHERE id = p_job_id FOR UPDATE;
+
+    IF NOT FOUND OR v_job.status <> 'PROCESSING' OR v_job.lease_owner IS DISTINCT FROM p_worker_id THEN
+        RETURN 'NOT_OWNED';
+    END IF;
+
+    IF v_job.requeues >= p_max_requeues THEN
+        PERFORM fail_and_refund_job(p_job_id, p_reason, 'ANALYSIS_006');
+        RETURN 'FAILED';
+    END IF;
+
+    UPDATE analysis_jobs
+    SET status = 'PENDING',
+        lease_owner = NULL,
+        lease_expires_at = NULL,
+        attempts = GREATEST(attempts - 1, 0),  -- Not the job's fault
+        requeues = requeues + 1,
+        not_before = NOW() + make_interval(secs => p_delay_seconds),
+        error_message = p_reason,
+        progress = 0
+    WHERE id = p_job_id;
+
+    RETURN 'REQUEUED';
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Claim a PENDING job and take its lease, unless it is delayed
+CREATE OR REPLACE FUNCTION claim_analysis_job(
+    p_job_id UUID,
+    p_worker_id TEXT,
+    p_lease_seconds INT DEFAULT 60
+)
+RETURNS SETOF analysis_jobs AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE analysis_jobs
+    SET status = 'PROCESSING',
+        started_at = NOW(),
+        lease_owner = p_worker_id,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = attempts + 1
+    WHERE id = p_job_id
+      AND status = 'PENDING'
+      AND (not_before IS NULL OR not_before <= NOW())
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Fair-share candidates (00011), skipping delayed jobs
+CREATE OR REPLACE FUNCTION get_fair_pending_jobs(
+    p_limit INT DEFAULT 10,
+    p_include_deferred BOOLEAN DEFAULT TRUE,
+    p_plan_weights JSONB DEFAULT '{}'::JSONB
+)
+RETURNS SETOF analysis_jobs AS $$
+BEGIN
+    RETURN QUERY
+    WITH pending AS (
+        SELECT
+            j.id,
+            j.user_id,
+            j.priority,
+            j.created_at,
+            ROW_NUMBER() OVER (PARTITION BY j.user_id ORDER BY j.created_at) AS user_rank
+        FROM analysis_jobs j
+        WHERE j.status = 'PENDING'
+          AND (p_include_deferred OR j.priority = 'INTERACTIVE' OR j.mode <> 'STANDARD')
+          AND (j.not_before IS NULL OR j.not_before <= NOW())
+    ),
+    candidates AS (
+        -- No user can fill more than p_limit slots in one poll
+        SELECT * FROM pending WHERE pending.user_rank <= p_limit
+    ),
+    in_flight AS (
+        SELECT j.user_id, COUNT(*) AS running
+        FROM analysis_jobs j
+        WHERE j.status = 'PROCESSING'
+          AND j.user_id IN (SELECT c.user_id FROM candidates c)
+        GROUP BY j.user_id
+    ),
+    ranked AS (
+        SELECT
+            c.id,
+            c.priority = 'DEFERRED' AS deferred,
+            (COALESCE(f.running, 0) + c.user_rank)
+                / GREATEST(COALESCE((p_plan_weights ->> pr.plan)::NUMERIC, 1), 0.01) AS virtual_finish,
+            c.created_at
+        FROM candidates c
+        LEFT JOIN profiles pr ON pr.id = c.user_id
+        LEFT JOIN in_flight f ON f.user_id = c.user_id
+        ORDER BY deferred, virtual_finish, c.created_at
+        LIMIT p_limit
+    )
+    SELECT j.*
+    FROM ranked r
+    JOIN analysis_jobs j ON j.id = r.id
+    ORDER BY r.deferred, r.virtual_finish, r.created_at;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
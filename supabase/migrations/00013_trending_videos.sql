@@ -0,0 +1,45 @@
+-- =============================================
+-- 인기 영상 사전 분석 후보
+-- =============================================
+-- Candidates for the worker's idle precompute: videos requested by at least
+-- p_min_requests distinct users in the last p_window_hours that have no
+-- Standard result yet and no Standard job queued or running. Most requested
+-- first, then most recently requested.
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_created_at
+    ON analysis_jobs(created_at);
+
+CREATE OR REPLACE FUNCTION get_trending_videos(
+    p_window_hours INT DEFAULT 24,
+    p_min_requests INT DEFAULT 2,
+    p_limit INT DEFAULT 50
+)
+RETURNS TABLE(
+    video_id TEXT,
+    video_url TEXT,
+    request_count BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        j.video_id,
+        MIN(j.video_url),
+        COUNT(DISTINCT j.user_id) AS requests
+    FROM analysis_jobs j
+    WHERE j.created_at >= NOW() - make_interval(hours => p_window_hours)
+      AND j.video_id IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM analysis_results r
+          WHERE r.video_id = j.video_id AND r.mode = 'STANDARD'
+      )
+      AND NOT EXISTS (
+          SELECT 1 FROM analysis_jobs a
+          WHERE a.video_id = j.video_id
+            AND a.mode = 'STANDARD'
+            AND a.status IN ('PENDING', 'PROCESSING')
+      )
+    GROUP BY j.video_id
+    HAVING COUNT(DISTINCT j.user_id) >= p_min_requests
+    ORDER BY requests DESC, MAX(j.created_at) DESC
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
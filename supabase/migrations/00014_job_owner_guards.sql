@@ -0,0 +1,118 @@
+-- =============================================
+-- 작업 완료/실패 시 리스 소유자 확인
+-- =============================================
+-- A worker whose lease expired can still be running a job the reaper has
+-- handed to another worker. finalize_job and fail_and_refund_job now take
+-- the caller's worker id and do nothing unless the job is still PROCESSING
+-- under that worker's lease. Called without p_worker_id (reaper,
+-- requeue_job, backend) they behave as before.
+--
+-- The old signatures are dropped so calls without p_worker_id resolve to
+-- the new functions instead of an ambiguous overload.
+DROP FUNCTION IF EXISTS finalize_job(UUID, TEXT, TEXT, TEXT, JSONB, TEXT, TEXT, INT, TEXT);
+DROP FUNCTION IF EXISTS fail_and_refund_job(UUID, TEXT, TEXT);
+
+CREATE OR REPLACE FUNCTION finalize_job(
+    p_job_id UUID,
+    p_video_id TEXT,
+    p_video_url TEXT,
+    p_mode TEXT,
+    p_result_json JSONB,
+    p_video_title TEXT DEFAULT NULL,
+    p_video_thumbnail TEXT DEFAULT NULL,
+    p_video_duration_seconds INT DEFAULT NULL,
+    p_transcript TEXT DEFAULT NULL,
+    p_worker_id TEXT DEFAULT NULL
+)
+RETURNS UUID AS $$
+DECLARE
+    v_result_id UUID;
+BEGIN
+    IF p_worker_id IS NOT NULL THEN
+        PERFORM 1 FROM analysis_jobs
+        WHERE id = p_job_id AND status = 'PROCESSING' AND lease_owner = p_worker_id
+        FOR UPDATE;
+
+        IF NOT FOUND THEN
+            RETURN NULL;  -- Lease lost: the job belongs to another worker now
+        END IF;
+    END IF;
+
+    INSERT INTO analysis_results (
+        video_id, video_url, mode, result_json,
+        video_title, video_thumbnail, video_duration_seconds, transcript
+    )
+    VALUES (
+        p_video_id, p_video_url, p_mode, p_result_json,
+        p_video_title, p_video_thumbnail, p_video_duration_seconds, p_transcript
+    )
+    ON CONFLICT (video_id, mode)
+    DO UPDATE SET
+        video_url = EXCLUDED.video_url,
+        result_json = EXCLUDED.result_json,
+        video_title = EXCLUDED.video_title,
+        video_thumbnail = EXCLUDED.video_thumbnail,
+        video_duration_seconds = EXCLUDED.video_duration_seconds,
+        transcript = EXCLUDED.transcript
+    RETURNING id INTO v_result_id;
+
+    UPDATE analysis_jobs
+    SET status = 'COMPLETED',
+        result_id = v_result_id,
+        progress = 100,
+        completed_at = NOW()
+    WHERE id = p_job_id;
+
+    RETURN v_result_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION fail_and_refund_job(
+    p_job_id UUID,
+    p_error_message TEXT,
+    p_error_code TEXT DEFAULT 'ANALYSIS_006',
+    p_worker_id TEXT DEFAULT NULL
+)
+RETURNS INT AS $$
+DECLARE
+    v_job RECORD;
+    v_refunded INT := 0;
+BEGIN
+    SELECT user_id, status, credits_reserved, lease_owner INTO v_job
+    FROM analysis_jobs WHERE id = p_job_id FOR UPDATE;
+
+    IF NOT FOUND OR v_job.status = 'COMPLETED' THEN
+        RETURN 0;
+    END IF;
+
+    -- Lease lost: the job belongs to another worker (or is queued again)
+    IF p_worker_id IS NOT NULL
+       AND (v_job.status <> 'PROCESSING' OR v_job.lease_owner IS DISTINCT FROM p_worker_id) THEN
+        RETURN 0;
+    END IF;
+
+    IF v_job.status <> 'FAILED' THEN
+        UPDATE analysis_jobs
+        SET status = 'FAILED',
+            error_message = p_error_message,
+            error_code = p_error_code,
+            completed_at = NOW()
+        WHERE id = p_job_id;
+    END IF;
+
+    IF v_job.credits_reserved > 0 AND NOT EXISTS (
+        SELECT 1 FROM credit_transactions
+        WHERE reference_id = p_job_id AND type = 'REFUND' AND reference_type = 'analysis_job'
+    ) THEN
+        PERFORM refund_credits(
+            v_job.user_id,
+            v_job.credits_reserved,
+            'Refund for failed analysis job ' || p_job_id::TEXT,
+            p_job_id
+        );
+        v_refunded := v_job.credits_reserved;
+    END IF;
+
+    RETURN v_refunded;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
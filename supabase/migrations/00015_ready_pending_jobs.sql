@@ -0,0 +1,119 @@
+-- =============================================
+-- 지연 재대기 작업을 큐 통계/조회에서 제외
+-- =============================================
+-- Jobs requeued with a future not_before (00012) cannot be claimed yet, so
+-- they no longer count as pending or set the oldest pending age in
+-- get_queue_stats; otherwise an upstream outage inflates the scaling signal
+-- with work no new worker could take. They are reported as delayed_count.
+--
+-- The worker's pending/deferred polls move to RPCs as well, so "delay has
+-- passed" is decided by the database clock rather than the worker's.
+DROP FUNCTION IF EXISTS get_queue_stats(INT);
+
+CREATE OR REPLACE FUNCTION get_queue_stats(
+    p_window_minutes INT DEFAULT 15
+)
+RETURNS TABLE(
+    mode TEXT,
+    pending_count BIGINT,
+    deferred_pending_count BIGINT,
+    delayed_count BIGINT,
+    processing_count BIGINT,
+    oldest_pending_seconds DOUBLE PRECISION,
+    completed_count BIGINT,
+    avg_service_seconds DOUBLE PRECISION,
+    active_runners BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH active AS (
+        SELECT
+            j.mode AS job_mode,
+            COUNT(*) FILTER (
+                WHERE j.status = 'PENDING' AND j.priority = 'INTERACTIVE'
+                  AND (j.not_before IS NULL OR j.not_before <= NOW())
+            ) AS pending,
+            COUNT(*) FILTER (
+                WHERE j.status = 'PENDING' AND j.priority = 'DEFERRED'
+                  AND (j.not_before IS NULL OR j.not_before <= NOW())
+            ) AS deferred_pending,
+            COUNT(*) FILTER (WHERE j.status = 'PENDING' AND j.not_before > NOW()) AS delayed,
+            COUNT(*) FILTER (WHERE j.status = 'PROCESSING') AS processing,
+            MIN(j.created_at) FILTER (
+                WHERE j.status = 'PENDING' AND j.priority = 'INTERACTIVE'
+                  AND (j.not_before IS NULL OR j.not_before <= NOW())
+            ) AS oldest_pending_at
+        FROM analysis_jobs j
+        WHERE j.status IN ('PENDING', 'PROCESSING')
+        GROUP BY j.mode
+    ),
+    recent AS (
+        SELECT
+            j.mode AS job_mode,
+            COUNT(*) AS completed,
+            AVG(EXTRACT(EPOCH FROM j.completed_at - j.started_at)) AS avg_service
+        FROM analysis_jobs j
+        WHERE j.status = 'COMPLETED'
+          AND j.completed_at >= NOW() - make_interval(mins => p_window_minutes)
+          AND j.started_at IS NOT NULL
+        GROUP BY j.mode
+    ),
+    runners AS (
+        -- With a backlog every live runner holds at least one lease
+        SELECT COUNT(DISTINCT j.lease_owner) AS live
+        FROM analysis_jobs j
+        WHERE j.status = 'PROCESSING' AND j.lease_expires_at > NOW()
+    )
+    SELECT
+        m.job_mode,
+        COALESCE(a.pending, 0),
+        COALESCE(a.deferred_pending, 0),
+        COALESCE(a.delayed, 0),
+        COALESCE(a.processing, 0),
+        EXTRACT(EPOCH FROM NOW() - a.oldest_pending_at)::DOUBLE PRECISION,
+        COALESCE(r.completed, 0),
+        r.avg_service::DOUBLE PRECISION,
+        runners.live
+    FROM (VALUES ('STANDARD'), ('DEEP')) AS m(job_mode)
+    LEFT JOIN active a ON a.job_mode = m.job_mode
+    LEFT JOIN recent r ON r.job_mode = m.job_mode
+    CROSS JOIN runners;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
+
+-- Claimable PENDING jobs, oldest first. With p_include_deferred = FALSE,
+-- deferred STANDARD jobs are left for the bulk runner.
+CREATE OR REPLACE FUNCTION get_ready_pending_jobs(
+    p_limit INT DEFAULT 10,
+    p_include_deferred BOOLEAN DEFAULT TRUE
+)
+RETURNS SETOF analysis_jobs AS $$
+BEGIN
+    RETURN QUERY
+    SELECT j.*
+    FROM analysis_jobs j
+    WHERE j.status = 'PENDING'
+      AND (p_include_deferred OR j.priority = 'INTERACTIVE' OR j.mode <> 'STANDARD')
+      AND (j.not_before IS NULL OR j.not_before <= NOW())
+    ORDER BY j.created_at
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
+
+-- Claimable deferred STANDARD jobs for the bulk runner, oldest first
+CREATE OR REPLACE FUNCTION get_ready_deferred_jobs(
+    p_limit INT DEFAULT 50
+)
+RETURNS SETOF analysis_jobs AS $$
+BEGIN
+    RETURN QUERY
+    SELECT j.*
+    FROM analysis_jobs j
+    WHERE j.status = 'PENDING'
+      AND j.priority = 'DEFERRED'
+      AND j.mode = 'STANDARD'
+      AND (j.not_before IS NULL OR j.not_before <= NOW())
+    ORDER BY j.created_at
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
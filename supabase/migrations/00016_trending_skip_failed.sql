@@ -0,0 +1,60 @@
+-- =============================================
+-- 인기 영상 후보에서 최근 실패 영상 제외
+-- =============================================
+-- Standard results never expire and every served Standard request creates
+-- one, so a video with a Standard result is already a cache hit and is not
+-- a candidate. Among the rest (mostly videos requested only in Deep mode),
+-- 00013 also returned videos whose jobs just failed, and idle slots spent
+-- quota re-running them. Videos whose latest job FAILED are now skipped;
+-- the worker also skips videos in its negative cache.
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_video_created
+    ON analysis_jobs(video_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION get_trending_videos(
+    p_window_hours INT DEFAULT 24,
+    p_min_requests INT DEFAULT 2,
+    p_limit INT DEFAULT 50
+)
+RETURNS TABLE(
+    video_id TEXT,
+    video_url TEXT,
+    request_count BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH requested AS (
+        SELECT
+            j.video_id AS requested_video_id,
+            MIN(j.video_url) AS requested_url,
+            COUNT(DISTINCT j.user_id) AS requests,
+            MAX(j.created_at) AS last_requested_at
+        FROM analysis_jobs j
+        WHERE j.created_at >= NOW() - make_interval(hours => p_window_hours)
+          AND j.video_id IS NOT NULL
+        GROUP BY j.video_id
+        HAVING COUNT(DISTINCT j.user_id) >= p_min_requests
+    ),
+    latest AS (
+        SELECT DISTINCT ON (a.video_id) a.video_id AS latest_video_id, a.status
+        FROM analysis_jobs a
+        WHERE a.video_id IN (SELECT q.requested_video_id FROM requested q)
+        ORDER BY a.video_id, a.created_at DESC
+    )
+    SELECT q.requested_video_id, q.requested_url, q.requests
+    FROM requested q
+    JOIN latest l ON l.latest_video_id = q.requested_video_id
+    WHERE l.status <> 'FAILED'
+      AND NOT EXISTS (
+          SELECT 1 FROM analysis_results r
+          WHERE r.video_id = q.requested_video_id AND r.mode = 'STANDARD'
+      )
+      AND NOT EXISTS (
+          SELECT 1 FROM analysis_jobs a
+          WHERE a.video_id = q.requested_video_id
+            AND a.mode = 'STANDARD'
+            AND a.status IN ('PENDING', 'PROCESSING')
+      )
+    ORDER BY q.requests DESC, q.last_requested_at DESC
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;